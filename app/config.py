@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 from functools import lru_cache
+from typing import Literal
 
 from pydantic import Field, field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -21,7 +22,27 @@ class Settings(BaseSettings):
     channel_id: int | None = Field(default=None, alias="CHANNEL_ID")
     pd_consent_version: str = Field(default="v1", alias="PD_CONSENT_VERSION")
     log_level: str = Field(default="INFO", alias="LOG_LEVEL")
-    mass_send_delay_seconds: float = Field(default=0.08, alias="MASS_SEND_DELAY_SECONDS")
+    broadcast_rate_limit: float = Field(default=28.0, alias="BROADCAST_RATE_LIMIT")
+    broadcast_concurrency: int = Field(default=16, alias="BROADCAST_CONCURRENCY")
+    per_chat_send_interval_seconds: float = Field(
+        default=1.0, alias="PER_CHAT_SEND_INTERVAL_SECONDS"
+    )
+    reconcile_interval_seconds: float = Field(default=300.0, alias="RECONCILE_INTERVAL_SECONDS")
+    workflow_concurrency: int = Field(default=8, alias="WORKFLOW_CONCURRENCY")
+    broadcast_queue: str = Field(default="broadcast", alias="BROADCAST_QUEUE")
+    broadcast_shards: int = Field(default=1, alias="BROADCAST_SHARDS")
+    broadcast_shard_min_users: int = Field(default=5000, alias="BROADCAST_SHARD_MIN_USERS")
+    admin_cache_ttl_seconds: float = Field(default=60.0, alias="ADMIN_CACHE_TTL_SECONDS")
+    bot_mode: Literal["polling", "webhook"] = Field(default="polling", alias="BOT_MODE")
+    webhook_url: str | None = Field(default=None, alias="WEBHOOK_URL")
+    webhook_path: str = Field(default="/telegram/webhook", alias="WEBHOOK_PATH")
+    webhook_secret: str | None = Field(default=None, alias="WEBHOOK_SECRET")
+    webhook_host: str = Field(default="0.0.0.0", alias="WEBHOOK_HOST")
+    webhook_port: int = Field(default=8080, alias="WEBHOOK_PORT")
+    webhook_max_connections: int = Field(default=40, alias="WEBHOOK_MAX_CONNECTIONS")
+    fsm_storage: Literal["redis", "memory"] = Field(default="redis", alias="FSM_STORAGE")
+    fsm_ttl_seconds: int = Field(default=86400, alias="FSM_TTL_SECONDS")
+    fsm_compress_min_bytes: int = Field(default=1024, alias="FSM_COMPRESS_MIN_BYTES")
 
     @field_validator("admin_ids", "super_admin_ids", mode="before")
     @classmethod
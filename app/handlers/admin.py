@@ -6,12 +6,16 @@ from aiogram import Bot, F, Router
 from aiogram.filters import Command
 from aiogram.fsm.context import FSMContext
 from aiogram.types import BufferedInputFile, CallbackQuery, Message
+from redis.exceptions import RedisError
 from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import get_settings
-from app.db import AsyncSessionLocal
 from app.handlers.states import EventCreateStates, EventEditStates, PublishScheduleStates
+from app.jobs.locks import METRICS_KEY
 from app.keyboards.admin import (
+    broadcast_job_actions_kb,
+    broadcast_jobs_kb,
     edit_event_fields_kb,
     events_admin_list_kb,
     export_kind_kb,
@@ -19,6 +23,7 @@ from app.keyboards.admin import (
 )
 from app.keyboards.common import (
     ADMIN_BTN_ADMINS,
+    ADMIN_BTN_BROADCASTS,
     ADMIN_BTN_CREATE_EVENT,
     ADMIN_BTN_DELETE_EVENT,
     ADMIN_BTN_EDIT_EVENT,
@@ -32,15 +37,23 @@ from app.keyboards.common import (
 )
 from app.keyboards.events import event_type_kb, yes_no_kb
 from app.models.enums import EventStatus, RegistrationStatus
+from app.redis import get_redis
 from app.repositories.registrations import RegistrationRepository
 from app.services.admin_service import AdminService
+from app.services.broadcast_service import BroadcastService
 from app.services.event_service import EventService
 from app.services.exceptions import NotFoundError, ValidationError
 from app.services.export_service import ExportService
 from app.services.publication_service import PublicationService
 from app.services.schemas import EventCreateInput
 from app.utils.datetime import parse_dt
-from app.utils.text import NOT_MIPT_REG_NOTE, format_dt_tz
+from app.utils.text import (
+    NOT_MIPT_REG_NOTE,
+    broadcast_kind_label,
+    broadcast_status_label,
+    format_dt_tz,
+    render_broadcast_job,
+)
 
 admin_router = Router(name="admin")
 settings = get_settings()
@@ -90,20 +103,18 @@ EVENT_EDIT_FIELD_LABELS = {
 }
 
 
-async def _ensure_admin(message: Message) -> bool:
-    async with AsyncSessionLocal() as session:
-        admin_service = AdminService(session)
-        is_admin = await admin_service.is_admin(message.from_user.id)
+async def _ensure_admin(message: Message, session: AsyncSession) -> bool:
+    admin_service = AdminService(session)
+    is_admin = await admin_service.is_admin(message.from_user.id)
     if not is_admin:
         await message.answer("Недостаточно прав.")
         return False
     return True
 
 
-async def _ensure_admin_cb(callback: CallbackQuery) -> bool:
-    async with AsyncSessionLocal() as session:
-        admin_service = AdminService(session)
-        is_admin = await admin_service.is_admin(callback.from_user.id)
+async def _ensure_admin_cb(callback: CallbackQuery, session: AsyncSession) -> bool:
+    admin_service = AdminService(session)
+    is_admin = await admin_service.is_admin(callback.from_user.id)
     if not is_admin:
         await callback.answer("Недостаточно прав", show_alert=True)
         return False
@@ -111,8 +122,8 @@ async def _ensure_admin_cb(callback: CallbackQuery) -> bool:
 
 
 @admin_router.message(Command("admin"))
-async def admin_panel(message: Message) -> None:
-    if not await _ensure_admin(message):
+async def admin_panel(message: Message, session: AsyncSession) -> None:
+    if not await _ensure_admin(message, session):
         return
     await message.answer(
         "🔧 Панель администратора.\nВыбери действие в меню ниже.",
@@ -121,8 +132,8 @@ async def admin_panel(message: Message) -> None:
 
 
 @admin_router.message(F.text == ADMIN_BTN_CREATE_EVENT)
-async def create_event_start(message: Message, state: FSMContext) -> None:
-    if not await _ensure_admin(message):
+async def create_event_start(message: Message, state: FSMContext, session: AsyncSession) -> None:
+    if not await _ensure_admin(message, session):
         return
     await state.clear()
     await state.set_state(EventCreateStates.type)
@@ -130,8 +141,12 @@ async def create_event_start(message: Message, state: FSMContext) -> None:
 
 
 @admin_router.callback_query(EventCreateStates.type, F.data.startswith("event_type:"))
-async def create_event_type(callback: CallbackQuery, state: FSMContext) -> None:
-    if not await _ensure_admin_cb(callback):
+async def create_event_type(
+    callback: CallbackQuery,
+    state: FSMContext,
+    session: AsyncSession,
+) -> None:
+    if not await _ensure_admin_cb(callback, session):
         return
     event_type = callback.data.split(":", maxsplit=1)[1]
     await state.update_data(type=event_type)
@@ -305,7 +320,11 @@ async def create_event_photo(message: Message, state: FSMContext) -> None:
     await _send_event_preview(message, state)
 
 
-async def _save_event_from_state(message: Message, state: FSMContext) -> None:
+async def _save_event_from_state(
+    message: Message,
+    state: FSMContext,
+    session: AsyncSession,
+) -> None:
     data = await state.get_data()
     payload = EventCreateInput(
         type=data["type"],
@@ -321,9 +340,8 @@ async def _save_event_from_state(message: Message, state: FSMContext) -> None:
         photo_file_id=data.get("photo_file_id"),
     )
 
-    async with AsyncSessionLocal() as session:
-        event = await EventService(session).create_draft(payload)
-        await session.commit()
+    event = await EventService(session).create_draft(payload)
+    await session.commit()
 
     await state.clear()
     await message.answer(
@@ -333,23 +351,31 @@ async def _save_event_from_state(message: Message, state: FSMContext) -> None:
 
 
 @admin_router.callback_query(EventCreateStates.preview, F.data.in_({"draft_save_yes", "draft_save_no"}))
-async def create_event_preview_callback(callback: CallbackQuery, state: FSMContext) -> None:
+async def create_event_preview_callback(
+    callback: CallbackQuery,
+    state: FSMContext,
+    session: AsyncSession,
+) -> None:
     if callback.data == "draft_save_no":
         await state.clear()
         await callback.message.answer("Создание мероприятия отменено.")
         await callback.answer()
         return
 
-    await _save_event_from_state(callback.message, state)
+    await _save_event_from_state(callback.message, state, session)
     await callback.answer()
 
 
 @admin_router.message(EventCreateStates.preview)
-async def create_event_preview_message_fallback(message: Message, state: FSMContext) -> None:
+async def create_event_preview_message_fallback(
+    message: Message,
+    state: FSMContext,
+    session: AsyncSession,
+) -> None:
     if not _is_true(message.text):
         await message.answer("Пожалуйста, нажмите кнопку «Да» или «Нет» ниже.")
         return
-    await _save_event_from_state(message, state)
+    await _save_event_from_state(message, state, session)
 
 
 def _event_edit_prompt(event_type: str, field: str, current_value: str) -> str:
@@ -399,6 +425,7 @@ async def _apply_event_edit(
     state: FSMContext,
     field: str,
     parsed_value: object,
+    session: AsyncSession,
 ) -> None:
     data = await state.get_data()
     event_id = data.get("edit_event_id")
@@ -407,18 +434,20 @@ async def _apply_event_edit(
         await message.answer("Не выбрано мероприятие для редактирования. Нажмите «✏️ Изменить мероприятие».")
         return
 
-    async with AsyncSessionLocal() as session:
-        service = EventService(session)
-        try:
-            event = await service.update_fields(int(event_id), {field: parsed_value})
-            await session.commit()
-        except NotFoundError:
-            await state.clear()
-            await message.answer("Мероприятие не найдено.")
-            return
-        except ValidationError as exc:
-            await message.answer(f"Не удалось сохранить изменение: {exc}")
-            return
+    service = EventService(session)
+    try:
+        event = await service.update_fields(int(event_id), {field: parsed_value})
+        await session.commit()
+    except NotFoundError:
+        await session.rollback()
+        await state.clear()
+        await message.answer("Мероприятие не найдено.")
+        return
+    except ValidationError as exc:
+        # Nothing half-applied may reach the commit at the end of the update.
+        await session.rollback()
+        await message.answer(f"Не удалось сохранить изменение: {exc}")
+        return
 
     await state.set_state(EventEditStates.field_pick)
     await message.answer(
@@ -430,12 +459,11 @@ async def _apply_event_edit(
 
 
 @admin_router.message(F.text == ADMIN_BTN_EVENTS_LIST)
-async def admin_events_list(message: Message) -> None:
-    if not await _ensure_admin(message):
+async def admin_events_list(message: Message, session: AsyncSession) -> None:
+    if not await _ensure_admin(message, session):
         return
 
-    async with AsyncSessionLocal() as session:
-        events = await EventService(session).list_all()
+    events = await EventService(session).list_all()
 
     if not events:
         await message.answer("Пока нет ни одного мероприятия.")
@@ -456,13 +484,12 @@ async def admin_events_list(message: Message) -> None:
 
 
 @admin_router.message(F.text == ADMIN_BTN_EDIT_EVENT)
-async def edit_event_pick(message: Message, state: FSMContext) -> None:
-    if not await _ensure_admin(message):
+async def edit_event_pick(message: Message, state: FSMContext, session: AsyncSession) -> None:
+    if not await _ensure_admin(message, session):
         return
 
     await state.clear()
-    async with AsyncSessionLocal() as session:
-        events = await EventService(session).list_all()
+    events = await EventService(session).list_all()
 
     if not events:
         await message.answer("Пока нет мероприятий для редактирования.")
@@ -475,13 +502,16 @@ async def edit_event_pick(message: Message, state: FSMContext) -> None:
 
 
 @admin_router.callback_query(F.data.startswith("edit_event:"))
-async def edit_event_choose_field(callback: CallbackQuery, state: FSMContext) -> None:
-    if not await _ensure_admin_cb(callback):
+async def edit_event_choose_field(
+    callback: CallbackQuery,
+    state: FSMContext,
+    session: AsyncSession,
+) -> None:
+    if not await _ensure_admin_cb(callback, session):
         return
 
     event_id = int(callback.data.split(":", maxsplit=1)[1])
-    async with AsyncSessionLocal() as session:
-        event = await EventService(session).get(event_id)
+    event = await EventService(session).get(event_id)
     if not event:
         await callback.message.answer("Мероприятие не найдено.")
         await callback.answer()
@@ -499,8 +529,12 @@ async def edit_event_choose_field(callback: CallbackQuery, state: FSMContext) ->
 
 
 @admin_router.callback_query(EventEditStates.field_pick, F.data == "edit_done")
-async def edit_event_done(callback: CallbackQuery, state: FSMContext) -> None:
-    if not await _ensure_admin_cb(callback):
+async def edit_event_done(
+    callback: CallbackQuery,
+    state: FSMContext,
+    session: AsyncSession,
+) -> None:
+    if not await _ensure_admin_cb(callback, session):
         return
     await state.clear()
     await callback.message.answer("Редактирование завершено.")
@@ -508,8 +542,12 @@ async def edit_event_done(callback: CallbackQuery, state: FSMContext) -> None:
 
 
 @admin_router.callback_query(EventEditStates.field_pick, F.data.startswith("edit_field:"))
-async def edit_event_field_pick(callback: CallbackQuery, state: FSMContext) -> None:
-    if not await _ensure_admin_cb(callback):
+async def edit_event_field_pick(
+    callback: CallbackQuery,
+    state: FSMContext,
+    session: AsyncSession,
+) -> None:
+    if not await _ensure_admin_cb(callback, session):
         return
 
     field = callback.data.split(":", maxsplit=1)[1]
@@ -525,8 +563,7 @@ async def edit_event_field_pick(callback: CallbackQuery, state: FSMContext) -> N
         await callback.answer()
         return
 
-    async with AsyncSessionLocal() as session:
-        event = await EventService(session).get(int(event_id))
+    event = await EventService(session).get(int(event_id))
     if not event:
         await state.clear()
         await callback.message.answer("Мероприятие не найдено.")
@@ -550,7 +587,11 @@ async def edit_event_field_pick(callback: CallbackQuery, state: FSMContext) -> N
 
 
 @admin_router.message(EventEditStates.value, F.photo)
-async def edit_event_value_photo(message: Message, state: FSMContext) -> None:
+async def edit_event_value_photo(
+    message: Message,
+    state: FSMContext,
+    session: AsyncSession,
+) -> None:
     data = await state.get_data()
     field = data.get("edit_field")
     if field != "photo_file_id":
@@ -562,11 +603,12 @@ async def edit_event_value_photo(message: Message, state: FSMContext) -> None:
         state=state,
         field=field,
         parsed_value=message.photo[-1].file_id,
+        session=session,
     )
 
 
 @admin_router.message(EventEditStates.value)
-async def edit_event_value_text(message: Message, state: FSMContext) -> None:
+async def edit_event_value_text(message: Message, state: FSMContext, session: AsyncSession) -> None:
     data = await state.get_data()
     field = data.get("edit_field")
     if field not in EVENT_EDIT_FIELD_LABELS:
@@ -600,16 +642,16 @@ async def edit_event_value_text(message: Message, state: FSMContext) -> None:
         state=state,
         field=field,
         parsed_value=parsed_value,
+        session=session,
     )
 
 
 @admin_router.message(F.text == ADMIN_BTN_DELETE_EVENT)
-async def delete_event_pick(message: Message) -> None:
-    if not await _ensure_admin(message):
+async def delete_event_pick(message: Message, session: AsyncSession) -> None:
+    if not await _ensure_admin(message, session):
         return
 
-    async with AsyncSessionLocal() as session:
-        events = await EventService(session).list_all()
+    events = await EventService(session).list_all()
 
     if not events:
         await message.answer("Пока нет мероприятий для удаления.")
@@ -622,13 +664,12 @@ async def delete_event_pick(message: Message) -> None:
 
 
 @admin_router.callback_query(F.data.startswith("delete_event:"))
-async def delete_event_confirm(callback: CallbackQuery) -> None:
-    if not await _ensure_admin_cb(callback):
+async def delete_event_confirm(callback: CallbackQuery, session: AsyncSession) -> None:
+    if not await _ensure_admin_cb(callback, session):
         return
 
     event_id = int(callback.data.split(":", maxsplit=1)[1])
-    async with AsyncSessionLocal() as session:
-        event = await EventService(session).get(event_id)
+    event = await EventService(session).get(event_id)
 
     if not event:
         await callback.message.answer("Мероприятие не найдено.")
@@ -651,8 +692,8 @@ async def delete_event_confirm(callback: CallbackQuery) -> None:
 
 
 @admin_router.callback_query(F.data.startswith("delete_event_no:"))
-async def delete_event_cancel(callback: CallbackQuery) -> None:
-    if not await _ensure_admin_cb(callback):
+async def delete_event_cancel(callback: CallbackQuery, session: AsyncSession) -> None:
+    if not await _ensure_admin_cb(callback, session):
         return
 
     await callback.message.answer("Удаление отменено.")
@@ -660,33 +701,31 @@ async def delete_event_cancel(callback: CallbackQuery) -> None:
 
 
 @admin_router.callback_query(F.data.startswith("delete_event_yes:"))
-async def delete_event_apply(callback: CallbackQuery) -> None:
-    if not await _ensure_admin_cb(callback):
+async def delete_event_apply(callback: CallbackQuery, session: AsyncSession) -> None:
+    if not await _ensure_admin_cb(callback, session):
         return
 
     event_id = int(callback.data.split(":", maxsplit=1)[1])
-    async with AsyncSessionLocal() as session:
-        service = EventService(session)
-        event = await service.get(event_id)
-        if not event:
-            await callback.message.answer("Мероприятие не найдено или уже удалено.")
-            await callback.answer()
-            return
-        title = event.title
-        await service.delete(event_id)
-        await session.commit()
+    service = EventService(session)
+    event = await service.get(event_id)
+    if not event:
+        await callback.message.answer("Мероприятие не найдено или уже удалено.")
+        await callback.answer()
+        return
+    title = event.title
+    await service.delete(event_id)
+    await session.commit()
 
     await callback.message.answer(f"🗑️ Мероприятие #{event_id} «{title}» удалено.")
     await callback.answer()
 
 
 @admin_router.message(F.text == ADMIN_BTN_PUBLISH)
-async def publish_pick_event(message: Message) -> None:
-    if not await _ensure_admin(message):
+async def publish_pick_event(message: Message, session: AsyncSession) -> None:
+    if not await _ensure_admin(message, session):
         return
 
-    async with AsyncSessionLocal() as session:
-        events = await EventService(session).list_all()
+    events = await EventService(session).list_all()
 
     draft_events = [event for event in events if event.status == EventStatus.draft]
     if not draft_events:
@@ -700,8 +739,8 @@ async def publish_pick_event(message: Message) -> None:
 
 
 @admin_router.callback_query(F.data.startswith("publish_event:"))
-async def publish_event_pick_mode(callback: CallbackQuery) -> None:
-    if not await _ensure_admin_cb(callback):
+async def publish_event_pick_mode(callback: CallbackQuery, session: AsyncSession) -> None:
+    if not await _ensure_admin_cb(callback, session):
         return
 
     event_id = int(callback.data.split(":", maxsplit=1)[1])
@@ -713,19 +752,21 @@ async def publish_event_pick_mode(callback: CallbackQuery) -> None:
 
 
 @admin_router.callback_query(F.data.startswith("publish_now:"))
-async def publish_event_now(callback: CallbackQuery, bot: Bot) -> None:
-    if not await _ensure_admin_cb(callback):
+async def publish_event_now(callback: CallbackQuery, bot: Bot, session: AsyncSession) -> None:
+    if not await _ensure_admin_cb(callback, session):
         return
 
     event_id = int(callback.data.split(":", maxsplit=1)[1])
-    async with AsyncSessionLocal() as session:
-        outcome = await PublicationService(session, bot).publish_event(event_id=event_id)
-        await session.commit()
+    outcome = await PublicationService(session, bot).publish_event(
+        event_id=event_id,
+        admin_chat_id=callback.message.chat.id,
+    )
+    await session.commit()
 
     if outcome.published_now:
         await callback.message.answer(
             "✅ Мероприятие запущено.\n"
-            f"Личных уведомлений отправлено: {outcome.notifications_sent}."
+            f"Рассылка #{outcome.broadcast_job_id} поставлена в очередь, прогресс пришлю сюда."
         )
     else:
         await callback.message.answer("Это мероприятие уже было запущено ранее.")
@@ -733,8 +774,12 @@ async def publish_event_now(callback: CallbackQuery, bot: Bot) -> None:
 
 
 @admin_router.callback_query(F.data.startswith("publish_later:"))
-async def publish_event_later(callback: CallbackQuery, state: FSMContext) -> None:
-    if not await _ensure_admin_cb(callback):
+async def publish_event_later(
+    callback: CallbackQuery,
+    state: FSMContext,
+    session: AsyncSession,
+) -> None:
+    if not await _ensure_admin_cb(callback, session):
         return
 
     event_id = int(callback.data.split(":", maxsplit=1)[1])
@@ -749,8 +794,12 @@ async def publish_event_later(callback: CallbackQuery, state: FSMContext) -> Non
 
 
 @admin_router.message(PublishScheduleStates.publish_at)
-async def publish_event_later_save(message: Message, state: FSMContext) -> None:
-    if not await _ensure_admin(message):
+async def publish_event_later_save(
+    message: Message,
+    state: FSMContext,
+    session: AsyncSession,
+) -> None:
+    if not await _ensure_admin(message, session):
         return
 
     try:
@@ -767,12 +816,11 @@ async def publish_event_later_save(message: Message, state: FSMContext) -> None:
 
     data = await state.get_data()
     event_id = int(data["publish_event_id"])
-    async with AsyncSessionLocal() as session:
-        event = await EventService(session).schedule_publish(
-            event_id=event_id,
-            publish_at=publish_at,
-        )
-        await session.commit()
+    event = await EventService(session).schedule_publish(
+        event_id=event_id,
+        publish_at=publish_at,
+    )
+    await session.commit()
 
     await state.clear()
     await message.answer(
@@ -781,12 +829,11 @@ async def publish_event_later_save(message: Message, state: FSMContext) -> None:
 
 
 @admin_router.message(F.text == ADMIN_BTN_REGISTRATIONS)
-async def admin_regs_pick(message: Message) -> None:
-    if not await _ensure_admin(message):
+async def admin_regs_pick(message: Message, session: AsyncSession) -> None:
+    if not await _ensure_admin(message, session):
         return
 
-    async with AsyncSessionLocal() as session:
-        events = await EventService(session).list_all()
+    events = await EventService(session).list_all()
     if not events:
         await message.answer("Пока нет мероприятий.")
         return
@@ -798,14 +845,13 @@ async def admin_regs_pick(message: Message) -> None:
 
 
 @admin_router.callback_query(F.data.startswith("admin_regs:"))
-async def admin_regs_show(callback: CallbackQuery) -> None:
-    if not await _ensure_admin_cb(callback):
+async def admin_regs_show(callback: CallbackQuery, session: AsyncSession) -> None:
+    if not await _ensure_admin_cb(callback, session):
         return
 
     event_id = int(callback.data.split(":", maxsplit=1)[1])
-    async with AsyncSessionLocal() as session:
-        event = await EventService(session).get(event_id)
-        regs = await RegistrationRepository(session).list_by_event(event_id)
+    event = await EventService(session).get(event_id)
+    regs = await RegistrationRepository(session).list_by_event(event_id)
 
     if not regs:
         await callback.message.answer("На это мероприятие пока нет заявок.")
@@ -862,12 +908,11 @@ async def admin_regs_show(callback: CallbackQuery) -> None:
 
 
 @admin_router.message(F.text == ADMIN_BTN_WAITLIST)
-async def admin_waitlist_pick(message: Message) -> None:
-    if not await _ensure_admin(message):
+async def admin_waitlist_pick(message: Message, session: AsyncSession) -> None:
+    if not await _ensure_admin(message, session):
         return
 
-    async with AsyncSessionLocal() as session:
-        events = await EventService(session).list_all()
+    events = await EventService(session).list_all()
 
     if not events:
         await message.answer("Пока нет мероприятий.")
@@ -880,13 +925,12 @@ async def admin_waitlist_pick(message: Message) -> None:
 
 
 @admin_router.callback_query(F.data.startswith("admin_waitlist:"))
-async def admin_waitlist_show(callback: CallbackQuery) -> None:
-    if not await _ensure_admin_cb(callback):
+async def admin_waitlist_show(callback: CallbackQuery, session: AsyncSession) -> None:
+    if not await _ensure_admin_cb(callback, session):
         return
 
     event_id = int(callback.data.split(":", maxsplit=1)[1])
-    async with AsyncSessionLocal() as session:
-        regs = await RegistrationRepository(session).list_by_event(event_id)
+    regs = await RegistrationRepository(session).list_by_event(event_id)
 
     waitlist = [r for r in regs if r.status == RegistrationStatus.waitlist]
     if not waitlist:
@@ -904,12 +948,11 @@ async def admin_waitlist_show(callback: CallbackQuery) -> None:
 
 
 @admin_router.message(F.text == ADMIN_BTN_EXPORT)
-async def admin_export_pick(message: Message) -> None:
-    if not await _ensure_admin(message):
+async def admin_export_pick(message: Message, session: AsyncSession) -> None:
+    if not await _ensure_admin(message, session):
         return
 
-    async with AsyncSessionLocal() as session:
-        events = await EventService(session).list_all()
+    events = await EventService(session).list_all()
 
     if not events:
         await message.answer("Пока нет мероприятий для выгрузки.")
@@ -922,8 +965,8 @@ async def admin_export_pick(message: Message) -> None:
 
 
 @admin_router.callback_query(F.data.startswith("admin_export:"))
-async def admin_export_show(callback: CallbackQuery) -> None:
-    if not await _ensure_admin_cb(callback):
+async def admin_export_show(callback: CallbackQuery, session: AsyncSession) -> None:
+    if not await _ensure_admin_cb(callback, session):
         return
 
     event_id = int(callback.data.split(":", maxsplit=1)[1])
@@ -938,15 +981,14 @@ async def admin_export_show(callback: CallbackQuery) -> None:
 @admin_router.callback_query(F.data.startswith("export_confirmed_csv:"))
 @admin_router.callback_query(F.data.startswith("export_passes_csv:"))
 @admin_router.callback_query(F.data.startswith("export_all_xlsx:"))
-async def export_data(callback: CallbackQuery) -> None:
-    if not await _ensure_admin_cb(callback):
+async def export_data(callback: CallbackQuery, session: AsyncSession) -> None:
+    if not await _ensure_admin_cb(callback, session):
         return
 
     action, event_id_s = callback.data.split(":", maxsplit=1)
     event_id = int(event_id_s)
 
-    async with AsyncSessionLocal() as session:
-        regs = await RegistrationRepository(session).list_by_event(event_id)
+    regs = await RegistrationRepository(session).list_by_event(event_id)
 
     exporter = ExportService()
     if action == "export_all_csv":
@@ -967,8 +1009,8 @@ async def export_data(callback: CallbackQuery) -> None:
 
 
 @admin_router.message(F.text == ADMIN_BTN_SETTINGS)
-async def settings_info(message: Message) -> None:
-    if not await _ensure_admin(message):
+async def settings_info(message: Message, session: AsyncSession) -> None:
+    if not await _ensure_admin(message, session):
         return
 
     await message.answer(
@@ -979,13 +1021,82 @@ async def settings_info(message: Message) -> None:
     )
 
 
+@admin_router.message(F.text == ADMIN_BTN_BROADCASTS)
+async def broadcasts_list(message: Message, session: AsyncSession) -> None:
+    if not await _ensure_admin(message, session):
+        return
+
+    jobs = await BroadcastService(session).list_recent()
+
+    if not jobs:
+        await message.answer("Рассылок пока не было.")
+        return
+
+    lines = ["📣 Последние рассылки:"]
+    for job in jobs:
+        lines.append(
+            f"#{job.id} • событие #{job.event_id} • {broadcast_kind_label(job.kind)} • "
+            f"{broadcast_status_label(job.status)} ({job.sent_count}/{job.total_count or '?'})"
+        )
+    await message.answer("\n".join(lines), reply_markup=broadcast_jobs_kb(jobs))
+
+
+@admin_router.callback_query(F.data.startswith("broadcast_job:"))
+async def broadcast_job_show(callback: CallbackQuery, session: AsyncSession) -> None:
+    if not await _ensure_admin_cb(callback, session):
+        return
+
+    job_id = int(callback.data.split(":", maxsplit=1)[1])
+    try:
+        job = await BroadcastService(session).get(job_id)
+    except NotFoundError:
+        await callback.answer("Рассылка не найдена", show_alert=True)
+        return
+
+    await callback.message.answer(
+        render_broadcast_job(job), reply_markup=broadcast_job_actions_kb(job)
+    )
+    await callback.answer()
+
+
+@admin_router.callback_query(F.data.startswith("broadcast_pause:"))
+@admin_router.callback_query(F.data.startswith("broadcast_resume:"))
+@admin_router.callback_query(F.data.startswith("broadcast_cancel:"))
+async def broadcast_job_control(callback: CallbackQuery, session: AsyncSession) -> None:
+    if not await _ensure_admin_cb(callback, session):
+        return
+
+    action, job_id_s = callback.data.split(":", maxsplit=1)
+    service = BroadcastService(session)
+    try:
+        if action == "broadcast_pause":
+            job = await service.pause(int(job_id_s))
+            note = "⏸ Рассылка остановится после текущей порции сообщений."
+        elif action == "broadcast_resume":
+            job = await service.resume(int(job_id_s))
+            note = "▶️ Рассылка продолжится с места остановки."
+        else:
+            job = await service.cancel(int(job_id_s))
+            note = "⛔ Рассылка отменена."
+        await session.commit()
+    except (NotFoundError, ValidationError) as exc:
+        await session.rollback()
+        await callback.answer(f"Не удалось: {exc}", show_alert=True)
+        return
+
+    await callback.message.answer(
+        note + "\n\n" + render_broadcast_job(job),
+        reply_markup=broadcast_job_actions_kb(job),
+    )
+    await callback.answer()
+
+
 @admin_router.message(F.text == ADMIN_BTN_ADMINS)
-async def admins_info(message: Message) -> None:
-    if not await _ensure_admin(message):
+async def admins_info(message: Message, session: AsyncSession) -> None:
+    if not await _ensure_admin(message, session):
         return
 
-    async with AsyncSessionLocal() as session:
-        admins = await AdminService(session).repo.list_admins()
+    admins = await AdminService(session).repo.list_admins()
 
     lines = ["👮 Администраторы:"]
     lines.extend(str(item.tg_id) for item in admins)
@@ -995,8 +1106,8 @@ async def admins_info(message: Message) -> None:
 
 
 @admin_router.message(Command("add_admin"))
-async def add_admin(message: Message) -> None:
-    if not await _ensure_admin(message):
+async def add_admin(message: Message, session: AsyncSession) -> None:
+    if not await _ensure_admin(message, session):
         return
 
     parts = message.text.split()
@@ -1004,21 +1115,20 @@ async def add_admin(message: Message) -> None:
         await message.answer("Формат команды: /add_admin <tg_id>")
         return
 
-    async with AsyncSessionLocal() as session:
-        admin_service = AdminService(session)
-        if not await admin_service.is_super_admin(message.from_user.id):
-            await message.answer("Добавлять админов может только super-admin.")
-            return
+    admin_service = AdminService(session)
+    if not await admin_service.is_super_admin(message.from_user.id):
+        await message.answer("Добавлять админов может только super-admin.")
+        return
 
-        await admin_service.add_admin(int(parts[1]), message.from_user.id)
-        await session.commit()
+    await admin_service.add_admin(int(parts[1]), message.from_user.id)
+    await session.commit()
 
     await message.answer("✅ Администратор добавлен.")
 
 
 @admin_router.message(Command("remove_admin"))
-async def remove_admin(message: Message) -> None:
-    if not await _ensure_admin(message):
+async def remove_admin(message: Message, session: AsyncSession) -> None:
+    if not await _ensure_admin(message, session):
         return
 
     parts = message.text.split()
@@ -1026,14 +1136,13 @@ async def remove_admin(message: Message) -> None:
         await message.answer("Формат команды: /remove_admin <tg_id>")
         return
 
-    async with AsyncSessionLocal() as session:
-        admin_service = AdminService(session)
-        if not await admin_service.is_super_admin(message.from_user.id):
-            await message.answer("Удалять админов может только super-admin.")
-            return
+    admin_service = AdminService(session)
+    if not await admin_service.is_super_admin(message.from_user.id):
+        await message.answer("Удалять админов может только super-admin.")
+        return
 
-        removed = await admin_service.remove_admin(int(parts[1]))
-        await session.commit()
+    removed = await admin_service.remove_admin(int(parts[1]))
+    await session.commit()
 
     await message.answer(
         "✅ Администратор удален." if removed else "Админ не найден или это super-admin."
@@ -1041,38 +1150,51 @@ async def remove_admin(message: Message) -> None:
 
 
 @admin_router.message(Command("health"))
-async def healthcheck(message: Message) -> None:
-    if not await _ensure_admin(message):
+async def healthcheck(message: Message, session: AsyncSession) -> None:
+    if not await _ensure_admin(message, session):
         return
 
-    async with AsyncSessionLocal() as session:
-        await session.execute(text("SELECT 1"))
-    await message.answer("✅ Healthcheck: DB доступна, бот работает.")
+    await session.execute(text("SELECT 1"))
+
+    try:
+        metrics = await get_redis().hgetall(METRICS_KEY)
+    except RedisError:
+        await message.answer(
+            "⚠️ Healthcheck: DB доступна, бот работает.\n"
+            "❌ Redis: недоступен."
+        )
+        return
+    skipped = int(metrics.get(b"periodic_workflow_skipped", 0))
+    await message.answer(
+        "✅ Healthcheck: DB и Redis доступны, бот работает.\n"
+        f"Пропущено наложившихся сверок планировщика: {skipped}."
+    )
 
 
 @admin_router.message(Command("rebuild_scheduler"))
-async def rebuild_scheduler(message: Message) -> None:
-    if not await _ensure_admin(message):
+async def rebuild_scheduler(message: Message, session: AsyncSession) -> None:
+    if not await _ensure_admin(message, session):
         return
     await message.answer(
-        "Планировщик Celery Beat подхватывает события автоматически.\n"
+        "Сроки мероприятий планируются автоматически при каждом изменении,\n"
+        "а периодическая сверка подхватывает всё пропущенное.\n"
         "Ручная пересборка сейчас не требуется."
     )
 
 
 @admin_router.message(Command("reschedule_event"))
-async def reschedule_event(message: Message) -> None:
-    if not await _ensure_admin(message):
+async def reschedule_event(message: Message, session: AsyncSession) -> None:
+    if not await _ensure_admin(message, session):
         return
     await message.answer(
-        "Планировщик использует динамический подбор по времени.\n"
+        "При изменении дат мероприятия его напоминания перепланируются автоматически.\n"
         "Ручная перепланировка события не нужна."
     )
 
 
 @admin_router.message(Command("backup_db"))
-async def backup_info(message: Message) -> None:
-    if not await _ensure_admin(message):
+async def backup_info(message: Message, session: AsyncSession) -> None:
+    if not await _ensure_admin(message, session):
         return
     await message.answer(
         "📦 Бэкап БД можно сделать так:\n"
@@ -1,28 +1,39 @@
 from __future__ import annotations
 
+import uuid
 from datetime import UTC, date, datetime, timedelta
+from functools import lru_cache
 
 from aiogram import F, Router
 from aiogram.filters import CommandStart
 from aiogram.fsm.context import FSMContext
 from aiogram.exceptions import TelegramBadRequest
 from aiogram.types import CallbackQuery, InlineKeyboardButton, InlineKeyboardMarkup, Message
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db import AsyncSessionLocal
 from app.handlers.states import ProfileStates, RegistrationStates
 from app.keyboards.common import main_menu_kb
-from app.keyboards.events import event_card_kb, events_list_kb, group_choice_kb, pd_consent_kb, yes_no_kb
+from app.keyboards.events import event_card_kb, group_choice_kb, pd_consent_kb, yes_no_kb
 from app.models import RegistrationStatus
+from app.redis import get_redis
 from app.repositories.events import EventRepository
 from app.repositories.registrations import RegistrationRepository
+from app.repositories.user_cache import cache_user_on_commit
 from app.repositories.users import UserRepository
+from app.services.admission import RegistrationAdmission
+from app.services.event_catalog import CatalogEvent, event_catalog
 from app.services.exceptions import ValidationError
 from app.services.profile_service import ProfileService
 from app.services.registration_service import RegistrationService
 from app.services.schemas import PassportInput, PersonInput, RegistrationInput
-from app.utils.text import NOT_MIPT_REG_NOTE, format_dt_tz, render_event_card
+from app.utils.idempotency import IdempotencyStore
+from app.utils.text import NOT_MIPT_REG_NOTE, format_dt_tz
 
 user_router = Router(name="user")
+registration_admission = RegistrationAdmission(AsyncSessionLocal)
+
+SUBMISSION_TTL_SECONDS = 600
 
 HELP_TEXT = (
     "🤝 Я помогу зарегистрироваться на мероприятия ФПМИ.\n\n"
@@ -85,7 +96,11 @@ def _refill_help_kb(event_id: int) -> InlineKeyboardMarkup:
     )
 
 
-async def _continue_captain_flow(message: Message, state: FSMContext) -> None:
+async def _continue_captain_flow(
+    message: Message,
+    state: FSMContext,
+    session: AsyncSession,
+) -> None:
     data = await state.get_data()
     profile = data.get("profile", {})
     captain = data.get("captain", {})
@@ -162,7 +177,7 @@ async def _continue_captain_flow(message: Message, state: FSMContext) -> None:
     if captain.get("group_name"):
         captain["is_not_mipt"] = False
         await state.update_data(captain=captain)
-        await _after_captain_ready(message, state)
+        await _after_captain_ready(message, state, session)
         return
 
     saved_group = profile.get("group_name")
@@ -170,7 +185,7 @@ async def _continue_captain_flow(message: Message, state: FSMContext) -> None:
         captain["group_name"] = saved_group
         captain["is_not_mipt"] = False
         await state.update_data(captain=captain)
-        await _after_captain_ready(message, state)
+        await _after_captain_ready(message, state, session)
         return
 
     await state.set_state(RegistrationStates.group_or_not_mipt)
@@ -181,14 +196,13 @@ async def _continue_captain_flow(message: Message, state: FSMContext) -> None:
 
 
 @user_router.message(CommandStart())
-async def cmd_start(message: Message) -> None:
-    async with AsyncSessionLocal() as session:
-        repo = UserRepository(session)
-        await repo.ensure_user(
-            tg_id=message.from_user.id,
-            username=message.from_user.username,
-        )
-        await session.commit()
+async def cmd_start(message: Message, session: AsyncSession) -> None:
+    repo = UserRepository(session)
+    await repo.ensure_user(
+        tg_id=message.from_user.id,
+        username=message.from_user.username,
+    )
+    await session.commit()
 
     await message.answer(
         "👋 Привет! Рад видеть тебя в системе регистрации ФПМИ.\nВыбери нужный раздел в меню ниже.",
@@ -202,15 +216,15 @@ async def help_message(message: Message) -> None:
 
 
 @user_router.message(F.text == "📅 Мероприятия")
-async def list_events(message: Message) -> None:
-    async with AsyncSessionLocal() as session:
-        events = await EventRepository(session).list_published(datetime.now(tz=UTC))
+async def list_events(message: Message, session: AsyncSession) -> None:
+    catalog = await event_catalog.get(session)
+    markup = catalog.list_markup(datetime.now(tz=UTC))
 
-    if not events:
+    if markup is None:
         await message.answer("📭 Пока нет активных мероприятий. Как только появятся — я сразу покажу.")
         return
 
-    await message.answer("📌 Вот что доступно сейчас:", reply_markup=events_list_kb(events))
+    await message.answer("📌 Вот что доступно сейчас:", reply_markup=markup)
 
 
 @user_router.callback_query(F.data == "events_back")
@@ -220,20 +234,23 @@ async def events_back(callback: CallbackQuery) -> None:
 
 
 @user_router.callback_query(F.data.startswith("event_open:"))
-async def open_event(callback: CallbackQuery) -> None:
+async def open_event(callback: CallbackQuery, session: AsyncSession) -> None:
     event_id = int(callback.data.split(":", maxsplit=1)[1])
 
-    async with AsyncSessionLocal() as session:
-        event = await EventRepository(session).get(event_id)
-        user = await UserRepository(session).get_by_tg_id(callback.from_user.id)
-        if not event or not user:
-            await callback.answer("⚠️ Событие не найдено", show_alert=True)
-            return
+    event = (await event_catalog.get(session)).get(event_id)
+    if event is None:
+        # Archived, or already started when the catalog was loaded: read it directly.
+        row = await EventRepository(session).get(event_id)
+        event = CatalogEvent.from_event(row) if row else None
+    user = await UserRepository(session).get_snapshot(callback.from_user.id)
+    if not event or not user:
+        await callback.answer("⚠️ Событие не найдено", show_alert=True)
+        return
 
-        existing = await RegistrationRepository(session).active_registration_for_user_event(
-            user_id=user.id,
-            event_id=event.id,
-        )
+    existing = await RegistrationRepository(session).active_registration_for_user_event(
+        user_id=user.id,
+        event_id=event.id,
+    )
 
     now = datetime.now(tz=UTC)
     not_mipt_cutoff_passed = bool(user.is_not_mipt) and now > event.start_at - timedelta(days=3)
@@ -261,7 +278,7 @@ async def open_event(callback: CallbackQuery) -> None:
     else:
         reg_note = "🟢 Регистрация открыта."
 
-    card_text = render_event_card(event) + "\n\n" + reg_note
+    card_text = event.card_text + "\n\n" + reg_note
     if event.photo_file_id:
         try:
             await callback.message.answer_photo(
@@ -284,7 +301,7 @@ async def open_event(callback: CallbackQuery) -> None:
 
 @user_router.callback_query(F.data == "my_regs")
 @user_router.message(F.text == "🧾 Мои регистрации")
-async def my_regs(update: Message | CallbackQuery) -> None:
+async def my_regs(update: Message | CallbackQuery, session: AsyncSession) -> None:
     if isinstance(update, CallbackQuery):
         tg_id = update.from_user.id
         send = update.message.answer
@@ -292,13 +309,12 @@ async def my_regs(update: Message | CallbackQuery) -> None:
         tg_id = update.from_user.id
         send = update.answer
 
-    async with AsyncSessionLocal() as session:
-        user = await UserRepository(session).get_by_tg_id(tg_id)
-        if not user:
-            await send("ℹ️ Сначала отправь /start, чтобы активировать профиль.")
-            return
+    user = await UserRepository(session).get_snapshot(tg_id)
+    if not user:
+        await send("ℹ️ Сначала отправь /start, чтобы активировать профиль.")
+        return
 
-        regs = await RegistrationRepository(session).list_by_user(user.id)
+    regs = await RegistrationRepository(session).list_by_user(user.id)
 
     now = datetime.now(tz=UTC)
     visible_statuses = {
@@ -336,14 +352,13 @@ async def my_regs(update: Message | CallbackQuery) -> None:
 
 
 @user_router.message(F.text == "🕒 Лист ожидания")
-async def my_waitlist(message: Message) -> None:
-    async with AsyncSessionLocal() as session:
-        user = await UserRepository(session).get_by_tg_id(message.from_user.id)
-        if not user:
-            await message.answer("ℹ️ Сначала отправь /start, чтобы активировать профиль.")
-            return
+async def my_waitlist(message: Message, session: AsyncSession) -> None:
+    user = await UserRepository(session).get_snapshot(message.from_user.id)
+    if not user:
+        await message.answer("ℹ️ Сначала отправь /start, чтобы активировать профиль.")
+        return
 
-        regs = await RegistrationRepository(session).list_by_user(user.id)
+    regs = await RegistrationRepository(session).list_by_user(user.id)
 
     waitlist_regs = [r for r in regs if r.status == RegistrationStatus.waitlist]
     if not waitlist_regs:
@@ -357,16 +372,15 @@ async def my_waitlist(message: Message) -> None:
 
 
 @user_router.callback_query(F.data.startswith("passport_check:"))
-async def passport_check(callback: CallbackQuery) -> None:
+async def passport_check(callback: CallbackQuery, session: AsyncSession) -> None:
     event_id = int(callback.data.split(":", maxsplit=1)[1])
 
-    async with AsyncSessionLocal() as session:
-        user = await UserRepository(session).get_by_tg_id(callback.from_user.id)
-        if not user:
-            await callback.answer("ℹ️ Сначала отправь /start", show_alert=True)
-            return
+    user = await UserRepository(session).get_snapshot(callback.from_user.id)
+    if not user:
+        await callback.answer("ℹ️ Сначала отправь /start", show_alert=True)
+        return
 
-        regs = await RegistrationRepository(session).list_by_user(user.id)
+    regs = await RegistrationRepository(session).list_by_user(user.id)
 
     reg = next(
         (
@@ -434,61 +448,67 @@ async def passport_refill(callback: CallbackQuery) -> None:
 
 
 @user_router.callback_query(F.data.startswith("cancel_event:"))
-async def cancel_event(callback: CallbackQuery) -> None:
+async def cancel_event(callback: CallbackQuery, session: AsyncSession) -> None:
     event_id = int(callback.data.split(":", maxsplit=1)[1])
-    async with AsyncSessionLocal() as session:
-        user = await UserRepository(session).get_by_tg_id(callback.from_user.id)
-        if not user:
-            await callback.answer("ℹ️ Сначала отправь /start", show_alert=True)
-            return
+    user = await UserRepository(session).get_snapshot(callback.from_user.id)
+    if not user:
+        await callback.answer("ℹ️ Сначала отправь /start", show_alert=True)
+        return
 
-        reg_repo = RegistrationRepository(session)
-        reg = await reg_repo.active_registration_for_user_event(user.id, event_id)
-        if not reg:
-            await callback.answer("⚠️ Активная регистрация не найдена", show_alert=True)
-            return
+    reg_repo = RegistrationRepository(session)
+    reg = await reg_repo.active_registration_for_user_event(user.id, event_id)
+    if not reg:
+        await callback.answer("⚠️ Активная регистрация не найдена", show_alert=True)
+        return
 
-        service = RegistrationService(session)
-        await service.cancel_registration(user.id, reg.id)
-        await session.commit()
+    service = RegistrationService(session)
+    await service.cancel_registration(user.id, reg.id)
+    await session.commit()
 
     await callback.message.answer("✅ Готово, регистрация отменена.")
     await callback.answer()
 
 
 @user_router.callback_query(F.data.startswith("register_event:"))
-async def register_event_start(callback: CallbackQuery, state: FSMContext) -> None:
+async def register_event_start(
+    callback: CallbackQuery,
+    state: FSMContext,
+    session: AsyncSession,
+) -> None:
     event_id = int(callback.data.split(":", maxsplit=1)[1])
 
-    async with AsyncSessionLocal() as session:
-        event = await EventRepository(session).get(event_id)
-        user = await UserRepository(session).get_by_tg_id(callback.from_user.id)
-        if not event or not user:
-            await callback.answer("⚠️ Событие не найдено", show_alert=True)
-            return
+    event = await EventRepository(session).get(event_id)
+    user = await UserRepository(session).get_by_tg_id(callback.from_user.id)
+    if not event or not user:
+        await callback.answer("⚠️ Событие не найдено", show_alert=True)
+        return
 
-        existing = await RegistrationRepository(session).active_registration_for_user_event(user.id, event_id)
-        if existing:
-            await callback.answer("ℹ️ У тебя уже есть активная регистрация", show_alert=True)
-            return
-        if user.is_not_mipt and datetime.now(tz=UTC) > event.start_at - timedelta(days=3):
-            await callback.answer(
-                "⛔ Для участников не с Физтеха регистрация закрывается за 3 дня до старта.",
-                show_alert=True,
-            )
-            return
+    existing = await RegistrationRepository(session).active_registration_for_user_event(
+        user.id, event_id
+    )
+    if existing:
+        await callback.answer("ℹ️ У тебя уже есть активная регистрация", show_alert=True)
+        return
+    if user.is_not_mipt and datetime.now(tz=UTC) > event.start_at - timedelta(days=3):
+        await callback.answer(
+            "⛔ Для участников не с Физтеха регистрация закрывается за 3 дня до старта.",
+            show_alert=True,
+        )
+        return
 
-        profile = {
-            "last_name": user.last_name,
-            "first_name": user.first_name,
-            "middle_name": user.middle_name,
-            "contact": user.contact or (f"@{user.username}" if user.username else None),
-            "is_not_mipt": user.is_not_mipt,
-            "group_name": user.group_name,
-            "passport_series": user.passport_series,
-            "passport_number": user.passport_number,
-            "passport_issue_date": user.passport_issue_date.isoformat() if user.passport_issue_date else None,
-        }
+    profile = {
+        "last_name": user.last_name,
+        "first_name": user.first_name,
+        "middle_name": user.middle_name,
+        "contact": user.contact or (f"@{user.username}" if user.username else None),
+        "is_not_mipt": user.is_not_mipt,
+        "group_name": user.group_name,
+        "passport_series": user.passport_series,
+        "passport_number": user.passport_number,
+        "passport_issue_date": (
+            user.passport_issue_date.isoformat() if user.passport_issue_date else None
+        ),
+    }
 
     await state.clear()
     await state.update_data(
@@ -503,6 +523,7 @@ async def register_event_start(callback: CallbackQuery, state: FSMContext) -> No
         has_team=None,
         not_mipt_members=[],
         pd_consent=False,
+        submission_nonce=uuid.uuid4().hex,
     )
     if event.type.value == "team":
         await state.set_state(RegistrationStates.team_has_team)
@@ -511,12 +532,12 @@ async def register_event_start(callback: CallbackQuery, state: FSMContext) -> No
             reply_markup=yes_no_kb("team_has_yes", "team_has_no"),
         )
     else:
-        await _continue_captain_flow(callback.message, state)
+        await _continue_captain_flow(callback.message, state, session)
     await callback.answer()
 
 
 @user_router.message(RegistrationStates.last_name)
-async def reg_last_name(message: Message, state: FSMContext) -> None:
+async def reg_last_name(message: Message, state: FSMContext, session: AsyncSession) -> None:
     data = await state.get_data()
     value = message.text.strip()
     if not value:
@@ -525,11 +546,11 @@ async def reg_last_name(message: Message, state: FSMContext) -> None:
     captain = data["captain"]
     captain["last_name"] = value
     await state.update_data(captain=captain)
-    await _continue_captain_flow(message, state)
+    await _continue_captain_flow(message, state, session)
 
 
 @user_router.message(RegistrationStates.first_name)
-async def reg_first_name(message: Message, state: FSMContext) -> None:
+async def reg_first_name(message: Message, state: FSMContext, session: AsyncSession) -> None:
     data = await state.get_data()
     value = message.text.strip()
     if not value:
@@ -538,21 +559,21 @@ async def reg_first_name(message: Message, state: FSMContext) -> None:
     captain = data["captain"]
     captain["first_name"] = value
     await state.update_data(captain=captain)
-    await _continue_captain_flow(message, state)
+    await _continue_captain_flow(message, state, session)
 
 
 @user_router.message(RegistrationStates.middle_name)
-async def reg_middle_name(message: Message, state: FSMContext) -> None:
+async def reg_middle_name(message: Message, state: FSMContext, session: AsyncSession) -> None:
     data = await state.get_data()
     value = message.text.strip()
     captain = data["captain"]
     captain["middle_name"] = value if value and value != "-" else None
     await state.update_data(captain=captain)
-    await _continue_captain_flow(message, state)
+    await _continue_captain_flow(message, state, session)
 
 
 @user_router.message(RegistrationStates.contact)
-async def reg_contact(message: Message, state: FSMContext) -> None:
+async def reg_contact(message: Message, state: FSMContext, session: AsyncSession) -> None:
     data = await state.get_data()
     value = message.text.strip()
     if not value and message.from_user.username:
@@ -563,11 +584,15 @@ async def reg_contact(message: Message, state: FSMContext) -> None:
     captain = data["captain"]
     captain["contact"] = value
     await state.update_data(captain=captain)
-    await _continue_captain_flow(message, state)
+    await _continue_captain_flow(message, state, session)
 
 
 @user_router.callback_query(RegistrationStates.group_or_not_mipt, F.data.in_({"group_mipt", "group_not_mipt"}))
-async def reg_group_choice(callback: CallbackQuery, state: FSMContext) -> None:
+async def reg_group_choice(
+    callback: CallbackQuery,
+    state: FSMContext,
+    session: AsyncSession,
+) -> None:
     data = await state.get_data()
     captain = data["captain"]
 
@@ -578,15 +603,14 @@ async def reg_group_choice(callback: CallbackQuery, state: FSMContext) -> None:
         if saved_group:
             captain["group_name"] = saved_group
             await state.update_data(captain=captain)
-            await _after_captain_ready(callback.message, state)
+            await _after_captain_ready(callback.message, state, session)
         else:
             await state.update_data(captain=captain)
             await state.set_state(RegistrationStates.group_name)
             await callback.message.answer("🏫 Группа (например, Б01-...):")
     else:
         event_id = int(data["event_id"])
-        async with AsyncSessionLocal() as session:
-            event = await EventRepository(session).get(event_id)
+        event = await EventRepository(session).get(event_id)
         if event and datetime.now(tz=UTC) > event.start_at - timedelta(days=3):
             await callback.message.answer(
                 "⛔ Регистрация участников не с Физтеха закрыта: до начала мероприятия осталось меньше 3 дней."
@@ -619,7 +643,7 @@ async def reg_group_choice(callback: CallbackQuery, state: FSMContext) -> None:
 
 
 @user_router.message(RegistrationStates.group_name)
-async def reg_group_name(message: Message, state: FSMContext) -> None:
+async def reg_group_name(message: Message, state: FSMContext, session: AsyncSession) -> None:
     value = message.text.strip()
     if not value:
         await message.answer("⚠️ Группа обязательна для участников с Физтеха.")
@@ -632,11 +656,11 @@ async def reg_group_name(message: Message, state: FSMContext) -> None:
     captain["passport"] = None
     await state.update_data(captain=captain)
 
-    await _after_captain_ready(message, state)
+    await _after_captain_ready(message, state, session)
 
 
 @user_router.callback_query(RegistrationStates.pd_consent, F.data == "pd_consent_yes")
-async def reg_pd_consent(callback: CallbackQuery, state: FSMContext) -> None:
+async def reg_pd_consent(callback: CallbackQuery, state: FSMContext, session: AsyncSession) -> None:
     data = await state.get_data()
     await state.update_data(pd_consent=True)
 
@@ -646,7 +670,7 @@ async def reg_pd_consent(callback: CallbackQuery, state: FSMContext) -> None:
         await state.set_state(RegistrationStates.passport_series)
         await callback.message.answer("🛂 Паспорт: серия")
     elif pending == "captain_ready":
-        await _after_captain_ready(callback.message, state)
+        await _after_captain_ready(callback.message, state, session)
     elif pending == "team_members":
         await state.update_data(current_member_idx=0, current_member={})
         await state.set_state(RegistrationStates.member_last_name)
@@ -657,12 +681,12 @@ async def reg_pd_consent(callback: CallbackQuery, state: FSMContext) -> None:
     await callback.answer()
 
 
-async def _after_captain_ready(message: Message, state: FSMContext) -> None:
+async def _after_captain_ready(message: Message, state: FSMContext, session: AsyncSession) -> None:
     data = await state.get_data()
     if data["event_type"] == "team":
         has_team = data.get("has_team")
         if has_team is False:
-            await _finalize_registration(message, state)
+            await _finalize_registration(message, state, session)
             return
         if has_team is True:
             await state.set_state(RegistrationStates.team_name)
@@ -675,11 +699,15 @@ async def _after_captain_ready(message: Message, state: FSMContext) -> None:
         )
         return
 
-    await _finalize_registration(message, state)
+    await _finalize_registration(message, state, session)
 
 
 @user_router.callback_query(RegistrationStates.team_has_team, F.data.in_({"team_has_yes", "team_has_no"}))
-async def reg_team_has_team(callback: CallbackQuery, state: FSMContext) -> None:
+async def reg_team_has_team(
+    callback: CallbackQuery,
+    state: FSMContext,
+    session: AsyncSession,
+) -> None:
     if callback.data == "team_has_yes":
         await state.update_data(has_team=True)
     else:
@@ -689,7 +717,7 @@ async def reg_team_has_team(callback: CallbackQuery, state: FSMContext) -> None:
             team_size=1,
             not_mipt_members=[],
         )
-    await _continue_captain_flow(callback.message, state)
+    await _continue_captain_flow(callback.message, state, session)
     await callback.answer()
 
 
@@ -732,14 +760,17 @@ async def reg_team_size(message: Message, state: FSMContext) -> None:
 
 
 @user_router.callback_query(RegistrationStates.team_has_not_mipt, F.data.in_({"team_not_mipt_yes", "team_not_mipt_no"}))
-async def reg_team_not_mipt(callback: CallbackQuery, state: FSMContext) -> None:
+async def reg_team_not_mipt(
+    callback: CallbackQuery,
+    state: FSMContext,
+    session: AsyncSession,
+) -> None:
     if callback.data == "team_not_mipt_no":
-        await _finalize_registration(callback.message, state)
+        await _finalize_registration(callback.message, state, session)
     else:
         data = await state.get_data()
         event_id = int(data["event_id"])
-        async with AsyncSessionLocal() as session:
-            event = await EventRepository(session).get(event_id)
+        event = await EventRepository(session).get(event_id)
         if event and datetime.now(tz=UTC) > event.start_at - timedelta(days=3):
             await callback.message.answer(
                 "⛔ Добавить участников не с Физтеха нельзя: до начала мероприятия осталось меньше 3 дней."
@@ -849,7 +880,7 @@ async def passport_number(message: Message, state: FSMContext) -> None:
 
 
 @user_router.message(RegistrationStates.passport_issue_date)
-async def passport_issue_date(message: Message, state: FSMContext) -> None:
+async def passport_issue_date(message: Message, state: FSMContext, session: AsyncSession) -> None:
     value = message.text.strip()
     try:
         parsed = _parse_date(value)
@@ -867,7 +898,7 @@ async def passport_issue_date(message: Message, state: FSMContext) -> None:
         captain = data["captain"]
         captain["passport"] = passport
         await state.update_data(captain=captain, passport_data={})
-        await _after_captain_ready(message, state)
+        await _after_captain_ready(message, state, session)
         return
 
     if target == "member":
@@ -892,17 +923,50 @@ async def passport_issue_date(message: Message, state: FSMContext) -> None:
             await message.answer(f"Участник {current_idx + 1} (не с Физтеха): фамилия")
             return
 
-        await _finalize_registration(message, state)
+        await _finalize_registration(message, state, session)
         return
 
     await message.answer("⚠️ Внутренняя ошибка сценария регистрации. Начните заново.")
     await state.clear()
 
 
-async def _finalize_registration(message: Message, state: FSMContext) -> None:
+async def _finalize_registration(
+    message: Message,
+    state: FSMContext,
+    session: AsyncSession,
+) -> None:
     data = await state.get_data()
     actor_tg_id = int(data.get("actor_tg_id") or message.from_user.id)
 
+    # A double tap or a redelivered update reuses the nonce of this FSM session: it gets the
+    # first attempt's answer before any database work.
+    nonce = data.get("submission_nonce")
+    submissions = _submissions()
+    key = submissions.key(actor_tg_id, data["event_id"], nonce) if nonce else None
+    if key and not await submissions.claim(key):
+        outcome = await submissions.outcome(key)
+        if outcome is None:
+            await message.answer("⏳ Заявка уже обрабатывается, подожди немного.")
+            return
+        await _answer_registration_outcome(message, state, outcome)
+        return
+
+    try:
+        outcome = await _submit_registration(data, actor_tg_id, session)
+    except Exception:
+        if key:
+            await submissions.release(key)
+        raise
+
+    if key:
+        if outcome.get("retry"):
+            await submissions.release(key)
+        else:
+            await submissions.complete(key, outcome)
+    await _answer_registration_outcome(message, state, outcome)
+
+
+async def _submit_registration(data: dict, actor_tg_id: int, session: AsyncSession) -> dict:
     captain = data["captain"]
     captain_passport = captain.get("passport")
     captain_input = PersonInput(
@@ -952,34 +1016,42 @@ async def _finalize_registration(message: Message, state: FSMContext) -> None:
         pd_consent_version="v1",
     )
 
-    async with AsyncSessionLocal() as session:
-        user = await UserRepository(session).get_by_tg_id(actor_tg_id)
-        if not user:
-            await message.answer("ℹ️ Сначала отправь /start, чтобы активировать профиль.")
-            return
-
-        service = RegistrationService(session)
-        try:
-            reg = await service.create_registration(
-                user_id=user.id,
-                event_id=int(data["event_id"]),
-                data=registration_input,
-            )
-        except ValidationError as exc:
-            await message.answer(f"Ошибка регистрации: {exc}")
-            return
+    user = await UserRepository(session).get_snapshot(actor_tg_id)
+    # Hand the connection back before waiting in the admission queue, which uses its own sessions.
+    await session.commit()
+    if not user:
+        # Not cached: the same submission must go through once the profile exists.
+        return {"text": "ℹ️ Сначала отправь /start, чтобы активировать профиль.", "retry": True}
 
-        await session.commit()
+    # Queued behind other submissions for the same event and committed together with them.
+    try:
+        reg = await registration_admission.submit(
+            user_id=user.id,
+            event_id=int(data["event_id"]),
+            data=registration_input,
+        )
+    except ValidationError as exc:
+        return {"text": f"Ошибка регистрации: {exc}"}
 
     if reg.status == RegistrationStatus.waitlist:
-        await message.answer(
+        text = (
             "Все места уже заняты, но ты в листе ожидания.\n"
             "Если освободится место, сразу напишу."
         )
     else:
-        await message.answer("✅ Готово! Регистрация успешно создана.")
+        text = "✅ Готово! Регистрация успешно создана."
+    return {"text": text, "done": True}
 
-    await state.clear()
+
+async def _answer_registration_outcome(message: Message, state: FSMContext, outcome: dict) -> None:
+    await message.answer(outcome["text"])
+    if outcome.get("done"):
+        await state.clear()
+
+
+@lru_cache
+def _submissions() -> IdempotencyStore:
+    return IdempotencyStore(get_redis(), "hb_bot:submission", ttl=SUBMISSION_TTL_SECONDS)
 
 
 @user_router.callback_query(F.data.in_({"waitlist_yes", "waitlist_no"}))
@@ -989,18 +1061,18 @@ async def legacy_waitlist_handler(callback: CallbackQuery) -> None:
 
 @user_router.callback_query(F.data.startswith("waitlist_yes:"))
 @user_router.callback_query(F.data.startswith("waitlist_no:"))
-async def waitlist_response(callback: CallbackQuery) -> None:
+async def waitlist_response(callback: CallbackQuery, session: AsyncSession) -> None:
     registration_id = int(callback.data.split(":", maxsplit=1)[1])
     accepted = callback.data.startswith("waitlist_yes:")
 
-    async with AsyncSessionLocal() as session:
-        service = RegistrationService(session)
-        try:
-            await service.respond_waitlist_invite(registration_id=registration_id, accepted=accepted)
-            await session.commit()
-        except ValidationError as exc:
-            await callback.answer(str(exc), show_alert=True)
-            return
+    service = RegistrationService(session)
+    try:
+        await service.respond_waitlist_invite(registration_id=registration_id, accepted=accepted)
+        await session.commit()
+    except ValidationError as exc:
+        await session.rollback()
+        await callback.answer(str(exc), show_alert=True)
+        return
 
     await callback.message.answer("✅ Ответ сохранён. Спасибо!")
     await callback.answer()
@@ -1008,35 +1080,35 @@ async def waitlist_response(callback: CallbackQuery) -> None:
 
 @user_router.callback_query(F.data.startswith("confirm_yes:"))
 @user_router.callback_query(F.data.startswith("confirm_no:"))
-async def confirmation_response(callback: CallbackQuery) -> None:
+async def confirmation_response(callback: CallbackQuery, session: AsyncSession) -> None:
     registration_id = int(callback.data.split(":", maxsplit=1)[1])
     going = callback.data.startswith("confirm_yes:")
 
-    async with AsyncSessionLocal() as session:
-        service = RegistrationService(session)
-        try:
-            await service.respond_confirmation(registration_id=registration_id, going=going)
-            await session.commit()
-        except ValidationError as exc:
-            await callback.answer(str(exc), show_alert=True)
-            return
+    service = RegistrationService(session)
+    try:
+        await service.respond_confirmation(registration_id=registration_id, going=going)
+        await session.commit()
+    except ValidationError as exc:
+        await session.rollback()
+        await callback.answer(str(exc), show_alert=True)
+        return
 
     await callback.message.answer("✅ Ответ на подтверждение сохранён.")
     await callback.answer()
 
 
 @user_router.message(F.text == "👤 Профиль")
-async def profile_view(message: Message) -> None:
-    async with AsyncSessionLocal() as session:
-        user = await UserRepository(session).get_by_tg_id(message.from_user.id)
-        if not user:
-            await message.answer("ℹ️ Сначала отправь /start, чтобы активировать профиль.")
-            return
-        if not user.contact:
-            auto_contact = _auto_contact_from_username(user.username)
-            if auto_contact:
-                user.contact = auto_contact
-                await session.commit()
+async def profile_view(message: Message, session: AsyncSession) -> None:
+    user = await UserRepository(session).get_by_tg_id(message.from_user.id)
+    if not user:
+        await message.answer("ℹ️ Сначала отправь /start, чтобы активировать профиль.")
+        return
+    if not user.contact:
+        auto_contact = _auto_contact_from_username(user.username)
+        if auto_contact:
+            user.contact = auto_contact
+            cache_user_on_commit(session, user)
+            await session.commit()
 
     if user.is_not_mipt is True:
         issue_date_text = user.passport_issue_date.strftime("%d.%m.%Y") if user.passport_issue_date else "-"
@@ -1069,14 +1141,18 @@ async def profile_view(message: Message) -> None:
 
 
 @user_router.callback_query(F.data == "profile_edit")
-async def profile_edit_start(callback: CallbackQuery, state: FSMContext) -> None:
-    async with AsyncSessionLocal() as session:
-        user = await UserRepository(session).get_by_tg_id(callback.from_user.id)
-        if user and not user.contact:
-            auto_contact = _auto_contact_from_username(user.username)
-            if auto_contact:
-                user.contact = auto_contact
-                await session.commit()
+async def profile_edit_start(
+    callback: CallbackQuery,
+    state: FSMContext,
+    session: AsyncSession,
+) -> None:
+    user = await UserRepository(session).get_by_tg_id(callback.from_user.id)
+    if user and not user.contact:
+        auto_contact = _auto_contact_from_username(user.username)
+        if auto_contact:
+            user.contact = auto_contact
+            cache_user_on_commit(session, user)
+            await session.commit()
     if not user:
         await callback.answer("ℹ️ Сначала отправь /start", show_alert=True)
         return
@@ -1101,15 +1177,14 @@ async def profile_edit_start(callback: CallbackQuery, state: FSMContext) -> None
 
 
 @user_router.callback_query(F.data == "profile_clear")
-async def profile_clear(callback: CallbackQuery) -> None:
-    async with AsyncSessionLocal() as session:
-        user = await UserRepository(session).get_by_tg_id(callback.from_user.id)
-        if not user:
-            await callback.answer("ℹ️ Сначала отправь /start", show_alert=True)
-            return
+async def profile_clear(callback: CallbackQuery, session: AsyncSession) -> None:
+    user = await UserRepository(session).get_snapshot(callback.from_user.id)
+    if not user:
+        await callback.answer("ℹ️ Сначала отправь /start", show_alert=True)
+        return
 
-        await ProfileService(session).clear(user.id)
-        await session.commit()
+    await ProfileService(session).clear(user.id)
+    await session.commit()
 
     await callback.message.answer("🧹 Профиль очищен.")
     await callback.answer()
@@ -1190,34 +1265,38 @@ async def profile_contact(message: Message, state: FSMContext) -> None:
     )
 
 
-async def _save_profile(message: Message, state: FSMContext, profile: dict) -> None:
-    async with AsyncSessionLocal() as session:
-        user = await UserRepository(session).get_by_tg_id(message.from_user.id)
-        if not user:
-            await message.answer("ℹ️ Сначала отправь /start, чтобы активировать профиль.")
-            return
-
-        passport = None
-        if profile.get("is_not_mipt"):
-            passport = PassportInput(
-                series=profile["passport_series"],
-                number=profile["passport_number"],
-                issue_date=_parse_date(profile["passport_issue_date"]),
-            )
+async def _save_profile(
+    message: Message,
+    state: FSMContext,
+    profile: dict,
+    session: AsyncSession,
+) -> None:
+    user = await UserRepository(session).get_snapshot(message.from_user.id)
+    if not user:
+        await message.answer("ℹ️ Сначала отправь /start, чтобы активировать профиль.")
+        return
 
-        await ProfileService(session).update(
-            user.id,
-            PersonInput(
-                last_name=profile["last_name"],
-                first_name=profile["first_name"],
-                middle_name=profile.get("middle_name"),
-                contact=profile["contact"],
-                group_name=profile.get("group_name"),
-                is_not_mipt=bool(profile.get("is_not_mipt")),
-                passport=passport,
-            ),
+    passport = None
+    if profile.get("is_not_mipt"):
+        passport = PassportInput(
+            series=profile["passport_series"],
+            number=profile["passport_number"],
+            issue_date=_parse_date(profile["passport_issue_date"]),
         )
-        await session.commit()
+
+    await ProfileService(session).update(
+        user.id,
+        PersonInput(
+            last_name=profile["last_name"],
+            first_name=profile["first_name"],
+            middle_name=profile.get("middle_name"),
+            contact=profile["contact"],
+            group_name=profile.get("group_name"),
+            is_not_mipt=bool(profile.get("is_not_mipt")),
+            passport=passport,
+        ),
+    )
+    await session.commit()
 
     await state.clear()
     await message.answer("✅ Профиль обновлён. В следующий раз часть данных подставлю автоматически.")
@@ -1247,7 +1326,7 @@ async def profile_group_choice(callback: CallbackQuery, state: FSMContext) -> No
 
 
 @user_router.message(ProfileStates.group_name)
-async def profile_group_name(message: Message, state: FSMContext) -> None:
+async def profile_group_name(message: Message, state: FSMContext, session: AsyncSession) -> None:
     data = await state.get_data()
     value = message.text.strip()
     if not value:
@@ -1258,7 +1337,7 @@ async def profile_group_name(message: Message, state: FSMContext) -> None:
     profile["group_name"] = value
     profile["is_not_mipt"] = False
     await state.update_data(profile=profile)
-    await _save_profile(message, state, profile)
+    await _save_profile(message, state, profile, session)
 
 
 @user_router.message(ProfileStates.passport_series)
@@ -1290,7 +1369,11 @@ async def profile_passport_number(message: Message, state: FSMContext) -> None:
 
 
 @user_router.message(ProfileStates.passport_issue_date)
-async def profile_passport_issue_date(message: Message, state: FSMContext) -> None:
+async def profile_passport_issue_date(
+    message: Message,
+    state: FSMContext,
+    session: AsyncSession,
+) -> None:
     value = message.text.strip()
     try:
         parsed = _parse_date(value)
@@ -1303,4 +1386,4 @@ async def profile_passport_issue_date(message: Message, state: FSMContext) -> No
     profile["passport_issue_date"] = parsed.isoformat()
     profile["is_not_mipt"] = True
     await state.update_data(profile=profile)
-    await _save_profile(message, state, profile)
+    await _save_profile(message, state, profile, session)
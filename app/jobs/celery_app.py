@@ -7,10 +7,16 @@ settings = get_settings()
 celery_app = Celery("hb_bot", broker=settings.redis_url, backend=settings.redis_url)
 celery_app.conf.timezone = settings.timezone
 celery_app.conf.enable_utc = True
+# Mass broadcasts run on their own queue so a long send never delays the periodic workflow.
+celery_app.conf.task_routes = {
+    "app.jobs.tasks.run_broadcast_job": {"queue": settings.broadcast_queue},
+}
+# Deadlines are dispatched as ETA tasks when they are created; the periodic run is only a
+# reconciliation sweep that catches up on anything missed and schedules upcoming deadlines.
 celery_app.conf.beat_schedule = {
     "process-periodic-workflow": {
         "task": "app.jobs.tasks.process_periodic_workflow",
-        "schedule": 60.0,
+        "schedule": settings.reconcile_interval_seconds,
     }
 }
 
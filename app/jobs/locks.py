@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+import uuid
+from collections.abc import AsyncIterator
+
+from redis.asyncio import Redis
+
+logger = logging.getLogger(__name__)
+
+METRICS_KEY = "hb_bot:metrics"
+
+# Both scripts only touch the key while it still holds our token, so an expired lease that
+# another worker has since taken over is never extended or released by the old holder.
+_RENEW = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('PEXPIRE', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+_RELEASE = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+class LeaseLock:
+    # A Redis lease: held for `ttl` seconds and renewed every ttl/3 while the holder is alive,
+    # so a crashed worker frees the lock within one ttl instead of blocking the next runs.
+    def __init__(self, redis: Redis, name: str, ttl: float = 60.0):
+        self.redis = redis
+        self.key = f"hb_bot:lock:{name}"
+        self.ttl_ms = int(ttl * 1000)
+        self.token = uuid.uuid4().hex
+        self.lost = False
+        self._renew = redis.register_script(_RENEW)
+        self._release = redis.register_script(_RELEASE)
+        self._heartbeat: asyncio.Task[None] | None = None
+
+    async def acquire(self) -> bool:
+        acquired = bool(await self.redis.set(self.key, self.token, nx=True, px=self.ttl_ms))
+        if acquired:
+            self._heartbeat = asyncio.create_task(self._keep_alive())
+        return acquired
+
+    async def release(self) -> None:
+        if self._heartbeat is not None:
+            self._heartbeat.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._heartbeat
+            self._heartbeat = None
+        await self._release(keys=[self.key], args=[self.token])
+
+    async def _keep_alive(self) -> None:
+        while True:
+            await asyncio.sleep(self.ttl_ms / 3000)
+            try:
+                renewed = await self._renew(keys=[self.key], args=[self.token, self.ttl_ms])
+            except Exception:
+                logger.exception("Cannot renew lease %s", self.key)
+                continue
+            if not renewed:
+                self.lost = True
+                logger.warning("Lease %s was lost; another run may overlap", self.key)
+                return
+
+
+@contextlib.asynccontextmanager
+async def lease(redis: Redis, name: str, ttl: float = 60.0) -> AsyncIterator[LeaseLock | None]:
+    # Yields None without waiting when another holder owns the lease. Holders check `lost`
+    # between units of work and stop once it is set.
+    lock = LeaseLock(redis, name, ttl)
+    if not await lock.acquire():
+        yield None
+        return
+    try:
+        yield lock
+    finally:
+        await lock.release()
+
+
+async def record_skip(redis: Redis, name: str) -> int:
+    # Counts runs skipped because the previous one was still in flight (shown by /health).
+    return int(await redis.hincrby(METRICS_KEY, f"{name}_skipped", 1))
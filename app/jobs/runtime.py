@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Coroutine
+from dataclasses import dataclass
+from typing import Any, TypeVar
+
+from aiogram import Bot
+from celery.signals import worker_process_init, worker_process_shutdown
+from celery.utils.log import get_task_logger
+from redis.asyncio import Redis
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+
+from app.config import get_settings
+from app.redis import create_redis, create_sync_redis
+from app.services.event_catalog import event_catalog
+
+logger = get_task_logger(__name__)
+
+T = TypeVar("T")
+
+
+@dataclass(slots=True)
+class WorkerRuntime:
+    loop: asyncio.AbstractEventLoop
+    engine: AsyncEngine
+    session_factory: async_sessionmaker[AsyncSession]
+    bot: Bot
+    redis: Redis
+
+
+_runtime: WorkerRuntime | None = None
+
+
+def _create_runtime() -> WorkerRuntime:
+    settings = get_settings()
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    engine = create_async_engine(settings.database_url, pool_pre_ping=True)
+    # Scheduled publications commit here; the bot replicas must see the catalog change.
+    event_catalog.attach(sync_redis=create_sync_redis())
+    return WorkerRuntime(
+        loop=loop,
+        engine=engine,
+        session_factory=async_sessionmaker(engine, expire_on_commit=False, class_=AsyncSession),
+        bot=Bot(token=settings.bot_token),
+        redis=create_redis(),
+    )
+
+
+def get_runtime() -> WorkerRuntime:
+    # Created in worker_process_init for prefork children; lazily for the solo pool and scripts.
+    global _runtime
+    if _runtime is None:
+        _runtime = _create_runtime()
+    return _runtime
+
+
+def run(coro: Coroutine[Any, Any, T]) -> T:
+    # Every task of this process runs on the same loop, so pooled connections stay usable.
+    return get_runtime().loop.run_until_complete(coro)
+
+
+async def _close_runtime(runtime: WorkerRuntime) -> None:
+    await runtime.redis.aclose()
+    await runtime.bot.session.close()
+    await runtime.engine.dispose()
+
+
+@worker_process_init.connect
+def init_worker_runtime(**_: Any) -> None:
+    # Runs after fork: the engine pool and Bot session must not be inherited from the parent.
+    global _runtime
+    _runtime = _create_runtime()
+    logger.info("Worker runtime initialized")
+
+
+@worker_process_shutdown.connect
+def shutdown_worker_runtime(**_: Any) -> None:
+    global _runtime
+    if _runtime is None:
+        return
+    runtime, _runtime = _runtime, None
+    try:
+        runtime.loop.run_until_complete(_close_runtime(runtime))
+    finally:
+        runtime.loop.close()
+    logger.info("Worker runtime closed")
@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections.abc import Callable, Iterable
+from datetime import UTC, datetime, timedelta
+from functools import lru_cache
+
+from redis import Redis
+from redis.exceptions import RedisError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import get_settings
+from app.jobs.celery_app import celery_app
+from app.models import Event
+from app.models.enums import EventStatus
+from app.redis import create_sync_redis
+from app.utils.transactions import on_commit
+
+logger = logging.getLogger(__name__)
+
+EVENT_DEADLINE_TASK = "app.jobs.tasks.process_event_deadline"
+BROADCAST_TASK = "app.jobs.tasks.run_broadcast_job"
+# Fire a moment after the deadline so `now` is never a few milliseconds short of the window.
+DEADLINE_GRACE = timedelta(seconds=1)
+
+
+def schedule_broadcast(session: AsyncSession, job_id: int) -> None:
+    on_commit(session, lambda: _off_loop(dispatch_broadcast, job_id))
+
+
+def dispatch_broadcast(job_id: int) -> None:
+    # Routed to the broadcast queue by celery_app.conf.task_routes.
+    celery_app.send_task(BROADCAST_TASK, args=[job_id])
+
+
+def event_deadlines(event: Event) -> list[datetime]:
+    # Every moment at which the per-event workflow has something new to do.
+    if event.status == EventStatus.draft:
+        return [event.planned_publish_at] if event.planned_publish_at else []
+    if event.status != EventStatus.published:
+        return []
+    return [
+        event.registration_start_at,
+        event.registration_end_at - timedelta(hours=1),
+        event.start_at - timedelta(days=4),
+        event.start_at - timedelta(hours=24),
+        event.start_at - timedelta(hours=2),
+    ]
+
+
+def schedule_event_deadlines(session: AsyncSession, event: Event) -> None:
+    schedule_deadlines(session, event.id, event_deadlines(event))
+
+
+def schedule_deadlines(session: AsyncSession, event_id: int, etas: Iterable[datetime]) -> None:
+    etas = list(etas)
+    if etas:
+        # Dispatch only after commit: the worker must see the rows that produced the deadline.
+        on_commit(session, lambda: _off_loop(dispatch_event_deadlines, event_id, etas))
+
+
+def deadline_horizon() -> timedelta:
+    # Deadlines further out are left to the reconciliation sweep, which re-schedules them once
+    # they come within reach; long ETAs would outlive the Redis broker's visibility timeout.
+    return timedelta(seconds=2 * get_settings().reconcile_interval_seconds)
+
+
+def dispatch_event_deadlines(
+    event_id: int,
+    etas: Iterable[datetime],
+    now: datetime | None = None,
+) -> int:
+    now = now or datetime.now(tz=UTC)
+    horizon = now + deadline_horizon()
+    due_now = False
+    dispatched = 0
+    for eta in sorted(set(etas)):
+        if eta <= now:
+            due_now = True
+            continue
+        if eta > horizon:
+            continue
+        # Sweeps and state transitions re-announce the same deadline; only the first one enqueues.
+        key = f"hb_bot:deadline:{event_id}:{int(eta.timestamp())}"
+        ttl = int((eta - now).total_seconds()) + 3600
+        try:
+            if not _redis().set(key, 1, nx=True, ex=ttl):
+                continue
+        except RedisError:
+            # Without the dedupe key the task may be enqueued twice; it is idempotent.
+            logger.warning("Cannot dedupe deadline %s; dispatching anyway", key)
+        celery_app.send_task(EVENT_DEADLINE_TASK, args=[event_id], eta=eta + DEADLINE_GRACE)
+        dispatched += 1
+    if due_now:
+        # Windows that are already open (e.g. an event published after its registration
+        # started) collapse into a single immediate run.
+        celery_app.send_task(EVENT_DEADLINE_TASK, args=[event_id])
+        dispatched += 1
+    return dispatched
+
+
+def _off_loop(dispatch: Callable[..., object], *args: object) -> None:
+    # After-commit callbacks run on the committing coroutine's loop, which in the bot serves every
+    # chat: blocking Redis and broker calls go to a worker thread instead.
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        _dispatch_logged(dispatch, *args)
+        return
+    loop.run_in_executor(None, _dispatch_logged, dispatch, *args)
+
+
+def _dispatch_logged(dispatch: Callable[..., object], *args: object) -> None:
+    try:
+        dispatch(*args)
+    except Exception:
+        logger.exception("Dispatch %s%s failed", getattr(dispatch, "__name__", dispatch), args)
+
+
+@lru_cache
+def _redis() -> Redis:
+    return create_sync_redis()
@@ -1,74 +1,216 @@
 from __future__ import annotations
 
 import asyncio
+from collections import defaultdict
 from datetime import UTC, datetime, timedelta
 
 from aiogram import Bot
 from celery.utils.log import get_task_logger
-from sqlalchemy import select
-from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy import and_, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import get_settings
 from app.jobs.celery_app import celery_app
+from app.jobs.locks import LeaseLock, lease, record_skip
+from app.jobs.runtime import WorkerRuntime, get_runtime, run
+from app.jobs.scheduling import (
+    deadline_horizon,
+    dispatch_broadcast,
+    dispatch_event_deadlines,
+    event_deadlines,
+)
 from app.models import Event
 from app.models.enums import EventStatus
+from app.repositories.registrations import RegistrationRepository
+from app.services.broadcast_service import BroadcastService
 from app.services.notification_service import NotificationService
 from app.services.publication_service import PublicationService
 from app.services.registration_service import RegistrationService
+from app.utils.rate_limit import RedisTokenBucket, SendRateLimiter
 
 logger = get_task_logger(__name__)
 
+BROADCAST_BUCKET_KEY = "hb_bot:broadcast:bucket"
+PERIODIC_WORKFLOW_LOCK = "periodic_workflow"
+
+
+@celery_app.task(name="app.jobs.tasks.run_broadcast_job")
+def run_broadcast_job(job_id: int) -> None:
+    run(_run_broadcast_job(get_runtime(), job_id))
+
+
+async def _run_broadcast_job(runtime: WorkerRuntime, job_id: int) -> None:
+    settings = get_settings()
+    # Shards run in different worker processes; the Redis bucket keeps their combined rate global.
+    rate_limiter = SendRateLimiter(
+        rate=settings.broadcast_rate_limit,
+        per_chat_interval=settings.per_chat_send_interval_seconds,
+        bucket=RedisTokenBucket(runtime.redis, BROADCAST_BUCKET_KEY, settings.broadcast_rate_limit),
+    )
+
+    async with runtime.session_factory() as session:
+        notifier = NotificationService(session, runtime.bot, rate_limiter=rate_limiter)
+        sent = await notifier.run_broadcast_job(job_id)
+
+    logger.info("Broadcast job processed id=%s sent=%s", job_id, sent)
+
+
+@celery_app.task(name="app.jobs.tasks.process_event_deadline")
+def process_event_deadline(event_id: int) -> None:
+    run(_process_event_deadline(get_runtime(), event_id))
+
+
+async def _process_event_deadline(runtime: WorkerRuntime, event_id: int) -> None:
+    # Fired at one of the event's deadlines; a stale ETA (the event was edited since)
+    # simply finds nothing to do.
+    await _process_event_unit(runtime, event_id, datetime.now(tz=UTC))
+    logger.info("Event deadline processed event_id=%s", event_id)
+
+
+async def _process_event_unit(runtime: WorkerRuntime, event_id: int, now: datetime) -> None:
+    # Everything due for one event, in its own session and transaction.
+    async with runtime.session_factory() as session:
+        reg_service = RegistrationService(session)
+        publication_service = PublicationService(session, runtime.bot)
+
+        await reg_service.expire_waitlist_invites(now, event_id=event_id)
+        await reg_service.expire_confirmations(now, event_id=event_id)
+        await publication_service.publish_if_due(event_id, now)
+
+        event = await session.get(Event, event_id)
+        if event and event.status == EventStatus.published:
+            await publication_service.process_event_window_posts(event_id, now)
+            await _process_event(session, runtime.bot, event, now)
+
+        await session.commit()
+
 
 @celery_app.task(name="app.jobs.tasks.process_periodic_workflow")
 def process_periodic_workflow() -> None:
-    asyncio.run(_process_periodic_workflow())
+    run(_run_periodic_workflow_exclusively(get_runtime()))
 
 
-async def _process_periodic_workflow() -> None:
-    settings = get_settings()
-    bot = Bot(token=settings.bot_token)
-    engine = create_async_engine(settings.database_url, pool_pre_ping=True)
-    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+async def _run_periodic_workflow_exclusively(runtime: WorkerRuntime) -> None:
+    # A sweep that outlives the beat interval must not race the next one for the same row locks.
+    async with lease(runtime.redis, PERIODIC_WORKFLOW_LOCK) as lock:
+        if lock is None:
+            skipped = await record_skip(runtime.redis, PERIODIC_WORKFLOW_LOCK)
+            logger.warning(
+                "Periodic workflow is already running; skipped (total skipped=%s)", skipped
+            )
+            return
+        await _process_periodic_workflow(runtime, lock)
 
+
+async def _process_periodic_workflow(runtime: WorkerRuntime, lock: LeaseLock | None = None) -> None:
+    # Reconciliation sweep: catches up on deadlines whose ETA task was lost (worker restart,
+    # broker flush) and schedules the deadlines that came within the dispatch horizon.
     now = datetime.now(tz=UTC)
-    async with session_factory() as session:
-        reg_service = RegistrationService(session)
-        publication_service = PublicationService(session, bot)
+    async with runtime.session_factory() as session:
+        event_ids = await _sweep_event_ids(session, now)
+
+    # Events are independent units: a slow or failing event neither delays nor rolls back others.
+    semaphore = asyncio.Semaphore(max(int(get_settings().workflow_concurrency), 1))
+
+    def lease_lost() -> bool:
+        # Another sweep may hold the lease by now and must not be raced for the same rows.
+        if lock is not None and lock.lost:
+            logger.warning("Periodic workflow lost its lease; stopping")
+            return True
+        return False
+
+    async def process(event_id: int) -> bool:
+        async with semaphore:
+            if lock is not None and lock.lost:
+                return False
+            try:
+                await _process_event_unit(runtime, event_id, now)
+            except Exception:
+                logger.exception("Periodic workflow failed for event_id=%s", event_id)
+                return False
+            return True
+
+    results = await asyncio.gather(*(process(event_id) for event_id in event_ids))
+    if lease_lost():
+        return
+
+    async with runtime.session_factory() as session:
+        drifted = await RegistrationService(session).reconcile_counters(event_ids)
+        await session.commit()
+    if drifted:
+        logger.warning("Registration counters drifted and were recounted event_ids=%s", drifted)
+    if lease_lost():
+        return
 
-        await reg_service.expire_waitlist_invites(now)
-        await reg_service.expire_confirmations(now)
-        published_ids = await publication_service.process_scheduled_publications(now)
-        posted_windows = await publication_service.process_registration_window_posts(now)
+    async with runtime.session_factory() as session:
+        scheduled = await _schedule_upcoming_deadlines(session, now)
+        # Hands resumed and orphaned broadcasts back to the broadcast queue.
+        for job_id in await BroadcastService(session).resumable_job_ids(now):
+            dispatch_broadcast(job_id)
 
-        result = await session.execute(
-            select(Event).where(
-                Event.status == EventStatus.published,
-                Event.start_at > now - timedelta(days=1),
+    logger.info(
+        "Periodic workflow processed events=%s failed=%s deadlines_scheduled=%s",
+        len(event_ids),
+        results.count(False),
+        scheduled,
+    )
+
+
+async def _sweep_event_ids(session: AsyncSession, now: datetime) -> list[int]:
+    result = await session.execute(
+        select(Event.id).where(
+            or_(
+                and_(
+                    Event.status == EventStatus.published,
+                    Event.start_at > now - timedelta(days=1),
+                ),
+                and_(
+                    Event.status == EventStatus.draft,
+                    Event.planned_publish_at.is_not(None),
+                    Event.planned_publish_at <= now,
+                ),
             )
         )
-        events = list(result.scalars().all())
+    )
+    event_ids = set(result.scalars().all())
+    event_ids.update(await RegistrationRepository(session).event_ids_with_due_expiries(now))
+    return sorted(event_ids)
 
-        notifier = NotificationService(session, bot)
 
-        for event in events:
-            if event.start_at - timedelta(hours=24) <= now <= event.start_at - timedelta(hours=12):
-                await reg_service.request_confirmation_for_event(event.id, now)
-                await notifier.notify_confirmations(event.id)
+async def _process_event(session: AsyncSession, bot: Bot, event: Event, now: datetime) -> None:
+    reg_service = RegistrationService(session)
+    notifier = NotificationService(session, bot)
 
-            if event.start_at - timedelta(days=4) <= now <= event.start_at:
-                await notifier.notify_ping_4d(event.id)
+    if event.start_at - timedelta(hours=24) <= now <= event.start_at - timedelta(hours=12):
+        await reg_service.request_confirmation_for_event(event.id, now)
+        await notifier.notify_confirmations(event.id)
 
-            if event.start_at - timedelta(hours=2) <= now <= event.start_at:
-                await notifier.notify_ping_2h(event.id)
+    if event.start_at - timedelta(days=4) <= now <= event.start_at:
+        await notifier.notify_ping_4d(event.id)
 
-            await notifier.notify_waitlist_invites(event.id)
+    if event.start_at - timedelta(hours=2) <= now <= event.start_at:
+        await notifier.notify_ping_2h(event.id)
 
-        await session.commit()
+    await notifier.notify_waitlist_invites(event.id)
 
-    await engine.dispose()
-    await bot.session.close()
-    logger.info(
-        "Periodic workflow processed published=%s window_posts=%s",
-        len(published_ids),
-        len(posted_windows),
+
+async def _schedule_upcoming_deadlines(session: AsyncSession, now: datetime) -> int:
+    until = now + deadline_horizon()
+    result = await session.execute(
+        select(Event).where(
+            or_(
+                Event.status == EventStatus.published,
+                Event.planned_publish_at.is_not(None),
+            ),
+            Event.start_at > now,
+        )
+    )
+    upcoming: dict[int, list[datetime]] = defaultdict(list)
+    for event in result.scalars().all():
+        upcoming[event.id].extend(eta for eta in event_deadlines(event) if now < eta <= until)
+    for event_id, expires_at in await RegistrationRepository(session).upcoming_expiries(now, until):
+        upcoming[event_id].append(expires_at)
+
+    return sum(
+        dispatch_event_deadlines(event_id, etas, now) for event_id, etas in upcoming.items() if etas
     )
@@ -1,7 +1,8 @@
 from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
 from aiogram.utils.keyboard import InlineKeyboardBuilder
 
-from app.models import Event
+from app.models import BroadcastJob, Event
+from app.models.enums import BroadcastJobStatus
 
 
 def events_admin_list_kb(events: list[Event], prefix: str) -> InlineKeyboardMarkup:
@@ -58,3 +59,27 @@ def edit_event_fields_kb(is_team: bool) -> InlineKeyboardMarkup:
     kb.button(text="✅ Готово", callback_data="edit_done")
     kb.adjust(2)
     return kb.as_markup()
+
+
+def broadcast_jobs_kb(jobs: list[BroadcastJob]) -> InlineKeyboardMarkup:
+    kb = InlineKeyboardBuilder()
+    for job in jobs:
+        kb.button(
+            text=f"Рассылка #{job.id} • событие #{job.event_id}",
+            callback_data=f"broadcast_job:{job.id}",
+        )
+    kb.adjust(1)
+    return kb.as_markup()
+
+
+def broadcast_job_actions_kb(job: BroadcastJob) -> InlineKeyboardMarkup:
+    kb = InlineKeyboardBuilder()
+    if job.status in (BroadcastJobStatus.pending, BroadcastJobStatus.running):
+        kb.button(text="⏸ Пауза", callback_data=f"broadcast_pause:{job.id}")
+    if job.status == BroadcastJobStatus.paused:
+        kb.button(text="▶️ Продолжить", callback_data=f"broadcast_resume:{job.id}")
+    if job.status not in (BroadcastJobStatus.completed, BroadcastJobStatus.cancelled):
+        kb.button(text="⛔ Отменить", callback_data=f"broadcast_cancel:{job.id}")
+    kb.button(text="🔄 Обновить", callback_data=f"broadcast_job:{job.id}")
+    kb.adjust(1)
+    return kb.as_markup()
@@ -10,6 +10,7 @@ ADMIN_BTN_EDIT_EVENT = "✏️ Изменить мероприятие"
 ADMIN_BTN_DELETE_EVENT = "🗑️ Удалить мероприятие"
 ADMIN_BTN_SETTINGS = "⚙️ Настройки бота"
 ADMIN_BTN_ADMINS = "👮 Управление админами"
+ADMIN_BTN_BROADCASTS = "📣 Рассылки"
 
 
 def main_menu_kb() -> ReplyKeyboardMarkup:
@@ -30,7 +31,7 @@ def admin_menu_kb() -> ReplyKeyboardMarkup:
             [KeyboardButton(text=ADMIN_BTN_PUBLISH), KeyboardButton(text=ADMIN_BTN_REGISTRATIONS)],
             [KeyboardButton(text=ADMIN_BTN_WAITLIST), KeyboardButton(text=ADMIN_BTN_EXPORT)],
             [KeyboardButton(text=ADMIN_BTN_EDIT_EVENT), KeyboardButton(text=ADMIN_BTN_DELETE_EVENT)],
-            [KeyboardButton(text=ADMIN_BTN_SETTINGS)],
+            [KeyboardButton(text=ADMIN_BTN_SETTINGS), KeyboardButton(text=ADMIN_BTN_BROADCASTS)],
             [KeyboardButton(text=ADMIN_BTN_ADMINS)],
         ],
         resize_keyboard=True,
@@ -4,13 +4,94 @@ import asyncio
 import logging
 
 from aiogram import Bot, Dispatcher
-from aiogram.fsm.storage.memory import MemoryStorage
+from aiogram.webhook.aiohttp_server import SimpleRequestHandler, setup_application
+from aiohttp import web
 
-from app.config import get_settings
+from app.config import Settings, get_settings
+from app.db import AsyncSessionLocal
 from app.handlers.admin import admin_router
 from app.handlers.user import user_router
 from app.logging_config import setup_logging
-from app.middlewares import HideUsedInlineKeyboardMiddleware
+from app.middlewares import DbSessionMiddleware, HideUsedInlineKeyboardMiddleware
+from app.redis import create_sync_redis, get_redis
+from app.repositories.user_cache import user_cache
+from app.services.admin_cache import listen_admin_invalidations
+from app.services.admin_service import admin_cache
+from app.services.event_catalog import event_catalog
+from app.utils.fsm_storage import create_fsm_storage
+
+logger = logging.getLogger(__name__)
+
+
+def create_dispatcher(settings: Settings) -> Dispatcher:
+    dp = Dispatcher(storage=create_fsm_storage(settings))
+    dp.update.outer_middleware(DbSessionMiddleware(AsyncSessionLocal))
+    dp.callback_query.middleware(HideUsedInlineKeyboardMiddleware())
+
+    dp.include_router(admin_router)
+    dp.include_router(user_router)
+
+    background: set[asyncio.Task] = set()
+
+    async def on_startup() -> None:
+        user_cache.attach(get_redis())
+        event_catalog.attach(redis=get_redis(), sync_redis=create_sync_redis())
+        background.add(asyncio.create_task(listen_admin_invalidations(get_redis(), admin_cache)))
+
+    async def on_shutdown() -> None:
+        for task in background:
+            task.cancel()
+
+    dp.startup.register(on_startup)
+    dp.shutdown.register(on_shutdown)
+    return dp
+
+
+def create_webhook_app(
+    dp: Dispatcher,
+    bot: Bot,
+    path: str,
+    secret_token: str | None,
+) -> web.Application:
+    # Updates are acknowledged at once and handled as background tasks, so Telegram (or a load
+    # balancer in front of several replicas) can keep many requests in flight per process.
+    app = web.Application()
+    SimpleRequestHandler(dispatcher=dp, bot=bot, secret_token=secret_token).register(app, path=path)
+    setup_application(app, dp, bot=bot)
+    return app
+
+
+async def run_webhook(dp: Dispatcher, bot: Bot, settings: Settings) -> None:
+    if not settings.webhook_secret:
+        raise RuntimeError("WEBHOOK_SECRET is required in webhook mode")
+
+    if settings.webhook_url:
+        # Every replica registers the same URL on startup; the call is idempotent.
+        async def set_webhook() -> None:
+            await bot.set_webhook(
+                settings.webhook_url.rstrip("/") + settings.webhook_path,
+                secret_token=settings.webhook_secret,
+                allowed_updates=dp.resolve_used_update_types(),
+                max_connections=settings.webhook_max_connections,
+            )
+
+        dp.startup.register(set_webhook)
+
+    app = create_webhook_app(dp, bot, settings.webhook_path, settings.webhook_secret)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    try:
+        await web.TCPSite(runner, settings.webhook_host, settings.webhook_port).start()
+        logger.info(
+            "Bot started: webhook on %s:%s%s",
+            settings.webhook_host,
+            settings.webhook_port,
+            settings.webhook_path,
+        )
+        await asyncio.Event().wait()
+    finally:
+        await runner.cleanup()
+        await bot.session.close()
 
 
 async def main() -> None:
@@ -18,13 +99,13 @@ async def main() -> None:
     setup_logging(settings.log_level)
 
     bot = Bot(token=settings.bot_token)
-    dp = Dispatcher(storage=MemoryStorage())
-    dp.callback_query.middleware(HideUsedInlineKeyboardMiddleware())
+    dp = create_dispatcher(settings)
 
-    dp.include_router(admin_router)
-    dp.include_router(user_router)
+    if settings.bot_mode == "webhook":
+        await run_webhook(dp, bot, settings)
+        return
 
-    logging.getLogger(__name__).info("Bot started")
+    logger.info("Bot started")
     await dp.start_polling(bot)
 
 
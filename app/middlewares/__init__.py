@@ -1,3 +1,4 @@
+from app.middlewares.db_session import DbSessionMiddleware, QueryCounter
 from app.middlewares.hide_used_inline_keyboard import HideUsedInlineKeyboardMiddleware
 
-__all__ = ["HideUsedInlineKeyboardMiddleware"]
+__all__ = ["DbSessionMiddleware", "HideUsedInlineKeyboardMiddleware", "QueryCounter"]
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import logging
+import time
+from collections.abc import Awaitable, Callable
+from contextvars import ContextVar
+from typing import Any
+
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+logger = logging.getLogger(__name__)
+
+
+class QueryCounter:
+    def __init__(self) -> None:
+        self.queries = 0
+
+
+_current_counter: ContextVar[QueryCounter | None] = ContextVar("db_query_counter", default=None)
+_counted_engines: set[int] = set()
+
+
+def _count_query(conn, cursor, statement, parameters, context, executemany) -> None:
+    counter = _current_counter.get()
+    if counter is not None:
+        counter.queries += 1
+
+
+def _count_queries_on(engine: Engine) -> None:
+    if id(engine) not in _counted_engines:
+        event.listen(engine, "before_cursor_execute", _count_query)
+        _counted_engines.add(id(engine))
+
+
+class DbSessionMiddleware(BaseMiddleware):
+    # One session per update, injected into handlers as `session` and committed (or rolled back
+    # on error) once the handler returns. AsyncSession only checks a connection out at its first
+    # statement, so updates that never touch the database do not take one from the pool.
+    def __init__(self, session_factory: async_sessionmaker[AsyncSession]):
+        self.session_factory = session_factory
+        _count_queries_on(session_factory.kw["bind"].sync_engine)
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: dict[str, Any],
+    ) -> Any:
+        counter = QueryCounter()
+        token = _current_counter.set(counter)
+        started = time.perf_counter()
+        try:
+            async with self.session_factory() as session:
+                data["session"] = session
+                data["query_counter"] = counter
+                try:
+                    result = await handler(event, data)
+                    if session.in_transaction():
+                        await session.commit()
+                except Exception:
+                    await session.rollback()
+                    raise
+        finally:
+            _current_counter.reset(token)
+            if counter.queries:
+                logger.debug(
+                    "Update %s: %d queries in %.1f ms",
+                    getattr(event, "update_id", None),
+                    counter.queries,
+                    (time.perf_counter() - started) * 1000,
+                )
+        return result
@@ -1,10 +1,27 @@
 from app.models.base import Base
-from app.models.entities import Admin, Event, NotificationDelivery, Registration, RegistrationPerson, User
-from app.models.enums import DeliveryKind, EventStatus, EventType, PersonRole, RegistrationStatus
+from app.models.entities import (
+    Admin,
+    BroadcastJob,
+    Event,
+    NotificationDelivery,
+    Registration,
+    RegistrationPerson,
+    User,
+)
+from app.models.enums import (
+    BroadcastJobStatus,
+    DeliveryKind,
+    EventStatus,
+    EventType,
+    PersonRole,
+    RegistrationStatus,
+)
 
 __all__ = [
     "Admin",
     "Base",
+    "BroadcastJob",
+    "BroadcastJobStatus",
     "DeliveryKind",
     "Event",
     "EventStatus",
@@ -9,15 +9,24 @@ from sqlalchemy import (
     DateTime,
     Enum,
     ForeignKey,
+    Index,
     Integer,
     String,
     Text,
     UniqueConstraint,
+    text,
 )
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.models.base import Base, TimestampMixin
-from app.models.enums import DeliveryKind, EventStatus, EventType, PersonRole, RegistrationStatus
+from app.models.enums import (
+    BroadcastJobStatus,
+    DeliveryKind,
+    EventStatus,
+    EventType,
+    PersonRole,
+    RegistrationStatus,
+)
 
 
 class User(TimestampMixin, Base):
@@ -84,11 +93,35 @@ class Event(TimestampMixin, Base):
         nullable=True,
     )
 
+    # Denormalized registration counters, maintained by RegistrationService in the same
+    # transaction as every status change; occupied_units counts people for team events.
+    occupied_units: Mapped[int] = mapped_column(Integer, default=0)
+    registered_count: Mapped[int] = mapped_column(Integer, default=0)
+    invited_count: Mapped[int] = mapped_column(Integer, default=0)
+    confirmed_count: Mapped[int] = mapped_column(Integer, default=0)
+    waitlist_count: Mapped[int] = mapped_column(Integer, default=0)
+
     registrations: Mapped[list[Registration]] = relationship(back_populates="event")
 
 
+ACTIVE_REGISTRATION_WHERE = (
+    "status IN ('registered', 'waitlist', 'invited_from_waitlist', 'confirmed')"
+)
+
+
 class Registration(TimestampMixin, Base):
     __tablename__ = "registrations"
+    # At most one active registration per user and event, even for concurrent submissions.
+    __table_args__ = (
+        Index(
+            "uq_registrations_active_user_event",
+            "user_id",
+            "event_id",
+            unique=True,
+            postgresql_where=text(ACTIVE_REGISTRATION_WHERE),
+            sqlite_where=text(ACTIVE_REGISTRATION_WHERE),
+        ),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     event_id: Mapped[int] = mapped_column(ForeignKey("events.id", ondelete="CASCADE"), index=True)
@@ -154,3 +187,43 @@ class NotificationDelivery(TimestampMixin, Base):
     )
     kind: Mapped[DeliveryKind] = mapped_column(Enum(DeliveryKind, name="delivery_kind"), index=True)
     payload_ref: Mapped[str | None] = mapped_column(String(255), nullable=True)
+
+
+class BroadcastJob(TimestampMixin, Base):
+    __tablename__ = "broadcast_jobs"
+    __table_args__ = (Index("ix_broadcast_jobs_event_id_kind", "event_id", "kind"),)
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    event_id: Mapped[int | None] = mapped_column(
+        ForeignKey("events.id", ondelete="CASCADE"), nullable=True
+    )
+    kind: Mapped[DeliveryKind] = mapped_column(Enum(DeliveryKind, name="delivery_kind"))
+    status: Mapped[BroadcastJobStatus] = mapped_column(
+        Enum(BroadcastJobStatus, name="broadcast_job_status"),
+        default=BroadcastJobStatus.pending,
+        index=True,
+    )
+    text: Mapped[str] = mapped_column(Text)
+    photo_file_id: Mapped[str | None] = mapped_column(String(255), nullable=True)
+
+    # Shards of a large broadcast point at their parent job, which only aggregates their counters.
+    parent_id: Mapped[int | None] = mapped_column(
+        ForeignKey("broadcast_jobs.id", ondelete="CASCADE"), nullable=True, index=True
+    )
+
+    # Keyset checkpoint: every user with id <= cursor_user_id has already been processed.
+    cursor_user_id: Mapped[int] = mapped_column(Integer, default=0)
+    # Inclusive upper bound of a shard's user-id range; None means unbounded.
+    user_id_to: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    total_count: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    sent_count: Mapped[int] = mapped_column(Integer, default=0)
+    failed_count: Mapped[int] = mapped_column(Integer, default=0)
+    unreachable_count: Mapped[int] = mapped_column(Integer, default=0)
+
+    # Where the broadcast worker reports progress: the admin chat and the message it keeps editing.
+    admin_chat_id: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
+    progress_message_id: Mapped[int | None] = mapped_column(Integer, nullable=True)
+
+    started_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    heartbeat_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    finished_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
@@ -1,4 +1,4 @@
-from enum import Enum
+from enum import Enum, StrEnum
 
 
 class EventType(str, Enum):
@@ -36,3 +36,11 @@ class DeliveryKind(str, Enum):
     confirmation_24h = "confirmation_24h"
     ping_2h = "ping_2h"
     waitlist_invite = "waitlist_invite"
+
+
+class BroadcastJobStatus(StrEnum):
+    pending = "pending"
+    running = "running"
+    paused = "paused"
+    completed = "completed"
+    cancelled = "cancelled"
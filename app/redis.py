@@ -0,0 +1,27 @@
+from __future__ import annotations
+
+from functools import lru_cache
+
+from redis import Redis as SyncRedis
+from redis.asyncio import Redis
+
+from app.config import get_settings
+
+
+def create_redis() -> Redis:
+    # A client is bound to the event loop it is first used in; Celery tasks create their own.
+    return Redis.from_url(get_settings().redis_url)
+
+
+@lru_cache
+def get_redis() -> Redis:
+    # Shared client of the bot process, which runs everything on one event loop.
+    return create_redis()
+
+
+def create_sync_redis() -> SyncRedis:
+    # For the few writes made from synchronous code such as after-commit callbacks, where a
+    # stalled server must not hold the caller for long.
+    return SyncRedis.from_url(
+        get_settings().redis_url, socket_timeout=1.0, socket_connect_timeout=1.0
+    )
@@ -14,6 +14,10 @@ class AdminRepository:
         result = await self.session.execute(select(Admin.id).where(Admin.tg_id == tg_id))
         return result.scalar_one_or_none() is not None
 
+    async def admin_tg_ids(self) -> set[int]:
+        result = await self.session.execute(select(Admin.tg_id))
+        return set(result.scalars().all())
+
     async def list_admins(self) -> list[Admin]:
         result = await self.session.execute(select(Admin).order_by(Admin.tg_id.asc()))
         return list(result.scalars().all())
@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+from sqlalchemy import and_, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import BroadcastJob
+from app.models.enums import BroadcastJobStatus, DeliveryKind
+
+
+class BroadcastJobRepository:
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def get(self, job_id: int) -> BroadcastJob | None:
+        result = await self.session.execute(select(BroadcastJob).where(BroadcastJob.id == job_id))
+        return result.scalar_one_or_none()
+
+    async def get_locked(self, job_id: int) -> BroadcastJob | None:
+        result = await self.session.execute(
+            select(BroadcastJob).where(BroadcastJob.id == job_id).with_for_update()
+        )
+        return result.scalar_one_or_none()
+
+    async def get_for(self, event_id: int | None, kind: DeliveryKind) -> BroadcastJob | None:
+        result = await self.session.execute(
+            select(BroadcastJob)
+            .where(
+                BroadcastJob.event_id == event_id,
+                BroadcastJob.kind == kind,
+                BroadcastJob.parent_id.is_(None),
+            )
+            .order_by(BroadcastJob.id.asc())
+            .limit(1)
+        )
+        return result.scalar_one_or_none()
+
+    async def add(
+        self,
+        event_id: int | None,
+        kind: DeliveryKind,
+        text: str,
+        photo_file_id: str | None = None,
+        admin_chat_id: int | None = None,
+    ) -> BroadcastJob:
+        job = BroadcastJob(
+            event_id=event_id,
+            kind=kind,
+            status=BroadcastJobStatus.pending,
+            text=text,
+            photo_file_id=photo_file_id,
+            admin_chat_id=admin_chat_id,
+        )
+        self.session.add(job)
+        await self.session.flush()
+        return job
+
+    async def add_shard(
+        self,
+        parent: BroadcastJob,
+        user_id_from: int,
+        user_id_to: int | None,
+    ) -> BroadcastJob:
+        job = BroadcastJob(
+            event_id=parent.event_id,
+            kind=parent.kind,
+            status=BroadcastJobStatus.pending,
+            text=parent.text,
+            photo_file_id=parent.photo_file_id,
+            parent_id=parent.id,
+            cursor_user_id=user_id_from,
+            user_id_to=user_id_to,
+        )
+        self.session.add(job)
+        await self.session.flush()
+        return job
+
+    async def list_shards(self, parent_id: int) -> list[BroadcastJob]:
+        result = await self.session.execute(
+            select(BroadcastJob)
+            .where(BroadcastJob.parent_id == parent_id)
+            .order_by(BroadcastJob.id.asc())
+            # Sibling shards are updated by other workers; never trust the identity map here.
+            .execution_options(populate_existing=True)
+        )
+        return list(result.scalars().all())
+
+    async def list_recent(self, limit: int = 10) -> list[BroadcastJob]:
+        result = await self.session.execute(
+            select(BroadcastJob)
+            .where(BroadcastJob.parent_id.is_(None))
+            .order_by(BroadcastJob.id.desc())
+            .limit(limit)
+        )
+        return list(result.scalars().all())
+
+    async def list_resumable(self, stale_before: datetime) -> list[BroadcastJob]:
+        # Pending jobs plus running jobs whose runner stopped sending heartbeats (crashed worker).
+        result = await self.session.execute(
+            select(BroadcastJob)
+            .where(
+                or_(
+                    BroadcastJob.status == BroadcastJobStatus.pending,
+                    and_(
+                        BroadcastJob.status == BroadcastJobStatus.running,
+                        or_(
+                            BroadcastJob.heartbeat_at.is_(None),
+                            BroadcastJob.heartbeat_at < stale_before,
+                        ),
+                    ),
+                )
+            )
+            .order_by(BroadcastJob.id.asc())
+        )
+        return list(result.scalars().all())
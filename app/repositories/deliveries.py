@@ -1,25 +1,43 @@
 from __future__ import annotations
 
-from sqlalchemy import select
+import time
+from collections.abc import Sequence
+
+from sqlalchemy import ColumnElement, exists
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models import NotificationDelivery
 from app.models.enums import DeliveryKind
 
+DELIVERY_LOG_BATCH_SIZE = 200
+DELIVERY_LOG_FLUSH_SECONDS = 2.0
+
+DeliveryRow = tuple[int, int | None, DeliveryKind]
+
+_UPSERT_INSERTS = {
+    "postgresql": postgresql.insert,
+    "sqlite": sqlite.insert,
+}
+
 
 class DeliveryRepository:
     def __init__(self, session: AsyncSession):
         self.session = session
 
-    async def exists(self, user_id: int, event_id: int | None, kind: DeliveryKind) -> bool:
-        result = await self.session.execute(
-            select(NotificationDelivery.id).where(
-                NotificationDelivery.user_id == user_id,
-                NotificationDelivery.event_id == event_id,
-                NotificationDelivery.kind == kind,
-            )
+    @staticmethod
+    def not_delivered(
+        user_id_column: ColumnElement[int],
+        event_id: int | None,
+        kind: DeliveryKind,
+    ) -> ColumnElement[bool]:
+        # Anti-join filter for recipient queries: NOT EXISTS a delivery for this user.
+        return ~exists().where(
+            NotificationDelivery.user_id == user_id_column,
+            NotificationDelivery.event_id == event_id,
+            NotificationDelivery.kind == kind,
         )
-        return result.scalar_one_or_none() is not None
 
     async def add(
         self,
@@ -37,3 +55,65 @@ class DeliveryRepository:
         self.session.add(item)
         await self.session.flush()
         return item
+
+    async def add_many(self, rows: Sequence[DeliveryRow]) -> None:
+        if not rows:
+            return
+        dialect_name = self.session.get_bind().dialect.name
+        insert = _UPSERT_INSERTS.get(dialect_name)
+        if insert is None:
+            await self._add_each(rows)
+            return
+
+        stmt = (
+            insert(NotificationDelivery)
+            .values(
+                [
+                    {"user_id": user_id, "event_id": event_id, "kind": kind}
+                    for user_id, event_id, kind in rows
+                ]
+            )
+            .on_conflict_do_nothing(index_elements=["user_id", "event_id", "kind"])
+        )
+        await self.session.execute(stmt)
+
+    async def _add_each(self, rows: Sequence[DeliveryRow]) -> None:
+        # Dialects without ON CONFLICT: one savepoint per row, so a duplicate only undoes itself.
+        for user_id, event_id, kind in rows:
+            try:
+                async with self.session.begin_nested():
+                    self.session.add(
+                        NotificationDelivery(user_id=user_id, event_id=event_id, kind=kind)
+                    )
+            except IntegrityError:
+                continue
+
+
+class DeliveryLogBuffer:
+    # Collects successful sends and writes them with one multi-row insert per batch.
+    def __init__(
+        self,
+        repo: DeliveryRepository,
+        batch_size: int = DELIVERY_LOG_BATCH_SIZE,
+        flush_seconds: float = DELIVERY_LOG_FLUSH_SECONDS,
+    ):
+        self.repo = repo
+        self.batch_size = max(batch_size, 1)
+        self.flush_seconds = flush_seconds
+        self._rows: list[DeliveryRow] = []
+        self._first_added_at: float | None = None
+
+    async def add(self, user_id: int, event_id: int | None, kind: DeliveryKind) -> None:
+        if self._first_added_at is None:
+            self._first_added_at = time.monotonic()
+        self._rows.append((user_id, event_id, kind))
+        if (
+            len(self._rows) >= self.batch_size
+            or time.monotonic() - self._first_added_at >= self.flush_seconds
+        ):
+            await self.flush()
+
+    async def flush(self) -> None:
+        rows, self._rows = self._rows, []
+        self._first_added_at = None
+        await self.repo.add_many(rows)
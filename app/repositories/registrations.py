@@ -1,8 +1,9 @@
 from __future__ import annotations
 
 from datetime import datetime
+from typing import NamedTuple
 
-from sqlalchemy import and_, func, or_, select
+from sqlalchemy import Update, and_, case, func, or_, select, union, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
@@ -10,12 +11,41 @@ from app.models import Registration
 from app.models.enums import RegistrationStatus
 
 
+class ExpiredRegistration(NamedTuple):
+    id: int
+    event_id: int
+    team_name: str | None
+
+
+class EventCounters(NamedTuple):
+    occupied_units: int = 0
+    registered_count: int = 0
+    invited_count: int = 0
+    confirmed_count: int = 0
+    waitlist_count: int = 0
+
+
+ACTIVE_STATUSES = (
+    RegistrationStatus.registered,
+    RegistrationStatus.waitlist,
+    RegistrationStatus.invited_from_waitlist,
+    RegistrationStatus.confirmed,
+)
+
 OCCUPYING_STATUSES = (
     RegistrationStatus.registered,
     RegistrationStatus.confirmed,
     RegistrationStatus.invited_from_waitlist,
 )
 
+# Event column holding the number of registrations in each tracked status.
+STATUS_COUNTERS = {
+    RegistrationStatus.registered: "registered_count",
+    RegistrationStatus.invited_from_waitlist: "invited_count",
+    RegistrationStatus.confirmed: "confirmed_count",
+    RegistrationStatus.waitlist: "waitlist_count",
+}
+
 
 class RegistrationRepository:
     def __init__(self, session: AsyncSession):
@@ -56,43 +86,54 @@ class RegistrationRepository:
             select(Registration).where(
                 Registration.user_id == user_id,
                 Registration.event_id == event_id,
-                Registration.status.in_(
-                    (
-                        RegistrationStatus.registered,
-                        RegistrationStatus.waitlist,
-                        RegistrationStatus.invited_from_waitlist,
-                        RegistrationStatus.confirmed,
-                    )
-                ),
+                Registration.status.in_(ACTIVE_STATUSES),
             )
         )
         return result.scalar_one_or_none()
 
-    async def occupied_slots(self, event_id: int) -> int:
-        result = await self.session.execute(
-            select(func.count(Registration.id)).where(
-                Registration.event_id == event_id,
-                Registration.status.in_(OCCUPYING_STATUSES),
-            )
-        )
-        return int(result.scalar_one() or 0)
+    async def counters_for_events(self, event_ids: list[int]) -> dict[int, EventCounters]:
+        # Recount of the denormalized Event counters from scratch, one grouped query for all events.
+        if not event_ids:
+            return {}
+
+        def count(status: RegistrationStatus):
+            return func.coalesce(func.sum(case((Registration.status == status, 1), else_=0)), 0)
 
-    async def occupied_people(self, event_id: int) -> int:
         result = await self.session.execute(
-            select(func.coalesce(func.sum(func.coalesce(Registration.team_size, 1)), 0)).where(
-                Registration.event_id == event_id,
-                Registration.status.in_(OCCUPYING_STATUSES),
+            select(
+                Registration.event_id,
+                func.coalesce(
+                    func.sum(
+                        case(
+                            (
+                                Registration.status.in_(OCCUPYING_STATUSES),
+                                func.coalesce(Registration.team_size, 1),
+                            ),
+                            else_=0,
+                        )
+                    ),
+                    0,
+                ),
+                *(count(status) for status in STATUS_COUNTERS),
             )
+            .where(Registration.event_id.in_(event_ids))
+            .group_by(Registration.event_id)
         )
-        return int(result.scalar_one() or 0)
+        counters = {event_id: EventCounters() for event_id in event_ids}
+        for event_id, *values in result.all():
+            counters[event_id] = EventCounters(*(int(value) for value in values))
+        return counters
 
-    async def first_waitlist(
+    async def waitlist_window(
         self,
         event_id: int,
         *,
         has_team: bool | None = None,
         max_team_size: int | None = None,
-    ) -> Registration | None:
+        limit: int,
+        offset: int = 0,
+    ) -> list[Registration]:
+        # FIFO page of waitlisted registrations, optionally restricted to one category and size.
         stmt = select(Registration).where(
             Registration.event_id == event_id,
             Registration.status == RegistrationStatus.waitlist,
@@ -105,23 +146,53 @@ class RegistrationRepository:
             stmt = stmt.where(func.coalesce(Registration.team_size, 1) <= max_team_size)
 
         result = await self.session.execute(
-            stmt.order_by(Registration.created_at.asc(), Registration.id.asc()).limit(1)
+            stmt.order_by(Registration.created_at.asc(), Registration.id.asc())
+            .limit(limit)
+            .offset(offset)
         )
-        return result.scalar_one_or_none()
+        return list(result.scalars().all())
 
-    async def due_waitlist_timeouts(self, now: datetime) -> list[Registration]:
-        result = await self.session.execute(
-            select(Registration).where(
+    async def invite_from_waitlist(
+        self,
+        registration_ids: list[int],
+        invited_at: datetime,
+        expires_at: datetime,
+    ) -> None:
+        await self.session.execute(
+            update(Registration)
+            .where(Registration.id.in_(registration_ids))
+            .values(
+                status=RegistrationStatus.invited_from_waitlist,
+                waitlist_invited_at=invited_at,
+                waitlist_expires_at=expires_at,
+            )
+            .execution_options(synchronize_session="evaluate")
+        )
+
+    async def expire_due_waitlist_invites(
+        self,
+        now: datetime,
+        event_id: int | None = None,
+    ) -> list[ExpiredRegistration]:
+        stmt = (
+            update(Registration)
+            .where(
                 Registration.status == RegistrationStatus.invited_from_waitlist,
                 Registration.waitlist_expires_at.is_not(None),
                 Registration.waitlist_expires_at <= now,
             )
+            .values(status=RegistrationStatus.auto_declined, waitlist_expires_at=None)
         )
-        return list(result.scalars().all())
+        return await self._expire(stmt, event_id)
 
-    async def due_confirmation_timeouts(self, now: datetime) -> list[Registration]:
-        result = await self.session.execute(
-            select(Registration).where(
+    async def expire_due_confirmations(
+        self,
+        now: datetime,
+        event_id: int | None = None,
+    ) -> list[ExpiredRegistration]:
+        stmt = (
+            update(Registration)
+            .where(
                 Registration.status.in_(
                     (
                         RegistrationStatus.registered,
@@ -132,9 +203,70 @@ class RegistrationRepository:
                 Registration.confirmation_expires_at.is_not(None),
                 Registration.confirmation_expires_at <= now,
             )
+            .values(status=RegistrationStatus.auto_declined, confirmation_expires_at=None)
+        )
+        return await self._expire(stmt, event_id)
+
+    async def _expire(self, stmt: Update, event_id: int | None) -> list[ExpiredRegistration]:
+        # One UPDATE ... RETURNING for the whole batch; "fetch" also refreshes loaded instances.
+        if event_id is not None:
+            stmt = stmt.where(Registration.event_id == event_id)
+        result = await self.session.execute(
+            stmt.returning(
+                Registration.id, Registration.event_id, Registration.team_name
+            ).execution_options(synchronize_session="fetch")
+        )
+        return [ExpiredRegistration(*row) for row in result.all()]
+
+    async def event_ids_with_due_expiries(self, now: datetime) -> list[int]:
+        result = await self.session.execute(
+            select(Registration.event_id)
+            .where(
+                or_(
+                    and_(
+                        Registration.status == RegistrationStatus.invited_from_waitlist,
+                        Registration.waitlist_expires_at <= now,
+                    ),
+                    and_(
+                        Registration.status.in_(
+                            (
+                                RegistrationStatus.registered,
+                                RegistrationStatus.invited_from_waitlist,
+                            )
+                        ),
+                        Registration.confirmation_requested_at.is_not(None),
+                        Registration.confirmation_expires_at <= now,
+                    ),
+                )
+            )
+            .distinct()
         )
         return list(result.scalars().all())
 
+    async def upcoming_expiries(self, now: datetime, until: datetime) -> list[tuple[int, datetime]]:
+        # (event_id, expires_at) pairs of waitlist invites and confirmations that time out soon.
+        waitlist = select(
+            Registration.event_id, Registration.waitlist_expires_at.label("expires_at")
+        ).where(
+            Registration.status == RegistrationStatus.invited_from_waitlist,
+            Registration.waitlist_expires_at > now,
+            Registration.waitlist_expires_at <= until,
+        )
+        confirmation = select(
+            Registration.event_id, Registration.confirmation_expires_at.label("expires_at")
+        ).where(
+            Registration.status.in_(
+                (
+                    RegistrationStatus.registered,
+                    RegistrationStatus.invited_from_waitlist,
+                )
+            ),
+            Registration.confirmation_expires_at > now,
+            Registration.confirmation_expires_at <= until,
+        )
+        result = await self.session.execute(union(waitlist, confirmation))
+        return [(event_id, expires_at) for event_id, expires_at in result.all()]
+
     async def needs_confirmation_for_event(
         self,
         event_id: int,
@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import User
+from app.utils.transactions import on_commit
+
+logger = logging.getLogger(__name__)
+
+USER_CACHE_PREFIX = "hb_bot:user"
+USER_CACHE_REDIS_TTL_SECONDS = 86400
+# Another replica's write-through only reaches this process through Redis, so local copies
+# are short-lived.
+USER_CACHE_LOCAL_TTL_SECONDS = 30.0
+USER_CACHE_LOCAL_SIZE = 10_000
+
+
+@dataclass(frozen=True, slots=True)
+class UserSnapshot:
+    # What most handlers need from a user row. Passport data is deliberately left out: it
+    # must not be copied into Redis, and handlers that show it read the row itself.
+    id: int
+    tg_id: int
+    username: str | None
+    last_name: str | None
+    first_name: str | None
+    middle_name: str | None
+    contact: str | None
+    is_not_mipt: bool | None
+    group_name: str | None
+
+    @classmethod
+    def from_user(cls, user: User) -> UserSnapshot:
+        return cls(
+            id=user.id,
+            tg_id=user.tg_id,
+            username=user.username,
+            last_name=user.last_name,
+            first_name=user.first_name,
+            middle_name=user.middle_name,
+            contact=user.contact,
+            is_not_mipt=user.is_not_mipt,
+            group_name=user.group_name,
+        )
+
+
+class UserCache:
+    # tg_id -> UserSnapshot, in process and, once a Redis client is attached (the bot does it
+    # on startup), shared by all replicas.
+    def __init__(self) -> None:
+        self.redis: Redis | None = None
+        self._local: OrderedDict[int, tuple[float, UserSnapshot]] = OrderedDict()
+        self._writes: set[asyncio.Task] = set()
+
+    def attach(self, redis: Redis | None) -> None:
+        self.redis = redis
+
+    async def get(self, tg_id: int) -> UserSnapshot | None:
+        cached = self._local.get(tg_id)
+        if cached and time.monotonic() - cached[0] < USER_CACHE_LOCAL_TTL_SECONDS:
+            self._local.move_to_end(tg_id)
+            return cached[1]
+        if self.redis is None:
+            return None
+        try:
+            raw = await self.redis.get(self._key(tg_id))
+        except RedisError:
+            return None
+        if raw is None:
+            return None
+        snapshot = UserSnapshot(**json.loads(raw))
+        self._remember_locally(snapshot)
+        return snapshot
+
+    async def populate(self, snapshot: UserSnapshot) -> None:
+        # Filled from a database read that may race with a profile update: NX keeps a newer
+        # write-through value that got there first.
+        self._remember_locally(snapshot)
+        if self.redis is None:
+            return
+        try:
+            await self.redis.set(
+                self._key(snapshot.tg_id),
+                self._dumps(snapshot),
+                nx=True,
+                ex=USER_CACHE_REDIS_TTL_SECONDS,
+            )
+        except RedisError:
+            logger.warning("Cannot cache user %s", snapshot.tg_id)
+
+    def write_through(self, snapshot: UserSnapshot) -> None:
+        self._remember_locally(snapshot)
+        if self.redis is None:
+            return
+        task = asyncio.get_running_loop().create_task(self._write(snapshot))
+        self._writes.add(task)
+        task.add_done_callback(self._writes.discard)
+
+    def clear(self) -> None:
+        self._local.clear()
+
+    async def _write(self, snapshot: UserSnapshot) -> None:
+        try:
+            await self.redis.set(
+                self._key(snapshot.tg_id), self._dumps(snapshot), ex=USER_CACHE_REDIS_TTL_SECONDS
+            )
+        except RedisError:
+            # A stale shared copy must not outlive the update: drop it instead.
+            logger.warning("Cannot write through user %s; dropping the cached copy", snapshot.tg_id)
+            try:
+                await self.redis.delete(self._key(snapshot.tg_id))
+            except RedisError:
+                pass
+
+    def _remember_locally(self, snapshot: UserSnapshot) -> None:
+        self._local[snapshot.tg_id] = (time.monotonic(), snapshot)
+        self._local.move_to_end(snapshot.tg_id)
+        while len(self._local) > USER_CACHE_LOCAL_SIZE:
+            self._local.popitem(last=False)
+
+    @staticmethod
+    def _key(tg_id: int) -> str:
+        return f"{USER_CACHE_PREFIX}:{tg_id}"
+
+    @staticmethod
+    def _dumps(snapshot: UserSnapshot) -> str:
+        return json.dumps(asdict(snapshot), ensure_ascii=False, separators=(",", ":"))
+
+
+user_cache = UserCache()
+
+
+def cache_user_on_commit(session: AsyncSession, user: User) -> None:
+    # The snapshot is taken after the commit, so it carries every change of the transaction.
+    on_commit(session, lambda: user_cache.write_through(UserSnapshot.from_user(user)))
@@ -4,6 +4,7 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models import User
+from app.repositories.user_cache import UserSnapshot, cache_user_on_commit, user_cache
 
 
 class UserRepository:
@@ -14,6 +15,18 @@ class UserRepository:
         result = await self.session.execute(select(User).where(User.tg_id == tg_id))
         return result.scalar_one_or_none()
 
+    async def get_snapshot(self, tg_id: int) -> UserSnapshot | None:
+        # For handlers that only need identity and profile basics; hot users skip the database.
+        snapshot = await user_cache.get(tg_id)
+        if snapshot is not None:
+            return snapshot
+        user = await self.get_by_tg_id(tg_id)
+        if user is None:
+            return None
+        snapshot = UserSnapshot.from_user(user)
+        await user_cache.populate(snapshot)
+        return snapshot
+
     async def get_by_id(self, user_id: int) -> User | None:
         result = await self.session.execute(select(User).where(User.id == user_id))
         return result.scalar_one_or_none()
@@ -33,6 +46,8 @@ class UserRepository:
                 and previous_username != username
             ):
                 user.contact = f"@{username}"
+            if self.session.is_modified(user):
+                cache_user_on_commit(self.session, user)
             return user
 
         user = User(
@@ -43,4 +58,5 @@ class UserRepository:
         )
         self.session.add(user)
         await self.session.flush()
+        cache_user_on_commit(self.session, user)
         return user
@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections.abc import Awaitable, Callable
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+logger = logging.getLogger(__name__)
+
+ADMIN_INVALIDATION_CHANNEL = "hb_bot:admins:invalidate"
+RESUBSCRIBE_DELAY_SECONDS = 5.0
+
+
+class AdminCache:
+    # The admins table as an in-process set, reloaded after `ttl` seconds or on invalidation.
+    # The TTL bounds staleness when an invalidation message is missed.
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._tg_ids: frozenset[int] | None = None
+        self._loaded_at = 0.0
+        self._generation = 0
+
+    async def contains(self, tg_id: int, load: Callable[[], Awaitable[set[int]]]) -> bool:
+        if self._tg_ids is None or time.monotonic() - self._loaded_at >= self.ttl:
+            generation = self._generation
+            tg_ids = frozenset(await load())
+            # An invalidation that arrived during the load means it may already be stale.
+            if generation != self._generation:
+                return tg_id in tg_ids
+            self._tg_ids = tg_ids
+            self._loaded_at = time.monotonic()
+        return tg_id in self._tg_ids
+
+    def invalidate(self) -> None:
+        self._generation += 1
+        self._tg_ids = None
+
+
+async def publish_admin_invalidation(redis: Redis) -> None:
+    try:
+        await redis.publish(ADMIN_INVALIDATION_CHANNEL, b"1")
+    except RedisError:
+        logger.warning("Cannot broadcast admin cache invalidation; other replicas wait for the TTL")
+
+
+async def listen_admin_invalidations(redis: Redis, cache: AdminCache) -> None:
+    # Runs for the lifetime of the bot process. Messages missed while disconnected are covered
+    # by dropping the cache on every (re)subscribe.
+    while True:
+        try:
+            async with redis.pubsub() as pubsub:
+                await pubsub.subscribe(ADMIN_INVALIDATION_CHANNEL)
+                cache.invalidate()
+                async for message in pubsub.listen():
+                    if message["type"] == "message":
+                        cache.invalidate()
+        except RedisError:
+            logger.warning("Admin invalidation subscription lost; resubscribing")
+            await asyncio.sleep(RESUBSCRIBE_DELAY_SECONDS)
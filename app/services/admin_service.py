@@ -1,9 +1,25 @@
 from __future__ import annotations
 
+import asyncio
+
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import get_settings
+from app.redis import get_redis
 from app.repositories.admins import AdminRepository
+from app.services.admin_cache import AdminCache, publish_admin_invalidation
+from app.utils.transactions import on_commit
+
+admin_cache = AdminCache(ttl=get_settings().admin_cache_ttl_seconds)
+_publishing: set[asyncio.Task] = set()
+
+
+def _invalidate_admin_cache() -> None:
+    # Drops this process's copy and tells the other replicas to drop theirs.
+    admin_cache.invalidate()
+    task = asyncio.get_running_loop().create_task(publish_admin_invalidation(get_redis()))
+    _publishing.add(task)
+    task.add_done_callback(_publishing.discard)
 
 
 class AdminService:
@@ -15,7 +31,7 @@ class AdminService:
     async def is_admin(self, tg_id: int) -> bool:
         if tg_id in self.settings.admin_ids or tg_id in self.settings.super_admin_ids:
             return True
-        return await self.repo.is_admin(tg_id)
+        return await admin_cache.contains(tg_id, self.repo.admin_tg_ids)
 
     async def is_super_admin(self, tg_id: int) -> bool:
         return tg_id in self.settings.super_admin_ids
@@ -24,8 +40,12 @@ class AdminService:
         if await self.repo.is_admin(tg_id):
             return
         await self.repo.add_admin(tg_id=tg_id, added_by_tg_id=added_by_tg_id)
+        on_commit(self.session, _invalidate_admin_cache)
 
     async def remove_admin(self, tg_id: int) -> bool:
         if tg_id in self.settings.super_admin_ids:
             return False
-        return await self.repo.delete_admin(tg_id)
+        removed = await self.repo.delete_admin(tg_id)
+        if removed:
+            on_commit(self.session, _invalidate_admin_cache)
+        return removed
@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.models import Registration
+from app.services.registration_service import RegistrationService
+from app.services.schemas import RegistrationInput
+
+logger = logging.getLogger(__name__)
+
+ADMISSION_MAX_BATCH = 50
+
+
+@dataclass
+class _Submission:
+    user_id: int
+    data: RegistrationInput
+    now: datetime
+    future: asyncio.Future[Registration] = field(repr=False)
+
+
+class RegistrationAdmission:
+    # Per-event FIFO queue that admits registrations in group commits. When an event opens, every
+    # create_registration would otherwise wait for the event row lock in its own transaction and
+    # pay its own commit. One drainer task per event takes everything queued so far, admits it in
+    # arrival order inside one transaction and commits once; each submission runs in a savepoint,
+    # so a validation error rejects only that submission.
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        max_batch: int = ADMISSION_MAX_BATCH,
+    ):
+        self.session_factory = session_factory
+        self.max_batch = max(int(max_batch), 1)
+        self._queues: dict[int, deque[_Submission]] = {}
+        self._drainers: dict[int, asyncio.Task[None]] = {}
+
+    async def submit(
+        self,
+        user_id: int,
+        event_id: int,
+        data: RegistrationInput,
+        now: datetime | None = None,
+    ) -> Registration:
+        future: asyncio.Future[Registration] = asyncio.get_running_loop().create_future()
+        submission = _Submission(user_id, data, now or datetime.now(tz=UTC), future)
+        self._queues.setdefault(event_id, deque()).append(submission)
+        if event_id not in self._drainers:
+            self._drainers[event_id] = asyncio.create_task(self._drain(event_id))
+        # The caller may be cancelled (e.g. on shutdown); the admission itself still completes.
+        return await asyncio.shield(future)
+
+    async def _drain(self, event_id: int) -> None:
+        queue = self._queues[event_id]
+        batch: list[_Submission] = []
+        try:
+            while queue:
+                batch = [queue.popleft() for _ in range(min(len(queue), self.max_batch))]
+                await self._admit(event_id, batch)
+        finally:
+            # No await since the loop check, so nothing new can have been queued unless we were
+            # cancelled; the callers of what is left must not wait forever.
+            del self._drainers[event_id]
+            del self._queues[event_id]
+            for item in [*batch, *queue]:
+                if not item.future.done():
+                    item.future.cancel()
+
+    async def _admit(self, event_id: int, batch: list[_Submission]) -> None:
+        outcomes: list[Registration | BaseException] = []
+        try:
+            async with self.session_factory() as session:
+                service = RegistrationService(session)
+                for item in batch:
+                    try:
+                        async with session.begin_nested():
+                            registration = await service.create_registration(
+                                item.user_id, event_id, item.data, now=item.now
+                            )
+                    except Exception as exc:
+                        outcomes.append(exc)
+                    else:
+                        outcomes.append(registration)
+                await session.commit()
+        except Exception as exc:
+            logger.exception("Registration batch failed event_id=%s size=%s", event_id, len(batch))
+            outcomes = [exc] * len(batch)
+
+        for item, outcome in zip(batch, outcomes, strict=True):
+            if item.future.done():
+                continue
+            if isinstance(outcome, BaseException):
+                item.future.set_exception(outcome)
+            else:
+                item.future.set_result(outcome)
@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+from datetime import UTC, datetime
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.jobs.scheduling import schedule_broadcast
+from app.models import BroadcastJob
+from app.models.enums import BroadcastJobStatus
+from app.repositories.broadcast_jobs import BroadcastJobRepository
+from app.services.exceptions import NotFoundError, ValidationError
+from app.services.notification_service import BROADCAST_STALE_AFTER
+
+
+class BroadcastService:
+    def __init__(self, session: AsyncSession):
+        self.session = session
+        self.repo = BroadcastJobRepository(session)
+
+    async def get(self, job_id: int) -> BroadcastJob:
+        job = await self.repo.get(job_id)
+        if not job:
+            raise NotFoundError("Broadcast job not found")
+        return job
+
+    async def list_recent(self, limit: int = 10) -> list[BroadcastJob]:
+        return await self.repo.list_recent(limit)
+
+    async def resumable_job_ids(self, now: datetime | None = None) -> list[int]:
+        now = now or datetime.now(tz=UTC)
+        jobs = await self.repo.list_resumable(stale_before=now - BROADCAST_STALE_AFTER)
+        return [job.id for job in jobs]
+
+    async def pause(self, job_id: int) -> BroadcastJob:
+        job = await self._get_locked(job_id)
+        if job.status not in (BroadcastJobStatus.pending, BroadcastJobStatus.running):
+            raise ValidationError("Only pending or running broadcasts can be paused")
+        for item in [job, *await self.repo.list_shards(job.id)]:
+            if item.status in (BroadcastJobStatus.pending, BroadcastJobStatus.running):
+                item.status = BroadcastJobStatus.paused
+        return job
+
+    async def resume(self, job_id: int) -> BroadcastJob:
+        job = await self._get_locked(job_id)
+        if job.status != BroadcastJobStatus.paused:
+            raise ValidationError("Only paused broadcasts can be resumed")
+        # Each runner continues from its cursor_user_id; a sharded parent only syncs counters.
+        for item in [job, *await self.repo.list_shards(job.id)]:
+            if item.status == BroadcastJobStatus.paused:
+                item.status = BroadcastJobStatus.pending
+                schedule_broadcast(self.session, item.id)
+        return job
+
+    async def cancel(self, job_id: int, now: datetime | None = None) -> BroadcastJob:
+        now = now or datetime.now(tz=UTC)
+        job = await self._get_locked(job_id)
+        if job.status in (BroadcastJobStatus.completed, BroadcastJobStatus.cancelled):
+            raise ValidationError("Broadcast is already finished")
+        for item in [job, *await self.repo.list_shards(job.id)]:
+            if item.status not in (BroadcastJobStatus.completed, BroadcastJobStatus.cancelled):
+                item.status = BroadcastJobStatus.cancelled
+                item.finished_at = now
+        return job
+
+    async def _get_locked(self, job_id: int) -> BroadcastJob:
+        job = await self.repo.get_locked(job_id)
+        if not job:
+            raise NotFoundError("Broadcast job not found")
+        return job
@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import bisect
+import logging
+import time
+from dataclasses import dataclass
+from datetime import UTC, datetime
+
+from aiogram.types import InlineKeyboardMarkup
+from redis import Redis as SyncRedis
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.keyboards.events import events_list_kb
+from app.models import Event
+from app.models.enums import EventStatus
+from app.repositories.events import EventRepository
+from app.utils.text import render_event_card
+
+logger = logging.getLogger(__name__)
+
+CATALOG_VERSION_KEY = "hb_bot:catalog:version"
+# Upper bound on staleness if a version bump could not reach Redis.
+CATALOG_MAX_AGE_SECONDS = 300.0
+
+
+@dataclass(frozen=True, slots=True)
+class CatalogEvent:
+    # What the event list and the event card need, with the card text rendered once.
+    id: int
+    status: EventStatus
+    title: str
+    start_at: datetime
+    registration_start_at: datetime
+    registration_end_at: datetime
+    photo_file_id: str | None
+    card_text: str
+
+    @classmethod
+    def from_event(cls, event: Event) -> CatalogEvent:
+        return cls(
+            id=event.id,
+            status=event.status,
+            title=event.title,
+            start_at=event.start_at,
+            registration_start_at=event.registration_start_at,
+            registration_end_at=event.registration_end_at,
+            photo_file_id=event.photo_file_id,
+            card_text=render_event_card(event),
+        )
+
+
+class Catalog:
+    # Published events that had not started when it was loaded, ordered by start. Events drop
+    # out of the list as they start, without a reload.
+    def __init__(self, version: tuple[int, int] | None, events: list[Event]):
+        self.version = version
+        self.loaded_at = time.monotonic()
+        self.events = [CatalogEvent.from_event(event) for event in events]
+        self._by_id = {event.id: event for event in self.events}
+        self._starts = [event.start_at for event in self.events]
+        self._markups: dict[int, InlineKeyboardMarkup] = {}
+
+    def get(self, event_id: int) -> CatalogEvent | None:
+        return self._by_id.get(event_id)
+
+    def list_markup(self, now: datetime) -> InlineKeyboardMarkup | None:
+        first = bisect.bisect_right(self._starts, now)
+        if first == len(self.events):
+            return None
+        if first not in self._markups:
+            self._markups[first] = events_list_kb(self.events[first:])
+        return self._markups[first]
+
+
+class EventCatalog:
+    # The catalog is rebuilt when the shared version in Redis (bumped after every commit that
+    # changes a published event, from the bot or a worker) or this process's own version moves.
+    def __init__(self) -> None:
+        self.redis: Redis | None = None
+        self.sync_redis: SyncRedis | None = None
+        self._catalog: Catalog | None = None
+        self._local_version = 0
+
+    def attach(self, redis: Redis | None = None, sync_redis: SyncRedis | None = None) -> None:
+        self.redis = redis
+        self.sync_redis = sync_redis
+
+    async def get(self, session: AsyncSession) -> Catalog:
+        version = await self._version()
+        catalog = self._catalog
+        if (
+            version is not None
+            and catalog is not None
+            and catalog.version == version
+            and time.monotonic() - catalog.loaded_at < CATALOG_MAX_AGE_SECONDS
+        ):
+            return catalog
+        events = await EventRepository(session).list_published(datetime.now(tz=UTC))
+        # Labelled with the version read before the load: a bump during it forces a reload.
+        catalog = Catalog(version, events)
+        if version is not None:
+            self._catalog = catalog
+        return catalog
+
+    def invalidate(self) -> None:
+        # Runs after commit, also inside Celery tasks whose loop stops once the task returns, so
+        # the shared bump is a blocking INCR rather than a scheduled coroutine. Admin actions
+        # are rare and the client has short timeouts.
+        self._local_version += 1
+        self._catalog = None
+        if self.sync_redis is None:
+            return
+        try:
+            self.sync_redis.incr(CATALOG_VERSION_KEY)
+        except RedisError:
+            logger.warning("Cannot bump the event catalog version; replicas reload within max age")
+
+    async def _version(self) -> tuple[int, int] | None:
+        if self.redis is None:
+            return 0, self._local_version
+        try:
+            shared = await self.redis.get(CATALOG_VERSION_KEY)
+        except RedisError:
+            # Without the shared version the cache cannot be trusted; read the database.
+            return None
+        return int(shared or 0), self._local_version
+
+
+event_catalog = EventCatalog()
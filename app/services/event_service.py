@@ -5,10 +5,13 @@ from datetime import UTC, datetime
 from sqlalchemy import delete, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.jobs.scheduling import schedule_event_deadlines
 from app.models import Event
 from app.models.enums import EventStatus, EventType
+from app.services.event_catalog import event_catalog
 from app.services.exceptions import NotFoundError, ValidationError
 from app.services.schemas import EventCreateInput
+from app.utils.transactions import on_commit
 
 
 class EventService:
@@ -34,6 +37,7 @@ class EventService:
         )
         self.session.add(event)
         await self.session.flush()
+        schedule_event_deadlines(self.session, event)
         return event
 
     async def get(self, event_id: int) -> Event | None:
@@ -58,6 +62,8 @@ class EventService:
         self._validate_existing(event)
         event.status = EventStatus.published
         event.published_at = now
+        schedule_event_deadlines(self.session, event)
+        on_commit(self.session, event_catalog.invalidate)
         return event
 
     async def archive(self, event_id: int) -> Event:
@@ -65,12 +71,14 @@ class EventService:
         if not event:
             raise NotFoundError("Event not found")
         event.status = EventStatus.archived
+        on_commit(self.session, event_catalog.invalidate)
         return event
 
     async def delete(self, event_id: int) -> None:
         result = await self.session.execute(delete(Event).where(Event.id == event_id))
         if not result.rowcount:
             raise NotFoundError("Event not found")
+        on_commit(self.session, event_catalog.invalidate)
 
     async def update_fields(self, event_id: int, updates: dict[str, object]) -> Event:
         if not updates:
@@ -103,6 +111,8 @@ class EventService:
             setattr(event, field_name, value)
 
         self._validate_existing(event)
+        schedule_event_deadlines(self.session, event)
+        on_commit(self.session, event_catalog.invalidate)
         return event
 
     async def schedule_publish(self, event_id: int, publish_at: datetime) -> Event:
@@ -115,6 +125,7 @@ class EventService:
         if event.status != EventStatus.draft:
             raise ValidationError("Only draft events can be scheduled")
         event.planned_publish_at = publish_at
+        schedule_event_deadlines(self.session, event)
         return event
 
     def _validate_payload(self, payload: EventCreateInput) -> None:
@@ -2,6 +2,8 @@ from __future__ import annotations
 
 import asyncio
 import logging
+from collections.abc import Awaitable, Callable
+from datetime import UTC, datetime, timedelta
 
 from aiogram import Bot
 from aiogram.exceptions import (
@@ -10,28 +12,57 @@ from aiogram.exceptions import (
     TelegramRetryAfter,
 )
 from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
-from sqlalchemy import select
-from sqlalchemy.exc import IntegrityError
+from sqlalchemy import ColumnElement, Select, func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import get_settings
-from app.models import Event, Registration, User
-from app.models.enums import DeliveryKind, RegistrationStatus
-from app.repositories.deliveries import DeliveryRepository
-from app.utils.text import NOT_MIPT_REG_NOTE, format_dt_tz, render_event_card
+from app.jobs.scheduling import schedule_broadcast
+from app.models import BroadcastJob, Event, Registration, User
+from app.models.enums import BroadcastJobStatus, DeliveryKind, RegistrationStatus
+from app.repositories.broadcast_jobs import BroadcastJobRepository
+from app.repositories.deliveries import DeliveryLogBuffer, DeliveryRepository
+from app.utils.rate_limit import SendRateLimiter
+from app.utils.text import NOT_MIPT_REG_NOTE, format_dt_tz, render_broadcast_job, render_event_card
 
 logger = logging.getLogger(__name__)
 
+BROADCAST_PAGE_SIZE = 500
+BROADCAST_STALE_AFTER = timedelta(minutes=5)
+
 
 class NotificationService:
-    def __init__(self, session: AsyncSession, bot: Bot):
+    def __init__(
+        self,
+        session: AsyncSession,
+        bot: Bot,
+        rate_limiter: SendRateLimiter | None = None,
+    ):
         self.session = session
         self.bot = bot
         self.settings = get_settings()
         self.delivery_repo = DeliveryRepository(session)
+        self.delivery_log = DeliveryLogBuffer(self.delivery_repo)
+        self.broadcast_repo = BroadcastJobRepository(session)
+        self.rate_limiter = rate_limiter or SendRateLimiter(
+            rate=self.settings.broadcast_rate_limit,
+            per_chat_interval=self.settings.per_chat_send_interval_seconds,
+        )
 
     async def notify_new_event(self, event: Event) -> int:
-        return await self._broadcast_all_users(
+        job = await self.queue_new_event(event)
+        return await self.run_broadcast_job(job.id)
+
+    async def notify_registration_started(self, event: Event) -> int:
+        job = await self.queue_registration_started(event)
+        return await self.run_broadcast_job(job.id)
+
+    async def notify_registration_ends_soon(self, event: Event) -> int:
+        job = await self.queue_registration_ends_soon(event)
+        return await self.run_broadcast_job(job.id)
+
+    # queue_* only persist the broadcast job; the broadcast worker sends it once the caller commits.
+    async def queue_new_event(self, event: Event, admin_chat_id: int | None = None) -> BroadcastJob:
+        return await self._queue_broadcast(
             event=event,
             kind=DeliveryKind.new_event,
             text=(
@@ -39,12 +70,12 @@ class NotificationService:
                 f"{render_event_card(event)}\n\n"
                 "Жми «Открыть мероприятие», чтобы посмотреть детали и зарегистрироваться."
             ),
-            markup=self._event_cta(event.id),
             photo_file_id=event.photo_file_id,
+            admin_chat_id=admin_chat_id,
         )
 
-    async def notify_registration_started(self, event: Event) -> int:
-        return await self._broadcast_all_users(
+    async def queue_registration_started(self, event: Event) -> BroadcastJob:
+        return await self._queue_broadcast(
             event=event,
             kind=DeliveryKind.registration_started,
             text=(
@@ -52,11 +83,10 @@ class NotificationService:
                 f"Регистрация открыта до {format_dt_tz(event.registration_end_at)}.\n\n"
                 f"{NOT_MIPT_REG_NOTE}"
             ),
-            markup=self._event_cta(event.id),
         )
 
-    async def notify_registration_ends_soon(self, event: Event) -> int:
-        return await self._broadcast_all_users(
+    async def queue_registration_ends_soon(self, event: Event) -> BroadcastJob:
+        return await self._queue_broadcast(
             event=event,
             kind=DeliveryKind.registration_ends_soon,
             text=(
@@ -64,30 +94,20 @@ class NotificationService:
                 "Если планируешь участвовать, лучше зарегистрироваться сейчас.\n\n"
                 f"{NOT_MIPT_REG_NOTE}"
             ),
-            markup=self._event_cta(event.id),
         )
 
     async def notify_waitlist_invites(self, event_id: int) -> int:
         event = await self.session.get(Event, event_id)
         event_title = event.title if event else "мероприятие"
 
-        result = await self.session.execute(
-            select(Registration)
-            .join(User, User.id == Registration.user_id)
-            .where(
-                Registration.event_id == event_id,
-                Registration.status == RegistrationStatus.invited_from_waitlist,
-            )
+        recipients = await self._pending_recipients(
+            event_id,
+            DeliveryKind.waitlist_invite,
+            Registration.status == RegistrationStatus.invited_from_waitlist,
         )
-        registrations = list(result.scalars().all())
 
         sent = 0
-        for registration in registrations:
-            user = await self.session.get(User, registration.user_id)
-            if not user or not user.is_reachable:
-                continue
-            if await self.delivery_repo.exists(user.id, event_id, DeliveryKind.waitlist_invite):
-                continue
+        for registration, user in recipients:
             ok = await self._safe_send(
                 user,
                 text=(
@@ -114,35 +134,28 @@ class NotificationService:
             await self._log_delivery(user.id, event_id, DeliveryKind.waitlist_invite)
             sent += 1
 
+        await self.delivery_log.flush()
         return sent
 
     async def notify_confirmations(self, event_id: int) -> int:
         event = await self.session.get(Event, event_id)
         event_title = event.title if event else "мероприятие"
 
-        result = await self.session.execute(
-            select(Registration).where(
-                Registration.event_id == event_id,
-                Registration.confirmation_requested_at.is_not(None),
-                Registration.status.in_(
-                    (
-                        RegistrationStatus.registered,
-                        RegistrationStatus.invited_from_waitlist,
-                        RegistrationStatus.confirmed,
-                    )
-                ),
-            )
+        recipients = await self._pending_recipients(
+            event_id,
+            DeliveryKind.confirmation_24h,
+            Registration.confirmation_requested_at.is_not(None),
+            Registration.status.in_(
+                (
+                    RegistrationStatus.registered,
+                    RegistrationStatus.invited_from_waitlist,
+                    RegistrationStatus.confirmed,
+                )
+            ),
         )
-        registrations = list(result.scalars().all())
 
         sent = 0
-        for registration in registrations:
-            user = await self.session.get(User, registration.user_id)
-            if not user or not user.is_reachable:
-                continue
-            if await self.delivery_repo.exists(user.id, event_id, DeliveryKind.confirmation_24h):
-                continue
-
+        for registration, user in recipients:
             ok = await self._safe_send(
                 user,
                 text=(
@@ -169,24 +182,18 @@ class NotificationService:
             await self._log_delivery(user.id, event_id, DeliveryKind.confirmation_24h)
             sent += 1
 
+        await self.delivery_log.flush()
         return sent
 
     async def notify_ping_2h(self, event_id: int) -> int:
-        result = await self.session.execute(
-            select(Registration).where(
-                Registration.event_id == event_id,
-                Registration.status == RegistrationStatus.confirmed,
-            )
+        recipients = await self._pending_recipients(
+            event_id,
+            DeliveryKind.ping_2h,
+            Registration.status == RegistrationStatus.confirmed,
         )
-        registrations = list(result.scalars().all())
 
         sent = 0
-        for registration in registrations:
-            user = await self.session.get(User, registration.user_id)
-            if not user or not user.is_reachable:
-                continue
-            if await self.delivery_repo.exists(user.id, event_id, DeliveryKind.ping_2h):
-                continue
+        for _, user in recipients:
             ok = await self._safe_send(
                 user,
                 text="⏰ Напоминание: до мероприятия осталось 2 часа.",
@@ -197,33 +204,25 @@ class NotificationService:
             await self._log_delivery(user.id, event_id, DeliveryKind.ping_2h)
             sent += 1
 
+        await self.delivery_log.flush()
         return sent
 
     async def notify_ping_4d(self, event_id: int) -> int:
-        result = await self.session.execute(
-            select(Registration)
-            .where(
-                Registration.event_id == event_id,
-                Registration.status.in_(
-                    (
-                        RegistrationStatus.registered,
-                        RegistrationStatus.invited_from_waitlist,
-                        RegistrationStatus.confirmed,
-                    )
-                ),
-                Registration.has_not_mipt_members.is_(True),
-            )
-            .distinct()
+        recipients = await self._pending_recipients(
+            event_id,
+            DeliveryKind.ping_4d,
+            Registration.status.in_(
+                (
+                    RegistrationStatus.registered,
+                    RegistrationStatus.invited_from_waitlist,
+                    RegistrationStatus.confirmed,
+                )
+            ),
+            Registration.has_not_mipt_members.is_(True),
         )
-        registrations = list(result.scalars().all())
 
         sent = 0
-        for registration in registrations:
-            user = await self.session.get(User, registration.user_id)
-            if not user or not user.is_reachable:
-                continue
-            if await self.delivery_repo.exists(user.id, event_id, DeliveryKind.ping_4d):
-                continue
+        for _, user in recipients:
             ok = await self._safe_send(
                 user,
                 text="🛂 Проверь паспортные данные для оформления проходки.",
@@ -234,37 +233,264 @@ class NotificationService:
             await self._log_delivery(user.id, event_id, DeliveryKind.ping_4d)
             sent += 1
 
+        await self.delivery_log.flush()
         return sent
 
-    async def _broadcast_all_users(
+    async def _pending_recipients(
+        self,
+        event_id: int,
+        kind: DeliveryKind,
+        *criteria: ColumnElement[bool],
+    ) -> list[tuple[Registration, User]]:
+        result = await self.session.execute(
+            select(Registration, User)
+            .join(User, User.id == Registration.user_id)
+            .where(
+                Registration.event_id == event_id,
+                User.is_reachable.is_(True),
+                self.delivery_repo.not_delivered(User.id, event_id, kind),
+                *criteria,
+            )
+            .order_by(Registration.created_at.asc(), Registration.id.asc())
+        )
+        # One message per user and kind, even if the user has several matching registrations.
+        recipients: dict[int, tuple[Registration, User]] = {}
+        for registration, user in result.all():
+            recipients.setdefault(user.id, (registration, user))
+        return list(recipients.values())
+
+    async def run_broadcast_job(self, job_id: int) -> int:
+        # Commits after every page so a restarted worker resumes from the stored cursor.
+        now = datetime.now(tz=UTC)
+        job = await self.broadcast_repo.get_locked(job_id)
+        if not job or not self._can_claim_broadcast(job, now):
+            # Releases the row lock; nothing was changed.
+            await self.session.commit()
+            return 0
+
+        job.status = BroadcastJobStatus.running
+        job.started_at = job.started_at or now
+        job.heartbeat_at = now
+        if job.total_count is None:
+            job.total_count = await self._count_broadcast_recipients(job)
+        await self.session.commit()
+
+        shards = await self.broadcast_repo.list_shards(job.id)
+        if not shards and self._should_shard_broadcast(job):
+            shards = await self._split_broadcast(job)
+        if shards:
+            # A sharded job sends nothing itself: its shards run as separate broadcast tasks,
+            # dispatched by _split_broadcast when they are created.
+            await self._sync_broadcast_parent(job.id)
+            return 0
+        await self._report_broadcast_progress(job)
+
+        markup = self._event_cta(job.event_id) if job.event_id else self._my_regs_cta()
+        sent_total = 0
+        while True:
+            await self.session.refresh(job, attribute_names=["status"])
+            if job.status != BroadcastJobStatus.running:
+                break
+
+            users = await self._next_broadcast_page(job)
+            if not users:
+                job.status = BroadcastJobStatus.completed
+                job.finished_at = datetime.now(tz=UTC)
+                await self.session.commit()
+                await self._report_broadcast_progress(job)
+                break
+
+            results = await self._send_concurrently(
+                users,
+                lambda user: self._safe_send(
+                    user=user,
+                    text=job.text,
+                    markup=markup,
+                    photo_file_id=job.photo_file_id,
+                ),
+            )
+            # Delivery log writes stay sequential: the session must not be shared between senders.
+            sent = unreachable = 0
+            for user, ok in zip(users, results, strict=True):
+                if ok:
+                    await self._log_delivery(user_id=user.id, event_id=job.event_id, kind=job.kind)
+                    sent += 1
+                elif not user.is_reachable:
+                    unreachable += 1
+            await self.delivery_log.flush()
+
+            job.cursor_user_id = users[-1].id
+            job.sent_count += sent
+            job.unreachable_count += unreachable
+            job.failed_count += len(users) - sent - unreachable
+            job.heartbeat_at = datetime.now(tz=UTC)
+            await self.session.commit()
+            await self._report_broadcast_progress(job)
+            sent_total += sent
+
+        logger.info(
+            "Broadcast job id=%s kind=%s status=%s sent=%s failed=%s unreachable=%s",
+            job.id,
+            job.kind.value,
+            job.status.value,
+            job.sent_count,
+            job.failed_count,
+            job.unreachable_count,
+        )
+        return sent_total
+
+    async def _queue_broadcast(
         self,
         event: Event,
         kind: DeliveryKind,
         text: str,
-        markup: InlineKeyboardMarkup,
         photo_file_id: str | None = None,
-    ) -> int:
-        users_result = await self.session.execute(select(User).where(User.is_reachable.is_(True)))
-        users = list(users_result.scalars().all())
-        sent = 0
-
-        for user in users:
-            if await self.delivery_repo.exists(user.id, event.id, kind):
-                continue
-
-            ok = await self._safe_send(
-                user=user,
+        admin_chat_id: int | None = None,
+    ) -> BroadcastJob:
+        job = await self.broadcast_repo.get_for(event.id, kind)
+        if job is None:
+            job = await self.broadcast_repo.add(
+                event_id=event.id,
+                kind=kind,
                 text=text,
-                markup=markup,
                 photo_file_id=photo_file_id,
+                admin_chat_id=admin_chat_id,
             )
-            if ok:
-                await self._log_delivery(user_id=user.id, event_id=event.id, kind=kind)
-                sent += 1
+            schedule_broadcast(self.session, job.id)
+        return job
 
-            await self._throttle_mass_send()
+    @staticmethod
+    def _can_claim_broadcast(job: BroadcastJob, now: datetime) -> bool:
+        # The queue may deliver the same job twice (dispatch + sweep); a fresh heartbeat means
+        # another worker is already sending it.
+        if job.status == BroadcastJobStatus.pending:
+            return True
+        if job.status != BroadcastJobStatus.running:
+            return False
+        return job.heartbeat_at is None or job.heartbeat_at < now - BROADCAST_STALE_AFTER
+
+    def _should_shard_broadcast(self, job: BroadcastJob) -> bool:
+        shards = int(self.settings.broadcast_shards)
+        return (
+            job.parent_id is None
+            and shards > 1
+            and (job.total_count or 0) >= max(int(self.settings.broadcast_shard_min_users), shards)
+        )
 
-        return sent
+    async def _split_broadcast(self, job: BroadcastJob) -> list[BroadcastJob]:
+        # ntile() splits the remaining recipients into equally sized user-id ranges.
+        ranked = (
+            select(
+                User.id.label("user_id"),
+                func.ntile(int(self.settings.broadcast_shards)).over(order_by=User.id.asc()).label("shard"),
+            )
+            .where(*self._broadcast_criteria(job))
+            .subquery()
+        )
+        result = await self.session.execute(
+            select(func.max(ranked.c.user_id)).group_by(ranked.c.shard).order_by(ranked.c.shard)
+        )
+        upper_bounds = list(result.scalars().all())
+
+        shards: list[BroadcastJob] = []
+        lower = job.cursor_user_id
+        for index, upper in enumerate(upper_bounds):
+            # The last shard stays open-ended so users who joined after the split still get
+            # the message.
+            is_last = index == len(upper_bounds) - 1
+            shards.append(
+                await self.broadcast_repo.add_shard(
+                    job, user_id_from=lower, user_id_to=None if is_last else upper
+                )
+            )
+            lower = upper
+            schedule_broadcast(self.session, shards[-1].id)
+        await self.session.commit()
+        logger.info("Broadcast job id=%s split into %s shards", job.id, len(shards))
+        return shards
+
+    async def _sync_broadcast_parent(self, parent_id: int) -> None:
+        parent = await self.broadcast_repo.get_locked(parent_id)
+        if parent is None:
+            return
+        # Admins pause or cancel the parent from another session.
+        await self.session.refresh(parent, attribute_names=["status"])
+        shards = await self.broadcast_repo.list_shards(parent_id)
+        parent.total_count = sum(shard.total_count or 0 for shard in shards)
+        parent.sent_count = sum(shard.sent_count for shard in shards)
+        parent.failed_count = sum(shard.failed_count for shard in shards)
+        parent.unreachable_count = sum(shard.unreachable_count for shard in shards)
+        now = datetime.now(tz=UTC)
+        if parent.status == BroadcastJobStatus.running:
+            parent.heartbeat_at = now
+            finished = (BroadcastJobStatus.completed, BroadcastJobStatus.cancelled)
+            if all(shard.status in finished for shard in shards):
+                parent.status = BroadcastJobStatus.completed
+                parent.finished_at = now
+        await self.session.commit()
+        await self._report_broadcast_progress(parent)
+
+    async def _report_broadcast_progress(self, job: BroadcastJob) -> None:
+        if job.parent_id is not None:
+            await self._sync_broadcast_parent(job.parent_id)
+            return
+        if job.admin_chat_id is None:
+            return
+        text = render_broadcast_job(job)
+        try:
+            if job.progress_message_id is None:
+                message = await self.bot.send_message(chat_id=job.admin_chat_id, text=text)
+                job.progress_message_id = message.message_id
+                await self.session.commit()
+            else:
+                await self.bot.edit_message_text(
+                    text=text,
+                    chat_id=job.admin_chat_id,
+                    message_id=job.progress_message_id,
+                )
+        except TelegramBadRequest:
+            # "message is not modified" or the admin deleted the progress message.
+            pass
+        except Exception:
+            logger.exception("Cannot report broadcast progress job_id=%s", job.id)
+
+    def _broadcast_criteria(self, job: BroadcastJob) -> list[ColumnElement[bool]]:
+        criteria = [
+            User.is_reachable.is_(True),
+            User.id > job.cursor_user_id,
+            self.delivery_repo.not_delivered(User.id, job.event_id, job.kind),
+        ]
+        if job.user_id_to is not None:
+            criteria.append(User.id <= job.user_id_to)
+        return criteria
+
+    def _broadcast_recipients(self, job: BroadcastJob) -> Select:
+        return select(User).where(*self._broadcast_criteria(job))
+
+    async def _count_broadcast_recipients(self, job: BroadcastJob) -> int:
+        result = await self.session.execute(
+            select(func.count()).select_from(self._broadcast_recipients(job).subquery())
+        )
+        return int(result.scalar_one())
+
+    async def _next_broadcast_page(self, job: BroadcastJob) -> list[User]:
+        result = await self.session.execute(
+            self._broadcast_recipients(job).order_by(User.id.asc()).limit(BROADCAST_PAGE_SIZE)
+        )
+        return list(result.scalars().all())
+
+    async def _send_concurrently(
+        self,
+        users: list[User],
+        send: Callable[[User], Awaitable[bool]],
+    ) -> list[bool]:
+        semaphore = asyncio.Semaphore(max(int(self.settings.broadcast_concurrency), 1))
+
+        async def worker(user: User) -> bool:
+            async with semaphore:
+                return await send(user)
+
+        return list(await asyncio.gather(*(worker(user) for user in users)))
 
     async def _safe_send(
         self,
@@ -276,6 +502,7 @@ class NotificationService:
     ) -> bool:
         if photo_file_id:
             try:
+                await self.rate_limiter.acquire(user.tg_id)
                 await self.bot.send_photo(
                     chat_id=user.tg_id,
                     photo=photo_file_id,
@@ -290,8 +517,8 @@ class NotificationService:
                     user.tg_id,
                     wait_seconds,
                 )
+                await self.rate_limiter.pause(wait_seconds)
                 if retry_on_flood:
-                    await asyncio.sleep(wait_seconds)
                     return await self._safe_send(
                         user=user,
                         text=text,
@@ -310,6 +537,7 @@ class NotificationService:
                 logger.exception("Unexpected telegram photo send error tg_id=%s", user.tg_id)
 
         try:
+            await self.rate_limiter.acquire(user.tg_id)
             await self.bot.send_message(chat_id=user.tg_id, text=text, reply_markup=markup)
             return True
         except TelegramRetryAfter as exc:
@@ -319,9 +547,9 @@ class NotificationService:
                 user.tg_id,
                 wait_seconds,
             )
+            await self.rate_limiter.pause(wait_seconds)
             if not retry_on_flood:
                 return False
-            await asyncio.sleep(wait_seconds)
             return await self._safe_send(
                 user=user,
                 text=text,
@@ -336,18 +564,8 @@ class NotificationService:
             logger.exception("Unexpected telegram send error tg_id=%s", user.tg_id)
             return False
 
-    async def _throttle_mass_send(self) -> None:
-        delay = max(float(self.settings.mass_send_delay_seconds), 0.0)
-        if delay > 0:
-            await asyncio.sleep(delay)
-
     async def _log_delivery(self, user_id: int, event_id: int | None, kind: DeliveryKind) -> None:
-        async with self.session.begin_nested():
-            try:
-                await self.delivery_repo.add(user_id=user_id, event_id=event_id, kind=kind)
-                await self.session.flush()
-            except IntegrityError:
-                pass
+        await self.delivery_log.add(user_id=user_id, event_id=event_id, kind=kind)
 
     @staticmethod
     def _event_cta(event_id: int) -> InlineKeyboardMarkup:
@@ -4,6 +4,7 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models import User
+from app.repositories.user_cache import cache_user_on_commit
 from app.services.exceptions import NotFoundError
 from app.services.schemas import PersonInput
 
@@ -35,6 +36,7 @@ class ProfileService:
             user.passport_series = None
             user.passport_number = None
             user.passport_issue_date = None
+        cache_user_on_commit(self.session, user)
         return user
 
     async def clear(self, user_id: int) -> User:
@@ -48,4 +50,5 @@ class ProfileService:
         user.passport_series = None
         user.passport_number = None
         user.passport_issue_date = None
+        cache_user_on_commit(self.session, user)
         return user
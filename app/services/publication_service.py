@@ -21,7 +21,7 @@ logger = logging.getLogger(__name__)
 class PublishResult:
     event: Event
     published_now: bool
-    notifications_sent: int
+    broadcast_job_id: int | None = None
 
 
 class PublicationService:
@@ -29,7 +29,12 @@ class PublicationService:
         self.session = session
         self.bot = bot
 
-    async def publish_event(self, event_id: int, now: datetime | None = None) -> PublishResult:
+    async def publish_event(
+        self,
+        event_id: int,
+        now: datetime | None = None,
+        admin_chat_id: int | None = None,
+    ) -> PublishResult:
         now = now or datetime.now(tz=UTC)
         result = await self.session.execute(
             select(Event).where(Event.id == event_id).with_for_update()
@@ -39,7 +44,7 @@ class PublicationService:
             raise NotFoundError("Event not found")
 
         if event.status == EventStatus.published:
-            return PublishResult(event=event, published_now=False, notifications_sent=0)
+            return PublishResult(event=event, published_now=False)
 
         event = await EventService(self.session).publish(event_id=event_id, now=now)
 
@@ -47,8 +52,25 @@ class PublicationService:
         # all notifications are delivered only in direct messages.
 
         event.planned_publish_at = None
-        sent = await NotificationService(self.session, self.bot).notify_new_event(event)
-        return PublishResult(event=event, published_now=True, notifications_sent=sent)
+        # The broadcast itself runs on the broadcast queue once the caller commits.
+        job = await NotificationService(self.session, self.bot).queue_new_event(
+            event, admin_chat_id=admin_chat_id
+        )
+        return PublishResult(event=event, published_now=True, broadcast_job_id=job.id)
+
+    async def publish_if_due(
+        self, event_id: int, now: datetime | None = None
+    ) -> PublishResult | None:
+        now = now or datetime.now(tz=UTC)
+        event = await self.session.get(Event, event_id)
+        if (
+            not event
+            or event.status != EventStatus.draft
+            or event.planned_publish_at is None
+            or event.planned_publish_at > now
+        ):
+            return None
+        return await self.publish_event(event_id=event_id, now=now)
 
     async def process_scheduled_publications(self, now: datetime | None = None) -> list[int]:
         now = now or datetime.now(tz=UTC)
@@ -80,11 +102,11 @@ class PublicationService:
 
         posted: list[tuple[int, str]] = []
         for event_id in event_ids:
-            status = await self._process_single_event_window_post(event_id=event_id, now=now)
+            status = await self.process_event_window_posts(event_id=event_id, now=now)
             posted.extend((event_id, item) for item in status)
         return posted
 
-    async def _process_single_event_window_post(self, event_id: int, now: datetime) -> list[str]:
+    async def process_event_window_posts(self, event_id: int, now: datetime) -> list[str]:
         result = await self.session.execute(
             select(Event).where(Event.id == event_id).with_for_update()
         )
@@ -100,11 +122,11 @@ class PublicationService:
             and event.registration_start_at <= now <= event.registration_end_at
         ):
             event.registration_open_notified_at = now
-            sent = await notifier.notify_registration_started(event)
+            job = await notifier.queue_registration_started(event)
             logger.info(
-                "Registration started notifications event_id=%s users_sent=%s",
+                "Registration started broadcast queued event_id=%s job_id=%s",
                 event.id,
-                sent,
+                job.id,
             )
             posted.append("registration_open")
 
@@ -113,11 +135,11 @@ class PublicationService:
             and event.registration_end_at - timedelta(hours=1) <= now < event.registration_end_at
         ):
             event.registration_close_soon_notified_at = now
-            sent = await notifier.notify_registration_ends_soon(event)
+            job = await notifier.queue_registration_ends_soon(event)
             logger.info(
-                "Registration ending soon notifications event_id=%s users_sent=%s",
+                "Registration ending soon broadcast queued event_id=%s job_id=%s",
                 event.id,
-                sent,
+                job.id,
             )
             posted.append("registration_close_soon")
 
@@ -4,16 +4,28 @@ from collections import defaultdict
 from datetime import UTC, datetime, timedelta
 
 from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
+from sqlalchemy.orm.attributes import set_committed_value
 
 from app.config import get_settings
+from app.jobs.scheduling import schedule_deadlines
 from app.models import Event, Registration, RegistrationPerson, User
 from app.models.enums import EventStatus, EventType, PersonRole, RegistrationStatus
-from app.repositories.registrations import RegistrationRepository
+from app.repositories.registrations import (
+    ACTIVE_STATUSES,
+    OCCUPYING_STATUSES,
+    STATUS_COUNTERS,
+    EventCounters,
+    ExpiredRegistration,
+    RegistrationRepository,
+)
+from app.repositories.user_cache import cache_user_on_commit
 from app.services.exceptions import NotFoundError, PermissionDeniedError, ValidationError
 from app.services.schemas import PersonInput, RegistrationInput
 
+ACTIVE_REGISTRATION_EXISTS = "You already have an active registration for this event"
 WAITLIST_RESPONSE_TIMEOUT = timedelta(hours=12)
 CONFIRMATION_RESPONSE_TIMEOUT = timedelta(hours=12)
 
@@ -32,23 +44,24 @@ class RegistrationService:
         now: datetime | None = None,
     ) -> Registration:
         now = now or datetime.now(tz=UTC)
-        event = await self._get_event_locked(event_id)
+        event, user, has_active = await self._load_for_registration(user_id, event_id)
         if not event:
             raise NotFoundError("Event not found")
 
         self._validate_event_window(event, now)
-        await self._validate_user_uniqueness(user_id, event_id)
+        if has_active:
+            raise ValidationError(ACTIVE_REGISTRATION_EXISTS)
         self._validate_payload(event, data)
-        await self._validate_not_mipt_deadline(
-            user_id=user_id,
+        self._validate_not_mipt_deadline(
+            user_is_not_mipt=bool(user and user.is_not_mipt),
             event=event,
             data=data,
             now=now,
         )
 
-        occupied = await self._occupied_units(event)
+        # The counters live on the event row we already hold locked: no COUNT over registrations.
         requested_slots = self._requested_slots(event, data.team_size)
-        remaining = max(event.capacity - occupied, 0)
+        remaining = max(event.capacity - event.occupied_units, 0)
 
         if event.type == EventType.team:
             threshold = event.team_max_size or 1
@@ -85,9 +98,17 @@ class RegistrationService:
             )
 
         self.session.add(registration)
-        await self.session.flush()
-
-        await self._persist_profile(user_id, data.captain_or_solo)
+        self._count(event, status, registration.team_size, 1)
+        if user:
+            self._persist_profile(user, data.captain_or_solo)
+        try:
+            # One flush for the registration, its people, the event counters and the profile.
+            await self.session.flush()
+        except IntegrityError as exc:
+            # A concurrent duplicate that the check above could not see yet.
+            raise ValidationError(ACTIVE_REGISTRATION_EXISTS) from exc
+        if user:
+            cache_user_on_commit(self.session, user)
         return registration
 
     async def cancel_registration(
@@ -106,10 +127,10 @@ class RegistrationService:
         if registration.status == RegistrationStatus.cancelled_by_user:
             return registration
 
-        registration.status = RegistrationStatus.cancelled_by_user
+        event = await self._get_event_locked(registration.event_id)
+        self._set_status(event, registration, RegistrationStatus.cancelled_by_user)
         registration.cancelled_at = now
 
-        event = await self._get_event_locked(registration.event_id)
         if event and event.start_at > now:
             await self.promote_waitlist(
                 registration.event_id,
@@ -130,32 +151,50 @@ class RegistrationService:
         if not event:
             raise NotFoundError("Event not found")
 
-        invited: list[Registration] = []
-        occupied = await self._occupied_units(event)
-        free_slots = max(event.capacity - occupied, 0)
+        free_slots = max(event.capacity - event.occupied_units, 0)
 
-        while free_slots > 0:
-            waitlist_has_team: bool | None = None
-            if event.type == EventType.team and preferred_category in {"team", "single"}:
-                waitlist_has_team = preferred_category == "team"
+        waitlist_has_team: bool | None = None
+        if event.type == EventType.team and preferred_category in {"team", "single"}:
+            waitlist_has_team = preferred_category == "team"
 
-            candidate = await self.repo.first_waitlist(
+        # Plan the FIFO greedy fill in memory over pages of candidates, then apply it with one
+        # UPDATE; a team too large for the remaining slots is skipped in favour of later ones.
+        # The SQL filter uses the initial free slots so that offset paging sees a stable set.
+        invited: list[Registration] = []
+        max_team_size = free_slots if event.type == EventType.team else None
+        offset = 0
+        page_size = max(free_slots, 1) * 2
+        while free_slots > 0:
+            candidates = await self.repo.waitlist_window(
                 event_id,
                 has_team=waitlist_has_team,
-                max_team_size=free_slots if event.type == EventType.team else None,
+                max_team_size=max_team_size,
+                limit=page_size,
+                offset=offset,
             )
-            if not candidate:
-                break
-
-            candidate_slots = self._requested_slots(event, candidate.team_size)
-            if candidate_slots > free_slots:
+            if not candidates:
                 break
-            candidate.status = RegistrationStatus.invited_from_waitlist
-            candidate.waitlist_invited_at = now
-            candidate.waitlist_expires_at = now + WAITLIST_RESPONSE_TIMEOUT
-            invited.append(candidate)
-            free_slots -= candidate_slots
-
+            offset += len(candidates)
+            for candidate in candidates:
+                candidate_slots = self._requested_slots(event, candidate.team_size)
+                if candidate_slots > free_slots:
+                    continue
+                invited.append(candidate)
+                free_slots -= candidate_slots
+                if free_slots == 0:
+                    break
+
+        if invited:
+            await self.repo.invite_from_waitlist(
+                [candidate.id for candidate in invited],
+                invited_at=now,
+                expires_at=now + WAITLIST_RESPONSE_TIMEOUT,
+            )
+            for candidate in invited:
+                self._count(event, RegistrationStatus.waitlist, candidate.team_size, -1)
+                self._count(event, RegistrationStatus.invited_from_waitlist, candidate.team_size, 1)
+            # Send the invites right away and come back when they expire.
+            schedule_deadlines(self.session, event_id, [now, now + WAITLIST_RESPONSE_TIMEOUT])
         return invited
 
     async def respond_waitlist_invite(
@@ -172,12 +211,12 @@ class RegistrationService:
             raise ValidationError("Registration is not waiting for waitlist response")
 
         registration.waitlist_expires_at = None
+        event = await self._get_event_locked(registration.event_id)
         if accepted:
-            registration.status = RegistrationStatus.registered
+            self._set_status(event, registration, RegistrationStatus.registered)
             return registration
 
-        registration.status = RegistrationStatus.declined
-        event = await self._get_event_locked(registration.event_id)
+        self._set_status(event, registration, RegistrationStatus.declined)
         if event and event.start_at > now:
             await self.promote_waitlist(
                 registration.event_id,
@@ -186,24 +225,15 @@ class RegistrationService:
             )
         return registration
 
-    async def expire_waitlist_invites(self, now: datetime | None = None) -> list[int]:
+    async def expire_waitlist_invites(
+        self,
+        now: datetime | None = None,
+        event_id: int | None = None,
+    ) -> list[int]:
         now = now or datetime.now(tz=UTC)
-        due = await self.repo.due_waitlist_timeouts(now)
-        if not due:
-            return []
-
-        for registration in due:
-            registration.status = RegistrationStatus.auto_declined
-            registration.waitlist_expires_at = None
-            event = await self._get_event_locked(registration.event_id)
-            if event and event.start_at > now:
-                await self.promote_waitlist(
-                    registration.event_id,
-                    now,
-                    preferred_category=self._waitlist_category(event, registration),
-                )
-
-        return [r.id for r in due]
+        expired = await self.repo.expire_due_waitlist_invites(now, event_id=event_id)
+        await self._promote_after_expiry(expired, now)
+        return [item.id for item in expired]
 
     async def request_confirmation_for_event(
         self,
@@ -215,6 +245,8 @@ class RegistrationService:
         for registration in registrations:
             registration.confirmation_requested_at = now
             registration.confirmation_expires_at = now + CONFIRMATION_RESPONSE_TIMEOUT
+        if registrations:
+            schedule_deadlines(self.session, event_id, [now + CONFIRMATION_RESPONSE_TIMEOUT])
         return registrations
 
     async def respond_confirmation(
@@ -237,13 +269,13 @@ class RegistrationService:
             raise ValidationError("Registration is not eligible for confirmation")
 
         registration.confirmation_expires_at = None
+        event = await self._get_event_locked(registration.event_id)
 
         if going:
-            registration.status = RegistrationStatus.confirmed
+            self._set_status(event, registration, RegistrationStatus.confirmed)
             return registration
 
-        registration.status = RegistrationStatus.declined
-        event = await self._get_event_locked(registration.event_id)
+        self._set_status(event, registration, RegistrationStatus.declined)
         if event and event.start_at > now:
             await self.promote_waitlist(
                 registration.event_id,
@@ -252,30 +284,76 @@ class RegistrationService:
             )
         return registration
 
-    async def expire_confirmations(self, now: datetime | None = None) -> list[int]:
+    async def expire_confirmations(
+        self,
+        now: datetime | None = None,
+        event_id: int | None = None,
+    ) -> list[int]:
         now = now or datetime.now(tz=UTC)
-        due = await self.repo.due_confirmation_timeouts(now)
-        if not due:
-            return []
+        expired = await self.repo.expire_due_confirmations(now, event_id=event_id)
+        await self._promote_after_expiry(expired, now)
+        return [item.id for item in expired]
+
+    async def reconcile_counters(self, event_ids: list[int]) -> list[int]:
+        # Safety net for the denormalized counters: recount the events under their row locks and
+        # fix any drift (manual SQL, a status change that bypassed this service). Returns the
+        # ids of events whose counters were off.
+        events = await self._get_events_locked(event_ids)
+        counters = await self.repo.counters_for_events([event.id for event in events])
+        drifted = []
+        for event in events:
+            if self._apply_counters(event, counters[event.id]):
+                drifted.append(event.id)
+        return drifted
+
+    async def _promote_after_expiry(
+        self, expired: list[ExpiredRegistration], now: datetime
+    ) -> None:
+        # Lock and promote each affected event once per waitlist category, not once per row:
+        # a second promotion in the same category would find no free slots left.
+        by_event: dict[int, list[ExpiredRegistration]] = defaultdict(list)
+        for item in expired:
+            by_event[item.event_id].append(item)
+
+        # The bulk UPDATE does not report the previous statuses, so the affected events are
+        # recounted with one grouped query while their rows are locked.
+        events = await self._get_events_locked(list(by_event))
+        counters = await self.repo.counters_for_events([event.id for event in events])
+        for event in events:
+            self._apply_counters(event, counters[event.id])
+
+        for event in events:
+            event_id = event.id
+            if event.start_at <= now:
+                continue
+            categories = dict.fromkeys(
+                self._waitlist_category_for(event, item.team_name) for item in by_event[event_id]
+            )
+            for category in categories:
+                await self.promote_waitlist(event_id, now, preferred_category=category)
 
-        for registration in due:
-            registration.status = RegistrationStatus.auto_declined
-            registration.confirmation_expires_at = None
-            event = await self._get_event_locked(registration.event_id)
-            if event and event.start_at > now:
-                await self.promote_waitlist(
-                    registration.event_id,
-                    now,
-                    preferred_category=self._waitlist_category(event, registration),
-                )
+    async def _get_event_locked(self, event_id: int) -> Event | None:
+        events = await self._lock_events(Event.id == event_id)
+        return events[0] if events else None
 
-        return [r.id for r in due]
+    async def _get_events_locked(self, event_ids: list[int]) -> list[Event]:
+        if not event_ids:
+            return []
+        # Ordered by id so that concurrent batches take the row locks in the same order.
+        return await self._lock_events(Event.id.in_(event_ids))
 
-    async def _get_event_locked(self, event_id: int) -> Event | None:
+    async def _lock_events(self, criteria) -> list[Event]:
         result = await self.session.execute(
-            select(Event).where(Event.id == event_id).with_for_update()
+            select(Event, *self._counter_columns())
+            .where(criteria)
+            .order_by(Event.id.asc())
+            .with_for_update()
         )
-        return result.scalar_one_or_none()
+        events = []
+        for event, *counters in result.all():
+            self._refresh_counters(event, counters)
+            events.append(event)
+        return events
 
     async def _get_registration_locked(self, registration_id: int) -> Registration | None:
         result = await self.session.execute(
@@ -286,10 +364,45 @@ class RegistrationService:
         )
         return result.scalar_one_or_none()
 
-    async def _validate_user_uniqueness(self, user_id: int, event_id: int) -> None:
-        existing = await self.repo.active_registration_for_user_event(user_id=user_id, event_id=event_id)
-        if existing:
-            raise ValidationError("You already have an active registration for this event")
+    async def _load_for_registration(
+        self,
+        user_id: int,
+        event_id: int,
+    ) -> tuple[Event | None, User | None, bool]:
+        # Everything create_registration decides on in one round trip: the locked event row with
+        # its counters, the user's profile and whether an active registration already exists.
+        # The user row is not locked: the profile update below overwrites it without reading it.
+        has_active = (
+            select(Registration.id)
+            .where(
+                Registration.user_id == user_id,
+                Registration.event_id == Event.id,
+                Registration.status.in_(ACTIVE_STATUSES),
+            )
+            .exists()
+        )
+        result = await self.session.execute(
+            select(Event, User, has_active, *self._counter_columns())
+            .outerjoin(User, User.id == user_id)
+            .where(Event.id == event_id)
+            .with_for_update(of=Event)
+        )
+        row = result.first()
+        if not row:
+            return None, None, False
+        event, user, exists, *counters = row
+        self._refresh_counters(event, counters)
+        return event, user, bool(exists)
+
+    @staticmethod
+    def _counter_columns() -> list:
+        return [getattr(Event, name) for name in EventCounters._fields]
+
+    @staticmethod
+    def _refresh_counters(event: Event, counters: list[int]) -> None:
+        # The identity map may hold counters read before the lock was taken; the locked row wins.
+        for name, value in zip(EventCounters._fields, counters, strict=True):
+            set_committed_value(event, name, value)
 
     def _validate_event_window(self, event: Event, now: datetime) -> None:
         if event.status != EventStatus.published:
@@ -333,14 +446,13 @@ class RegistrationService:
             if person.is_not_mipt and person.passport is None:
                 raise ValidationError("Passport data is required for not_mipt person")
 
-    async def _validate_not_mipt_deadline(
-        self,
-        user_id: int,
+    @staticmethod
+    def _validate_not_mipt_deadline(
+        user_is_not_mipt: bool,
         event: Event,
         data: RegistrationInput,
         now: datetime,
     ) -> None:
-        user_is_not_mipt = await self._user_is_not_mipt(user_id)
         payload_has_not_mipt = data.captain_or_solo.is_not_mipt or any(
             person.is_not_mipt for person in data.not_mipt_members
         )
@@ -370,11 +482,8 @@ class RegistrationService:
             passport_issue_date=passport.issue_date if passport else None,
         )
 
-    async def _persist_profile(self, user_id: int, person: PersonInput) -> None:
-        result = await self.session.execute(select(User).where(User.id == user_id).with_for_update())
-        user = result.scalar_one_or_none()
-        if not user:
-            return
+    @staticmethod
+    def _persist_profile(user: User, person: PersonInput) -> None:
         user.last_name = person.last_name
         user.first_name = person.first_name
         user.middle_name = person.middle_name
@@ -390,15 +499,36 @@ class RegistrationService:
             user.passport_number = None
             user.passport_issue_date = None
 
-    async def _user_is_not_mipt(self, user_id: int) -> bool:
-        result = await self.session.execute(select(User.is_not_mipt).where(User.id == user_id))
-        value = result.scalar_one_or_none()
-        return bool(value)
+    def _set_status(
+        self,
+        event: Event | None,
+        registration: Registration,
+        status: RegistrationStatus,
+    ) -> None:
+        # Every status transition goes through here so that the counters on the (locked) event
+        # row change in the same transaction.
+        if event is not None:
+            self._count(event, registration.status, registration.team_size, -1)
+            self._count(event, status, registration.team_size, 1)
+        registration.status = status
 
-    async def _occupied_units(self, event: Event) -> int:
-        if event.type == EventType.team:
-            return await self.repo.occupied_people(event.id)
-        return await self.repo.occupied_slots(event.id)
+    @staticmethod
+    def _count(event: Event, status: RegistrationStatus, team_size: int | None, sign: int) -> None:
+        if status in OCCUPYING_STATUSES:
+            # Solo registrations have no team_size and take exactly one slot.
+            event.occupied_units = (event.occupied_units or 0) + sign * max(int(team_size or 1), 1)
+        counter = STATUS_COUNTERS.get(status)
+        if counter:
+            setattr(event, counter, (getattr(event, counter) or 0) + sign)
+
+    @staticmethod
+    def _apply_counters(event: Event, counters: EventCounters) -> bool:
+        changed = False
+        for name, value in counters._asdict().items():
+            if getattr(event, name) != value:
+                setattr(event, name, value)
+                changed = True
+        return changed
 
     @staticmethod
     def _requested_slots(event: Event, team_size: int | None) -> int:
@@ -406,11 +536,15 @@ class RegistrationService:
             return max(int(team_size or 1), 1)
         return 1
 
+    @classmethod
+    def _waitlist_category(cls, event: Event, registration: Registration) -> str | None:
+        return cls._waitlist_category_for(event, registration.team_name)
+
     @staticmethod
-    def _waitlist_category(event: Event, registration: Registration) -> str | None:
+    def _waitlist_category_for(event: Event, team_name: str | None) -> str | None:
         if event.type != EventType.team:
             return None
-        return "team" if registration.team_name else "single"
+        return "team" if team_name else "single"
 
     async def list_waitlist(self, event_id: int) -> list[Registration]:
         regs = await self.repo.list_by_event(event_id)
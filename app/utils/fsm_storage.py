@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+import base64
+import json
+import zlib
+from typing import Any
+
+from aiogram.fsm.storage.base import BaseStorage
+from aiogram.fsm.storage.memory import MemoryStorage
+from aiogram.fsm.storage.redis import DefaultKeyBuilder, RedisStorage
+
+from app.config import Settings
+from app.redis import create_redis
+
+FSM_KEY_PREFIX = "hb_bot:fsm"
+COMPRESSED_MARKER = "z:"
+
+
+def dumps_fsm_data(data: dict[str, Any], compress_min_bytes: int) -> str:
+    # Compact JSON keeps Cyrillic names as UTF-8 instead of \u escapes. Large payloads (a team
+    # of members with passports) are deflated; the marker cannot start a JSON object.
+    raw = json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+    if compress_min_bytes <= 0 or len(raw) < compress_min_bytes:
+        return raw
+    packed = base64.b85encode(zlib.compress(raw.encode(), 6)).decode()
+    if len(packed) + len(COMPRESSED_MARKER) >= len(raw.encode()):
+        return raw
+    return COMPRESSED_MARKER + packed
+
+
+def loads_fsm_data(value: str) -> dict[str, Any]:
+    if value.startswith(COMPRESSED_MARKER):
+        value = zlib.decompress(base64.b85decode(value[len(COMPRESSED_MARKER) :])).decode()
+    return json.loads(value)
+
+
+def create_fsm_storage(settings: Settings) -> BaseStorage:
+    if settings.fsm_storage == "memory":
+        return MemoryStorage()
+    # State and data expire together, so an abandoned form does not resurface days later.
+    ttl = settings.fsm_ttl_seconds or None
+    return RedisStorage(
+        create_redis(),
+        key_builder=DefaultKeyBuilder(prefix=FSM_KEY_PREFIX),
+        state_ttl=ttl,
+        data_ttl=ttl,
+        json_loads=loads_fsm_data,
+        json_dumps=lambda data: dumps_fsm_data(data, settings.fsm_compress_min_bytes),
+    )
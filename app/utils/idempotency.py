@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+from typing import Any
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+
+
+class IdempotencyStore:
+    # Remembers the outcome of a submission under a caller-chosen key for `ttl` seconds, so a
+    # double tap or a redelivered update gets the first attempt's answer without redoing the work.
+    # The first caller claims the key with SET NX; duplicates that arrive while it is still
+    # running wait for its outcome.
+    def __init__(self, redis: Redis, prefix: str, ttl: float = 600.0):
+        self.redis = redis
+        self.prefix = prefix
+        self.ttl_ms = int(ttl * 1000)
+
+    def key(self, *parts: object) -> str:
+        return ":".join((self.prefix, *(str(part) for part in parts)))
+
+    async def claim(self, key: str) -> bool:
+        # True: this caller does the work. Without Redis every caller does it; the database
+        # constraints still reject real duplicates.
+        try:
+            return bool(await self.redis.set(key, PENDING, nx=True, px=self.ttl_ms))
+        except RedisError:
+            logger.warning("Idempotency store unavailable; processing %s without it", key)
+            return True
+
+    async def outcome(
+        self,
+        key: str,
+        timeout: float = 5.0,
+        poll_interval: float = 0.2,
+    ) -> dict[str, Any] | None:
+        # The stored outcome, waiting up to `timeout` for a claim that is still in progress.
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while True:
+            try:
+                raw = await self.redis.get(key)
+            except RedisError:
+                return None
+            if raw is None:
+                return None
+            value = raw.decode() if isinstance(raw, bytes) else raw
+            if value != PENDING:
+                return json.loads(value)
+            if loop.time() >= deadline:
+                return None
+            await asyncio.sleep(poll_interval)
+
+    async def complete(self, key: str, outcome: dict[str, Any]) -> None:
+        try:
+            await self.redis.set(key, json.dumps(outcome, separators=(",", ":")), px=self.ttl_ms)
+        except RedisError:
+            logger.warning("Cannot store idempotent outcome for %s", key)
+
+    async def release(self, key: str) -> None:
+        # The attempt failed unexpectedly: let a retry do the work again.
+        try:
+            await self.redis.delete(key)
+        except RedisError:
+            logger.warning("Cannot release idempotency key %s", key)
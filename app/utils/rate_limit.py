@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+import asyncio
+import time
+
+from redis.asyncio import Redis
+
+
+class TokenBucket:
+    # A non-positive rate disables limiting. `pause` drains the bucket and blocks every
+    # waiter, so a flood-control answer from Telegram slows down all concurrent senders.
+    def __init__(self, rate: float, capacity: float | None = None):
+        self.rate = max(float(rate), 0.0)
+        self.capacity = max(float(capacity if capacity is not None else self.rate), 1.0)
+        self._tokens = self.capacity
+        self._updated_at = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        if self.rate <= 0:
+            return
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    await asyncio.sleep(self._paused_until - now)
+                    continue
+                self._refill(now)
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+    async def pause(self, seconds: float) -> None:
+        self._paused_until = max(self._paused_until, time.monotonic() + max(seconds, 0.0))
+        self._tokens = 0.0
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self._updated_at
+        self._updated_at = now
+        self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+
+
+# Refills by elapsed Redis server time, then takes a token or returns how long to wait.
+# Server time keeps workers on different hosts consistent without synchronized clocks.
+_REDIS_BUCKET_ACQUIRE = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local paused_until = tonumber(redis.call('GET', KEYS[2]) or '0')
+if now < paused_until then
+    return tostring(paused_until - now)
+end
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(now - ts, 0) * rate)
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    wait = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('EXPIRE', KEYS[1], 60)
+return tostring(wait)
+"""
+
+_REDIS_BUCKET_PAUSE = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local until_ts = now + tonumber(ARGV[1])
+local current = tonumber(redis.call('GET', KEYS[2]) or '0')
+if until_ts > current then
+    redis.call('SET', KEYS[2], tostring(until_ts), 'PX', math.ceil(tonumber(ARGV[1]) * 1000) + 1000)
+end
+redis.call('HSET', KEYS[1], 'tokens', '0', 'ts', tostring(now))
+return 1
+"""
+
+
+class RedisTokenBucket:
+    # Same contract as TokenBucket, but the bucket lives in Redis and is shared by every
+    # process using the same key, so broadcast shards on several workers share one global rate.
+    def __init__(self, redis: Redis, key: str, rate: float, capacity: float | None = None):
+        self.rate = max(float(rate), 0.0)
+        self.capacity = max(float(capacity if capacity is not None else self.rate), 1.0)
+        self._keys = [key, f"{key}:paused_until"]
+        self._acquire = redis.register_script(_REDIS_BUCKET_ACQUIRE)
+        self._pause = redis.register_script(_REDIS_BUCKET_PAUSE)
+
+    async def acquire(self) -> None:
+        if self.rate <= 0:
+            return
+        while True:
+            wait = float(await self._acquire(keys=self._keys, args=[self.rate, self.capacity]))
+            if wait <= 0:
+                return
+            await asyncio.sleep(wait)
+
+    async def pause(self, seconds: float) -> None:
+        await self._pause(keys=self._keys, args=[max(seconds, 0.0)])
+
+
+class ChatRateLimiter:
+    # Keeps at least `interval` seconds between two sends to the same chat.
+    _PRUNE_THRESHOLD = 10_000
+
+    def __init__(self, interval: float):
+        self.interval = max(float(interval), 0.0)
+        self._next_allowed: dict[int, float] = {}
+
+    async def acquire(self, chat_id: int) -> None:
+        if self.interval <= 0:
+            return
+        now = time.monotonic()
+        if len(self._next_allowed) > self._PRUNE_THRESHOLD:
+            self._next_allowed = {
+                key: value for key, value in self._next_allowed.items() if value > now
+            }
+        allowed_at = self._next_allowed.get(chat_id, 0.0)
+        self._next_allowed[chat_id] = max(now, allowed_at) + self.interval
+        if allowed_at > now:
+            await asyncio.sleep(allowed_at - now)
+
+
+class SendRateLimiter:
+    def __init__(
+        self,
+        rate: float,
+        per_chat_interval: float,
+        bucket: TokenBucket | RedisTokenBucket | None = None,
+    ):
+        self.bucket = bucket or TokenBucket(rate)
+        self.chats = ChatRateLimiter(per_chat_interval)
+
+    async def acquire(self, chat_id: int) -> None:
+        await self.chats.acquire(chat_id)
+        await self.bucket.acquire()
+
+    async def pause(self, seconds: float) -> None:
+        await self.bucket.pause(seconds)
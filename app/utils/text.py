@@ -4,7 +4,8 @@ from datetime import datetime
 from zoneinfo import ZoneInfo
 
 from app.config import get_settings
-from app.models import Event
+from app.models import BroadcastJob, Event
+from app.models.enums import BroadcastJobStatus, DeliveryKind
 
 NOT_MIPT_REG_NOTE = (
     "ℹ️ Для участников не с Физтеха регистрация доступна "
@@ -32,3 +33,34 @@ def render_event_card(event: Event) -> str:
         "👥 Количество мест ограничено.\n\n"
         f"{NOT_MIPT_REG_NOTE}"
     )
+
+
+def broadcast_status_label(status: BroadcastJobStatus) -> str:
+    labels = {
+        BroadcastJobStatus.pending: "в очереди",
+        BroadcastJobStatus.running: "идёт отправка",
+        BroadcastJobStatus.paused: "на паузе",
+        BroadcastJobStatus.completed: "завершена",
+        BroadcastJobStatus.cancelled: "отменена",
+    }
+    return labels.get(status, status.value)
+
+
+def broadcast_kind_label(kind: DeliveryKind) -> str:
+    labels = {
+        DeliveryKind.new_event: "анонс мероприятия",
+        DeliveryKind.registration_started: "старт регистрации",
+        DeliveryKind.registration_ends_soon: "час до конца регистрации",
+    }
+    return labels.get(kind, kind.value)
+
+
+def render_broadcast_job(job: BroadcastJob) -> str:
+    total = job.total_count if job.total_count is not None else "?"
+    return (
+        f"📣 Рассылка #{job.id}: {broadcast_kind_label(job.kind)}\n"
+        f"Событие: #{job.event_id}\n"
+        f"Статус: {broadcast_status_label(job.status)}\n"
+        f"Отправлено: {job.sent_count} из {total}\n"
+        f"Ошибок: {job.failed_count}, недоступны: {job.unreachable_count}"
+    )
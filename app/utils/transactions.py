@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import logging
+from collections.abc import Callable
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, SessionTransaction
+
+logger = logging.getLogger(__name__)
+
+_CALLBACKS_KEY = "after_commit_callbacks"
+
+
+def on_commit(session: AsyncSession | Session, callback: Callable[[], None]) -> None:
+    # Runs `callback` once the current outermost transaction commits; dropped on rollback, also
+    # of the SAVEPOINT it was registered in. Use it for side effects (task dispatch, cache
+    # invalidation) that must not see uncommitted rows.
+    sync_session = session.sync_session if isinstance(session, AsyncSession) else session
+    transaction = sync_session.get_nested_transaction() or sync_session.get_transaction()
+    sync_session.info.setdefault(_CALLBACKS_KEY, []).append((transaction, callback))
+
+
+@event.listens_for(Session, "after_commit")
+def _run_after_commit(session: Session) -> None:
+    savepoint = session.get_nested_transaction()
+    if savepoint is not None:
+        # after_commit also fires on SAVEPOINT release: hand its callbacks to the enclosing
+        # transaction, which may still roll back.
+        callbacks = session.info.get(_CALLBACKS_KEY, [])
+        session.info[_CALLBACKS_KEY] = [
+            (savepoint.parent if owner is savepoint else owner, callback)
+            for owner, callback in callbacks
+        ]
+        return
+    for _, callback in session.info.pop(_CALLBACKS_KEY, []):
+        try:
+            callback()
+        except Exception:
+            logger.exception("after-commit callback failed")
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _discard_after_rollback(session: Session, transaction: SessionTransaction) -> None:
+    # A committed SAVEPOINT has handed its callbacks on and the outermost commit has drained the
+    # list; anything still owned by the ending transaction belongs to a rollback.
+    if transaction.parent is None:
+        session.info.pop(_CALLBACKS_KEY, None)
+    elif transaction.nested and _CALLBACKS_KEY in session.info:
+        session.info[_CALLBACKS_KEY] = [
+            (owner, callback)
+            for owner, callback in session.info[_CALLBACKS_KEY]
+            if owner is not transaction
+        ]
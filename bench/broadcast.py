@@ -0,0 +1,147 @@
+"""Broadcast, confirmation and periodic-workflow sends against the fake Bot API.
+
+    python -m bench.broadcast --users 1000 --confirmations 200 --forbidden 0.05 --flood 0.01
+    BROADCAST_RATE_LIMIT=100 python -m bench.broadcast --flood-rate 0 --latency-ms 80
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+from datetime import UTC, datetime, timedelta
+
+from aiogram import Bot
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.config import get_settings
+from app.jobs import tasks
+from app.jobs.runtime import WorkerRuntime
+from app.models import Event, Registration, RegistrationStatus
+from app.services.broadcast_service import BroadcastService
+from app.services.notification_service import NotificationService
+from app.services.registration_service import RegistrationService
+from bench.common import create_bench_engine, print_report, seed_event, seed_users
+from bench.fake_bot_api import FakeBotAPI, config_arguments, config_from_arguments
+
+BENCH_BOT_TOKEN = "123456:BENCH"
+
+
+async def _seed(
+    session_factory: async_sessionmaker[AsyncSession],
+    *,
+    users: int,
+    confirmations: int,
+) -> tuple[int, int, int]:
+    now = datetime.now(tz=UTC)
+    # Distinct titles keep the texts distinct, so the fake API can tell repeats from duplicates.
+    broadcast_event_id, confirm_event_id, workflow_event_id = [
+        await seed_event(session_factory, capacity=users, now=now, title=title)
+        for title in ("Broadcast", "Confirmations", "Workflow")
+    ]
+    user_ids = await seed_users(session_factory, users)
+    async with session_factory() as session:
+        # Both start in 20 hours, inside the confirmation window of the periodic workflow.
+        await session.execute(
+            update(Event)
+            .where(Event.id.in_((confirm_event_id, workflow_event_id)))
+            .values(start_at=now + timedelta(hours=20))
+        )
+        session.add_all(
+            Registration(event_id=event_id, user_id=user_id, status=RegistrationStatus.registered)
+            for event_id in (confirm_event_id, workflow_event_id)
+            for user_id in user_ids[:confirmations]
+        )
+        await session.commit()
+    return broadcast_event_id, confirm_event_id, workflow_event_id
+
+
+async def _measure(fake: FakeBotAPI, scenario) -> dict[str, object]:
+    before_requests = sum(fake.stats.requests.values())
+    before_responses = fake.stats.responses.copy()
+    before_delivered = fake.stats.delivered
+    started = time.perf_counter()
+    sent = await scenario()
+    elapsed = time.perf_counter() - started
+
+    responses = fake.stats.responses - before_responses
+    delivered = fake.stats.delivered - before_delivered
+    return {
+        "elapsed_s": elapsed,
+        "sent_reported": sent,
+        "delivered": delivered,
+        "messages_per_s": delivered / elapsed if elapsed else 0.0,
+        "requests": sum(fake.stats.requests.values()) - before_requests,
+        "flood_429": responses[429],
+        "forbidden_403": responses[403],
+        "bad_request_400": responses[400],
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--confirmations", type=int, default=100)
+    config_arguments(parser)
+    args = parser.parse_args()
+
+    engine, session_factory = await create_bench_engine()
+    broadcast_event_id, confirm_event_id, _ = await _seed(
+        session_factory, users=args.users, confirmations=args.confirmations
+    )
+
+    async with FakeBotAPI(config_from_arguments(args)) as fake:
+        bot = Bot(token=BENCH_BOT_TOKEN, session=fake.bot_session())
+        try:
+
+            async def broadcast() -> int:
+                async with session_factory() as session:
+                    event = await session.get(Event, broadcast_event_id)
+                    return await NotificationService(session, bot).notify_new_event(event)
+
+            async def confirmations() -> int:
+                async with session_factory() as session:
+                    await RegistrationService(session).request_confirmation_for_event(
+                        confirm_event_id
+                    )
+                    sent = await NotificationService(session, bot).notify_confirmations(
+                        confirm_event_id
+                    )
+                    await session.commit()
+                    return sent
+
+            async def periodic_workflow() -> int:
+                runtime = WorkerRuntime(
+                    loop=asyncio.get_running_loop(),
+                    engine=engine,
+                    session_factory=session_factory,
+                    bot=bot,
+                    redis=None,
+                )
+                # Sweeps every event: confirmations for the third one, nothing new for the rest.
+                await tasks._process_periodic_workflow(runtime)
+                # Then does the broadcast worker's part for the posts the sweep queued.
+                async with session_factory() as session:
+                    job_ids = await BroadcastService(session).resumable_job_ids()
+                sent = 0
+                for job_id in job_ids:
+                    async with session_factory() as session:
+                        sent += await NotificationService(session, bot).run_broadcast_job(job_id)
+                return sent
+
+            print(f"Fake Bot API at {fake.url}, rate limit {get_settings().broadcast_rate_limit}/s")
+            for name, scenario in (
+                ("broadcast (new event)", broadcast),
+                ("notify_confirmations", confirmations),
+                ("periodic workflow", periodic_workflow),
+            ):
+                print_report(name, await _measure(fake, scenario))
+            print_report("fake Bot API totals", {"duplicate_deliveries": fake.stats.duplicates})
+        finally:
+            await bot.session.close()
+            await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
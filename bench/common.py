@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import os
+import statistics
+import tempfile
+from datetime import UTC, datetime, timedelta
+
+from sqlalchemy import event as sa_event
+from sqlalchemy import inspect
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app.models import Base, Event, EventStatus, EventType, User
+from app.services.schemas import PersonInput, RegistrationInput
+
+# Benchmarks drop and recreate every table: never point this at a real database.
+BENCH_DATABASE_URL_ENV = "BENCH_DATABASE_URL"
+
+
+def _restore_utc(target, context) -> None:
+    for attr in inspect(target).mapper.column_attrs:
+        value = target.__dict__.get(attr.key)
+        if isinstance(value, datetime) and value.tzinfo is None:
+            set_committed_value(target, attr.key, value.replace(tzinfo=UTC))
+
+
+def bench_database_url() -> str:
+    url = os.environ.get(BENCH_DATABASE_URL_ENV)
+    if url:
+        return url
+    # SQLite fallback: good for a smoke run, but it serializes whole transactions instead of
+    # locking rows, so contention numbers only mean something on PostgreSQL.
+    return f"sqlite+aiosqlite:///{tempfile.mkdtemp(prefix='hb_bench_')}/bench.db"
+
+
+def _serialize_sqlite_transactions(engine: AsyncEngine) -> None:
+    # SQLite ignores FOR UPDATE and the driver only opens a transaction at the first write, so
+    # concurrent read-modify-write would lose updates. BEGIN IMMEDIATE takes the database write
+    # lock up front: coarse, but it keeps the capacity invariants exact like row locks do.
+    @sa_event.listens_for(engine.sync_engine, "connect")
+    def _disable_driver_transactions(dbapi_connection, connection_record) -> None:
+        dbapi_connection.isolation_level = None
+
+    @sa_event.listens_for(engine.sync_engine, "begin")
+    def _begin_immediate(conn) -> None:
+        conn.exec_driver_sql("BEGIN IMMEDIATE")
+
+
+async def create_bench_engine(
+    url: str | None = None,
+) -> tuple[AsyncEngine, async_sessionmaker[AsyncSession]]:
+    url = url or bench_database_url()
+    disable_dispatch()
+    if url.startswith("sqlite"):
+        engine = create_async_engine(url, connect_args={"timeout": 60})
+        _serialize_sqlite_transactions(engine)
+        # SQLite drops tzinfo on read; the services compare against aware datetimes.
+        if not sa_event.contains(Base, "load", _restore_utc):
+            sa_event.listen(Base, "load", _restore_utc, propagate=True)
+    else:
+        engine = create_async_engine(url, pool_size=20, max_overflow=20)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+    return engine, async_sessionmaker(engine, expire_on_commit=False, class_=AsyncSession)
+
+
+async def seed_event(
+    session_factory: async_sessionmaker[AsyncSession],
+    *,
+    capacity: int,
+    now: datetime,
+    event_type: EventType = EventType.solo,
+    title: str = "Bench Event",
+) -> int:
+    async with session_factory() as session:
+        event = Event(
+            type=event_type,
+            status=EventStatus.published,
+            title=title,
+            description="bench",
+            location="Campus",
+            registration_start_at=now - timedelta(minutes=1),
+            registration_end_at=now + timedelta(days=1),
+            start_at=now + timedelta(days=7),
+            capacity=capacity,
+            team_min_size=2 if event_type == EventType.team else None,
+            team_max_size=5 if event_type == EventType.team else None,
+        )
+        session.add(event)
+        await session.commit()
+        return event.id
+
+
+async def seed_users(
+    session_factory: async_sessionmaker[AsyncSession],
+    count: int,
+    first_tg_id: int = 1_000_000,
+) -> list[int]:
+    async with session_factory() as session:
+        users = [
+            User(tg_id=first_tg_id + idx, username=f"bench_{idx}", is_reachable=True)
+            for idx in range(count)
+        ]
+        session.add_all(users)
+        await session.commit()
+        return [user.id for user in users]
+
+
+def solo_input(user_id: int) -> RegistrationInput:
+    return RegistrationInput(
+        captain_or_solo=PersonInput(
+            last_name="Bench",
+            first_name=f"User{user_id}",
+            middle_name=None,
+            contact=f"@bench{user_id}",
+            group_name="B01-001",
+            is_not_mipt=False,
+            passport=None,
+        )
+    )
+
+
+def disable_dispatch() -> None:
+    # The benchmarks measure the database path; deadline ETAs and broadcasts are not sent to Celery.
+    from app.jobs import scheduling, tasks
+
+    for module in (scheduling, tasks):
+        module.dispatch_event_deadlines = lambda event_id, etas, now=None: 0
+        module.dispatch_broadcast = lambda job_id: None
+
+
+def percentile(values: list[float], q: float) -> float:
+    if not values:
+        return 0.0
+    if len(values) == 1:
+        return values[0]
+    return statistics.quantiles(values, n=100, method="inclusive")[max(min(int(q), 99), 1) - 1]
+
+
+def print_report(title: str, rows: dict[str, object]) -> None:
+    print(f"== {title}")
+    width = max(len(key) for key in rows)
+    for key, value in rows.items():
+        if isinstance(value, float):
+            value = f"{value:.2f}"
+        print(f"  {key.ljust(width)}  {value}")
@@ -0,0 +1,236 @@
+"""Local stand-in for the Telegram Bot API with injected latency and errors.
+
+Point aiogram at it with ``Bot(token, session=fake.bot_session())`` or run it standalone.
+``feed_update`` queues an update for ``getUpdates`` long polling.
+
+
+    python -m bench.fake_bot_api --port 8081 --latency-ms 40 --flood-rate 30 --forbidden 0.05
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+import time
+from collections import Counter, deque
+from dataclasses import dataclass, field
+
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.client.telegram import TelegramAPIServer
+from aiohttp import web
+
+
+@dataclass(slots=True)
+class FakeBotAPIConfig:
+    latency_ms: float = 30.0
+    jitter_ms: float = 10.0
+    # Global sends per second above which every request gets 429, like Telegram's flood control.
+    flood_rate: float | None = 30.0
+    retry_after: int = 1
+    # Share of requests answered with 429 regardless of the rate.
+    flood_ratio: float = 0.0
+    # Share of chats that blocked the bot (403) or do not exist (400); stable per chat id.
+    forbidden_ratio: float = 0.0
+    bad_request_ratio: float = 0.0
+    seed: int = 1
+
+
+@dataclass(slots=True)
+class FakeBotAPIStats:
+    requests: Counter[str] = field(default_factory=Counter)
+    responses: Counter[int] = field(default_factory=Counter)
+    # (chat_id, text) -> deliveries; the same text twice in one chat is a duplicate send.
+    deliveries: Counter[tuple[int, str]] = field(default_factory=Counter)
+    first_request_at: float | None = None
+    last_request_at: float | None = None
+
+    @property
+    def delivered(self) -> int:
+        return sum(self.deliveries.values())
+
+    @property
+    def duplicates(self) -> int:
+        return sum(count - 1 for count in self.deliveries.values() if count > 1)
+
+
+class FakeBotAPI:
+    def __init__(
+        self,
+        config: FakeBotAPIConfig | None = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ):
+        self.config = config or FakeBotAPIConfig()
+        self.host = host
+        self.port = port
+        self.stats = FakeBotAPIStats()
+        self._rng = random.Random(self.config.seed)
+        self._window: deque[float] = deque()
+        self._message_id = 0
+        self._updates: deque[dict] = deque()
+        self._updates_fed = asyncio.Event()
+        self._runner: web.AppRunner | None = None
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def bot_session(self) -> AiohttpSession:
+        return AiohttpSession(api=TelegramAPIServer.from_base(self.url))
+
+    async def start(self) -> None:
+        app = web.Application()
+        app.router.add_post("/bot{token}/{method}", self._handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        # Port 0 binds a free port; read back the real one.
+        self.port = site._server.sockets[0].getsockname()[1]
+
+    async def stop(self) -> None:
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+
+    def feed_update(self, update: dict) -> None:
+        self._updates.append(update)
+        self._updates_fed.set()
+
+    async def __aenter__(self) -> FakeBotAPI:
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.stop()
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        method = request.match_info["method"]
+        payload = dict(await request.post())
+        now = time.monotonic()
+        self.stats.requests[method] += 1
+        self.stats.first_request_at = self.stats.first_request_at or now
+        self.stats.last_request_at = now
+
+        config = self.config
+        latency_ms = config.latency_ms + self._rng.uniform(-1, 1) * config.jitter_ms
+        if method == "getUpdates":
+            updates = await self._get_updates(payload)
+            # The latency is paid on the way back: the long poll was already waiting.
+            await asyncio.sleep(max(latency_ms, 0) / 1000)
+            self.stats.responses[200] += 1
+            return web.json_response({"ok": True, "result": updates})
+        await asyncio.sleep(max(latency_ms, 0) / 1000)
+
+        if method == "getMe":
+            return self._ok({"id": 1, "is_bot": True, "first_name": "Bench", "username": "bench"})
+
+        chat_id = int(payload.get("chat_id", 0))
+        if self._flooded(now):
+            return self._error(
+                429,
+                f"Too Many Requests: retry after {config.retry_after}",
+                {"retry_after": config.retry_after},
+            )
+        if self._chat_share(chat_id, salt=1) < config.forbidden_ratio:
+            return self._error(403, "Forbidden: bot was blocked by the user")
+        if self._chat_share(chat_id, salt=2) < config.bad_request_ratio:
+            return self._error(400, "Bad Request: chat not found")
+
+        self._message_id += 1
+        self.stats.deliveries[chat_id, payload.get("text") or payload.get("caption") or ""] += 1
+        message = {
+            "message_id": self._message_id,
+            "date": int(time.time()),
+            "chat": {"id": chat_id, "type": "private"},
+        }
+        if method == "sendPhoto":
+            message["photo"] = [
+                {"file_id": payload.get("photo"), "file_unique_id": "p", "width": 1, "height": 1}
+            ]
+            message["caption"] = payload.get("caption")
+        else:
+            message["text"] = payload.get("text", "")
+        return self._ok(message)
+
+    async def _get_updates(self, payload: dict) -> list[dict]:
+        # Confirmed updates (below the offset) are dropped; otherwise wait up to the poll timeout.
+        offset = int(payload.get("offset") or 0)
+        while self._updates and self._updates[0]["update_id"] < offset:
+            self._updates.popleft()
+        if not self._updates:
+            self._updates_fed.clear()
+            try:
+                await asyncio.wait_for(
+                    self._updates_fed.wait(), timeout=float(payload.get("timeout") or 0)
+                )
+            except TimeoutError:
+                return []
+        limit = int(payload.get("limit") or 100)
+        return list(self._updates)[:limit]
+
+    def _flooded(self, now: float) -> bool:
+        config = self.config
+        if config.flood_ratio and self._rng.random() < config.flood_ratio:
+            return True
+        if not config.flood_rate:
+            return False
+        while self._window and self._window[0] <= now - 1:
+            self._window.popleft()
+        if len(self._window) >= config.flood_rate:
+            return True
+        self._window.append(now)
+        return False
+
+    def _chat_share(self, chat_id: int, salt: int) -> float:
+        return random.Random(chat_id * 31 + salt).random()
+
+    def _ok(self, result: dict) -> web.Response:
+        self.stats.responses[200] += 1
+        return web.json_response({"ok": True, "result": result})
+
+    def _error(self, code: int, description: str, parameters: dict | None = None) -> web.Response:
+        self.stats.responses[code] += 1
+        body: dict = {"ok": False, "error_code": code, "description": description}
+        if parameters:
+            body["parameters"] = parameters
+        return web.json_response(body, status=code)
+
+
+def config_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--latency-ms", type=float, default=30.0)
+    parser.add_argument("--jitter-ms", type=float, default=10.0)
+    parser.add_argument("--flood-rate", type=float, default=30.0, help="sends/s before 429, 0=off")
+    parser.add_argument("--retry-after", type=int, default=1)
+    parser.add_argument("--flood", type=float, default=0.0, help="share of random 429 answers")
+    parser.add_argument("--forbidden", type=float, default=0.0, help="share of chats with 403")
+    parser.add_argument("--bad-request", type=float, default=0.0, help="share of chats with 400")
+
+
+def config_from_arguments(args: argparse.Namespace) -> FakeBotAPIConfig:
+    return FakeBotAPIConfig(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        flood_rate=args.flood_rate or None,
+        retry_after=args.retry_after,
+        flood_ratio=args.flood,
+        forbidden_ratio=args.forbidden,
+        bad_request_ratio=args.bad_request,
+    )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081)
+    config_arguments(parser)
+    args = parser.parse_args()
+
+    async with FakeBotAPI(config_from_arguments(args), host=args.host, port=args.port) as fake:
+        print(f"Fake Bot API listening on {fake.url}")
+        await asyncio.Event().wait()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
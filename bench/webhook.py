@@ -0,0 +1,175 @@
+"""Update-to-handler latency: getUpdates long polling vs the webhook runner.
+
+A local feeder produces message updates at a fixed rate. In polling mode they are queued in the
+fake Bot API; in webhook mode they are POSTed to ``app.main.create_webhook_app`` with the secret
+header after the same network latency.
+
+    python -m bench.webhook --updates 2000 --rate 200 --latency-ms 40 --handler-ms 50
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+
+from aiogram import Bot, Dispatcher, Router
+from aiogram.types import Message
+from aiohttp import ClientSession, web
+
+from app.main import create_webhook_app
+from bench.common import percentile, print_report
+from bench.fake_bot_api import FakeBotAPI, FakeBotAPIConfig
+
+BENCH_BOT_TOKEN = "123456:BENCH"
+WEBHOOK_PATH = "/telegram/webhook"
+WEBHOOK_SECRET = "bench-secret"
+
+
+class LatencyProbe:
+    def __init__(self, expected: int):
+        self.expected = expected
+        self.sent_at: dict[int, float] = {}
+        self.latencies: list[float] = []
+        self.done = asyncio.Event()
+
+    def router(self, handler_ms: float) -> Router:
+        router = Router(name="bench")
+
+        @router.message()
+        async def handle(message: Message) -> None:
+            self.latencies.append((time.perf_counter() - self.sent_at[message.message_id]) * 1000)
+            if len(self.latencies) >= self.expected:
+                self.done.set()
+            # Simulated handler work, e.g. the database round trips of a real handler.
+            await asyncio.sleep(handler_ms / 1000)
+
+        return router
+
+
+def _update(update_id: int, chats: int) -> dict:
+    chat_id = 10_000 + update_id % chats
+    return {
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "date": int(time.time()),
+            "chat": {"id": chat_id, "type": "private"},
+            "from": {"id": chat_id, "is_bot": False, "first_name": "Bench"},
+            "text": f"ping {update_id}",
+        },
+    }
+
+
+async def _feed(probe: LatencyProbe, deliver, *, updates: int, rate: float, chats: int) -> None:
+    started = time.perf_counter()
+    for update_id in range(1, updates + 1):
+        delay = started + (update_id - 1) / rate - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        probe.sent_at[update_id] = time.perf_counter()
+        deliver(_update(update_id, chats))
+
+
+async def run_polling(args: argparse.Namespace) -> dict[str, object]:
+    probe = LatencyProbe(args.updates)
+    config = FakeBotAPIConfig(latency_ms=args.latency_ms, jitter_ms=0, flood_rate=None)
+    async with FakeBotAPI(config) as fake:
+        bot = Bot(token=BENCH_BOT_TOKEN, session=fake.bot_session())
+        dp = Dispatcher()
+        dp.include_router(probe.router(args.handler_ms))
+        polling = asyncio.create_task(
+            dp.start_polling(bot, handle_signals=False, close_bot_session=False)
+        )
+        try:
+            started = time.perf_counter()
+            await _feed(
+                probe, fake.feed_update, updates=args.updates, rate=args.rate, chats=args.chats
+            )
+            await asyncio.wait_for(probe.done.wait(), timeout=args.timeout)
+            elapsed = time.perf_counter() - started
+            requests = fake.stats.requests["getUpdates"]
+        finally:
+            await dp.stop_polling()
+            await polling
+            await bot.session.close()
+    return _report(probe, elapsed, get_updates_requests=requests)
+
+
+async def run_webhook(args: argparse.Namespace) -> dict[str, object]:
+    probe = LatencyProbe(args.updates)
+    bot = Bot(token=BENCH_BOT_TOKEN)
+    dp = Dispatcher()
+    dp.include_router(probe.router(args.handler_ms))
+    runner = web.AppRunner(create_webhook_app(dp, bot, WEBHOOK_PATH, WEBHOOK_SECRET))
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    url = f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}{WEBHOOK_PATH}"
+
+    pending: set[asyncio.Task] = set()
+    statuses: list[int] = []
+    async with ClientSession() as http:
+
+        async def post(update: dict) -> None:
+            # Telegram's side of the network; requests overlap like its parallel connections.
+            await asyncio.sleep(args.latency_ms / 1000)
+            headers = {"X-Telegram-Bot-Api-Secret-Token": WEBHOOK_SECRET}
+            async with http.post(url, json=update, headers=headers) as response:
+                statuses.append(response.status)
+
+        def deliver(update: dict) -> None:
+            task = asyncio.create_task(post(update))
+            pending.add(task)
+            task.add_done_callback(pending.discard)
+
+        try:
+            started = time.perf_counter()
+            await _feed(probe, deliver, updates=args.updates, rate=args.rate, chats=args.chats)
+            await asyncio.wait_for(probe.done.wait(), timeout=args.timeout)
+            elapsed = time.perf_counter() - started
+            await asyncio.gather(*pending)
+            async with http.post(url, json=_update(0, 1), headers={}) as response:
+                unauthorized = response.status
+        finally:
+            await runner.cleanup()
+            await bot.session.close()
+    return _report(
+        probe,
+        elapsed,
+        non_200_answers=sum(status != 200 for status in statuses),
+        rejected_without_secret=unauthorized == 401,
+    )
+
+
+def _report(probe: LatencyProbe, elapsed: float, **extra: object) -> dict[str, object]:
+    return {
+        "updates": len(probe.latencies),
+        "elapsed_s": elapsed,
+        "updates_per_s": len(probe.latencies) / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(probe.latencies, 50),
+        "p99_ms": percentile(probe.latencies, 99),
+        "max_ms": max(probe.latencies, default=0.0),
+        **extra,
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--updates", type=int, default=1000)
+    parser.add_argument("--rate", type=float, default=200.0, help="updates per second")
+    parser.add_argument("--chats", type=int, default=200)
+    parser.add_argument("--latency-ms", type=float, default=40.0, help="one-way network latency")
+    parser.add_argument("--handler-ms", type=float, default=20.0)
+    parser.add_argument("--mode", choices=("polling", "webhook", "both"), default="both")
+    parser.add_argument("--timeout", type=float, default=120.0)
+    args = parser.parse_args()
+
+    modes = ("polling", "webhook") if args.mode == "both" else (args.mode,)
+    for mode in modes:
+        runner = run_polling if mode == "polling" else run_webhook
+        print_report(mode, await runner(args))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
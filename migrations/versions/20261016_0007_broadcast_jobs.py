@@ -0,0 +1,78 @@
+"""add resumable broadcast jobs
+
+Revision ID: 20261016_0007
+Revises: 20260307_0006
+Create Date: 2026-10-16 10:00:00
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "20261016_0007"
+down_revision = "20260307_0006"
+branch_labels = None
+depends_on = None
+
+
+delivery_kind = sa.Enum(
+    "new_event",
+    "registration_started",
+    "registration_ends_soon",
+    "ping_4d",
+    "confirmation_24h",
+    "ping_2h",
+    "waitlist_invite",
+    name="delivery_kind",
+    create_type=False,
+)
+broadcast_job_status = sa.Enum(
+    "pending",
+    "running",
+    "paused",
+    "completed",
+    "cancelled",
+    name="broadcast_job_status",
+    create_type=False,
+)
+
+
+def upgrade() -> None:
+    broadcast_job_status.create(op.get_bind(), checkfirst=True)
+    op.create_table(
+        "broadcast_jobs",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column(
+            "event_id",
+            sa.Integer(),
+            sa.ForeignKey("events.id", ondelete="CASCADE"),
+            nullable=True,
+        ),
+        sa.Column("kind", delivery_kind, nullable=False),
+        sa.Column("status", broadcast_job_status, nullable=False, server_default="pending"),
+        sa.Column("text", sa.Text(), nullable=False),
+        sa.Column("photo_file_id", sa.String(length=255), nullable=True),
+        sa.Column("cursor_user_id", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("total_count", sa.Integer(), nullable=True),
+        sa.Column("sent_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("failed_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("unreachable_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("started_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("heartbeat_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("finished_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column(
+            "created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False
+        ),
+        sa.Column(
+            "updated_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False
+        ),
+    )
+    op.create_index("ix_broadcast_jobs_event_id_kind", "broadcast_jobs", ["event_id", "kind"])
+    op.create_index("ix_broadcast_jobs_status", "broadcast_jobs", ["status"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_broadcast_jobs_status", table_name="broadcast_jobs")
+    op.drop_index("ix_broadcast_jobs_event_id_kind", table_name="broadcast_jobs")
+    op.drop_table("broadcast_jobs")
+    broadcast_job_status.drop(op.get_bind(), checkfirst=True)
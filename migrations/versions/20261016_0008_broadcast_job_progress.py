@@ -0,0 +1,25 @@
+"""add broadcast job progress reporting
+
+Revision ID: 20261016_0008
+Revises: 20261016_0007
+Create Date: 2026-10-16 12:00:00
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "20261016_0008"
+down_revision = "20261016_0007"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("broadcast_jobs", sa.Column("admin_chat_id", sa.BigInteger(), nullable=True))
+    op.add_column("broadcast_jobs", sa.Column("progress_message_id", sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("broadcast_jobs", "progress_message_id")
+    op.drop_column("broadcast_jobs", "admin_chat_id")
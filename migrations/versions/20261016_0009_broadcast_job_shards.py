@@ -0,0 +1,35 @@
+"""add broadcast job shards
+
+Revision ID: 20261016_0009
+Revises: 20261016_0008
+Create Date: 2026-10-16 14:00:00
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "20261016_0009"
+down_revision = "20261016_0008"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "broadcast_jobs",
+        sa.Column(
+            "parent_id",
+            sa.Integer(),
+            sa.ForeignKey("broadcast_jobs.id", ondelete="CASCADE"),
+            nullable=True,
+        ),
+    )
+    op.add_column("broadcast_jobs", sa.Column("user_id_to", sa.Integer(), nullable=True))
+    op.create_index("ix_broadcast_jobs_parent_id", "broadcast_jobs", ["parent_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_broadcast_jobs_parent_id", table_name="broadcast_jobs")
+    op.drop_column("broadcast_jobs", "user_id_to")
+    op.drop_column("broadcast_jobs", "parent_id")
@@ -0,0 +1,61 @@
+"""add denormalized registration counters to events
+
+Revision ID: 20261016_0010
+Revises: 20261016_0009
+Create Date: 2026-10-16 16:00:00
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "20261016_0010"
+down_revision = "20261016_0009"
+branch_labels = None
+depends_on = None
+
+
+COUNTER_COLUMNS = (
+    "occupied_units",
+    "registered_count",
+    "invited_count",
+    "confirmed_count",
+    "waitlist_count",
+)
+
+
+def upgrade() -> None:
+    for column in COUNTER_COLUMNS:
+        op.add_column("events", sa.Column(column, sa.Integer(), nullable=False, server_default="0"))
+
+    op.execute(
+        """
+        UPDATE events
+        SET occupied_units = COALESCE((
+                SELECT SUM(COALESCE(r.team_size, 1)) FROM registrations r
+                WHERE r.event_id = events.id
+                  AND r.status IN ('registered', 'confirmed', 'invited_from_waitlist')
+            ), 0),
+            registered_count = (
+                SELECT COUNT(*) FROM registrations r
+                WHERE r.event_id = events.id AND r.status = 'registered'
+            ),
+            invited_count = (
+                SELECT COUNT(*) FROM registrations r
+                WHERE r.event_id = events.id AND r.status = 'invited_from_waitlist'
+            ),
+            confirmed_count = (
+                SELECT COUNT(*) FROM registrations r
+                WHERE r.event_id = events.id AND r.status = 'confirmed'
+            ),
+            waitlist_count = (
+                SELECT COUNT(*) FROM registrations r
+                WHERE r.event_id = events.id AND r.status = 'waitlist'
+            )
+        """
+    )
+
+
+def downgrade() -> None:
+    for column in reversed(COUNTER_COLUMNS):
+        op.drop_column("events", column)
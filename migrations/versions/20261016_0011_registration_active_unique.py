@@ -0,0 +1,93 @@
+"""allow one active registration per user and event
+
+Revision ID: 20261016_0011
+Revises: 20261016_0010
+Create Date: 2026-10-16 17:00:00
+
+"""
+
+from datetime import UTC, datetime
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "20261016_0011"
+down_revision = "20261016_0010"
+branch_labels = None
+depends_on = None
+
+
+ACTIVE_WHERE = "status IN ('registered', 'waitlist', 'invited_from_waitlist', 'confirmed')"
+# A fixed cancellation time keeps the migration deterministic and marks the rows it cancelled.
+DEDUPLICATED_AT = datetime(2026, 10, 16, 17, 0, tzinfo=UTC)
+
+# Same recount as the 20261016_0010 backfill, limited to the events that lost duplicates.
+RECOUNT_EVENTS = """
+    UPDATE events
+    SET occupied_units = COALESCE((
+            SELECT SUM(COALESCE(r.team_size, 1)) FROM registrations r
+            WHERE r.event_id = events.id
+              AND r.status IN ('registered', 'confirmed', 'invited_from_waitlist')
+        ), 0),
+        registered_count = (
+            SELECT COUNT(*) FROM registrations r
+            WHERE r.event_id = events.id AND r.status = 'registered'
+        ),
+        invited_count = (
+            SELECT COUNT(*) FROM registrations r
+            WHERE r.event_id = events.id AND r.status = 'invited_from_waitlist'
+        ),
+        confirmed_count = (
+            SELECT COUNT(*) FROM registrations r
+            WHERE r.event_id = events.id AND r.status = 'confirmed'
+        ),
+        waitlist_count = (
+            SELECT COUNT(*) FROM registrations r
+            WHERE r.event_id = events.id AND r.status = 'waitlist'
+        )
+    WHERE events.id IN :event_ids
+"""
+
+
+def upgrade() -> None:
+    # Duplicates left by the race this index closes would make it fail to build. Keep the newest
+    # active registration per user and event, cancel the rest and recount their events.
+    bind = op.get_bind()
+    cancelled = bind.execute(
+        sa.text(
+            f"""
+            UPDATE registrations
+            SET status = 'cancelled_by_user', cancelled_at = :cancelled_at
+            WHERE id IN (
+                SELECT id FROM (
+                    SELECT id, ROW_NUMBER() OVER (
+                        PARTITION BY user_id, event_id ORDER BY created_at DESC, id DESC
+                    ) AS position
+                    FROM registrations
+                    WHERE {ACTIVE_WHERE}
+                ) ranked
+                WHERE position > 1
+            )
+            RETURNING event_id
+            """
+        ),
+        {"cancelled_at": DEDUPLICATED_AT},
+    )
+    event_ids = sorted({row.event_id for row in cancelled})
+    if event_ids:
+        bind.execute(
+            sa.text(RECOUNT_EVENTS).bindparams(sa.bindparam("event_ids", expanding=True)),
+            {"event_ids": event_ids},
+        )
+
+    op.create_index(
+        "uq_registrations_active_user_event",
+        "registrations",
+        ["user_id", "event_id"],
+        unique=True,
+        postgresql_where=sa.text(ACTIVE_WHERE),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("uq_registrations_active_user_event", table_name="registrations")
@@ -2,11 +2,53 @@ from __future__ import annotations
 
 from datetime import UTC, date, datetime, timedelta
 
+import pytest
 import pytest_asyncio
+from aiogram.exceptions import TelegramForbiddenError, TelegramRetryAfter
+from aiogram.methods import SendMessage
+from sqlalchemy import event as sa_event
+from sqlalchemy import inspect
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm.attributes import set_committed_value
 
 from app.models import Base, Event, EventStatus, EventType, User
 from app.services.schemas import PassportInput, PersonInput
+from app.utils.rate_limit import SendRateLimiter
+
+
+@pytest.fixture(autouse=True)
+def dispatched(monkeypatch) -> dict[str, list]:
+    # No broker in tests: record what would have been sent to Celery after commit.
+    from app.jobs import scheduling
+
+    calls: dict[str, list] = {"deadlines": [], "broadcasts": []}
+    # Dispatch inline instead of in a worker thread, so the calls are recorded by commit time.
+    monkeypatch.setattr(scheduling, "_off_loop", lambda dispatch, *args: dispatch(*args))
+    monkeypatch.setattr(
+        scheduling,
+        "dispatch_event_deadlines",
+        lambda event_id, etas, now=None: calls["deadlines"].append((event_id, sorted(etas))) or 0,
+    )
+    monkeypatch.setattr(
+        scheduling, "dispatch_broadcast", lambda job_id: calls["broadcasts"].append(job_id)
+    )
+    return calls
+
+
+def _restore_utc(target, context) -> None:
+    for attr in inspect(target).mapper.column_attrs:
+        value = target.__dict__.get(attr.key)
+        if isinstance(value, datetime) and value.tzinfo is None:
+            set_committed_value(target, attr.key, value.replace(tzinfo=UTC))
+
+
+@pytest.fixture
+def utc_datetimes():
+    # SQLite drops tzinfo on read; PostgreSQL returns aware datetimes like the rest of the code
+    # expects.
+    sa_event.listen(Base, "load", _restore_utc, propagate=True)
+    yield
+    sa_event.remove(Base, "load", _restore_utc)
 
 
 @pytest_asyncio.fixture
@@ -85,3 +127,28 @@ def not_mipt_person(contact: str = "@user") -> PersonInput:
             issue_date=date(2020, 1, 1),
         ),
     )
+
+
+class FakeBot:
+    def __init__(self, forbidden: set[int] | None = None, flood_once: set[int] | None = None):
+        self.forbidden = forbidden or set()
+        self.flood_once = flood_once or set()
+        self.sent: list[int] = []
+
+    async def send_message(self, chat_id: int, text: str, reply_markup=None) -> None:
+        method = SendMessage(chat_id=chat_id, text=text)
+        if chat_id in self.forbidden:
+            raise TelegramForbiddenError(
+                method=method, message="Forbidden: bot was blocked by the user"
+            )
+        if chat_id in self.flood_once:
+            self.flood_once.discard(chat_id)
+            raise TelegramRetryAfter(method=method, message="Too Many Requests", retry_after=0)
+        self.sent.append(chat_id)
+
+    async def send_photo(self, chat_id: int, photo: str, caption: str, reply_markup=None) -> None:
+        await self.send_message(chat_id=chat_id, text=caption, reply_markup=reply_markup)
+
+
+def unlimited() -> SendRateLimiter:
+    return SendRateLimiter(rate=0, per_chat_interval=0)
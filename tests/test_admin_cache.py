@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from app.services import admin_service
+from app.services.admin_cache import AdminCache
+from app.services.admin_service import AdminService
+
+
+@pytest.fixture
+def cache(monkeypatch) -> AdminCache:
+    cache = AdminCache(ttl=3600)
+    monkeypatch.setattr(admin_service, "admin_cache", cache)
+    return cache
+
+
+@pytest.fixture
+def published(monkeypatch) -> list[bool]:
+    published: list[bool] = []
+
+    async def publish(redis) -> None:
+        published.append(True)
+
+    monkeypatch.setattr(admin_service, "publish_admin_invalidation", publish)
+    monkeypatch.setattr(admin_service, "get_redis", lambda: None)
+    return published
+
+
+async def test_admin_checks_hit_the_database_once_until_invalidated(session, cache, published):
+    service = AdminService(session)
+    loads = 0
+    original = service.repo.admin_tg_ids
+
+    async def counting_load() -> set[int]:
+        nonlocal loads
+        loads += 1
+        return await original()
+
+    service.repo.admin_tg_ids = counting_load
+
+    assert not await service.is_admin(501)
+    assert not await service.is_admin(501)
+    assert loads == 1
+
+    await service.add_admin(501, added_by_tg_id=1)
+    # Not committed yet: other updates keep seeing the old set.
+    assert not await service.is_admin(501)
+    await session.commit()
+    await asyncio.sleep(0)
+    assert published == [True]
+    assert await service.is_admin(501)
+    assert loads == 2
+
+    assert await service.remove_admin(501)
+    await session.commit()
+    await asyncio.sleep(0)
+    assert not await service.is_admin(501)
+    assert loads == 3
+    assert len(published) == 2
+
+
+async def test_rolled_back_admin_change_keeps_the_cache(session, cache, published):
+    service = AdminService(session)
+    assert not await service.is_admin(502)
+    await service.add_admin(502, added_by_tg_id=1)
+    await session.rollback()
+    await asyncio.sleep(0)
+    assert not await service.is_admin(502)
+    assert published == []
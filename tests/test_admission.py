@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import asyncio
+from datetime import UTC, datetime
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.models import Base, Registration
+from app.models.enums import RegistrationStatus
+from app.services.admission import RegistrationAdmission
+from app.services.exceptions import ValidationError
+from app.services.schemas import RegistrationInput
+from tests.conftest import create_event, create_user, mipt_person
+
+
+@pytest.mark.asyncio
+async def test_burst_is_admitted_in_fifo_order_with_group_commits(
+    tmp_path, monkeypatch, utc_datetimes
+):
+    # Batches use their own sessions, so the database must be shared between connections.
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'admission.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+
+    now = datetime.now(tz=UTC)
+    async with session_factory() as session:
+        event = await create_event(session, capacity=3, now=now)
+        users = [await create_user(session, tg_id=1600 + idx) for idx in range(10)]
+        await session.commit()
+
+    admission = RegistrationAdmission(session_factory, max_batch=4)
+    batch_sizes: list[int] = []
+    original_admit = admission._admit
+
+    async def admit(event_id, batch):
+        batch_sizes.append(len(batch))
+        await original_admit(event_id, batch)
+
+    monkeypatch.setattr(admission, "_admit", admit)
+
+    def submit(user_id: int):
+        data = RegistrationInput(captain_or_solo=mipt_person(f"@u{user_id}"))
+        return admission.submit(user_id, event.id, data, now=now)
+
+    # The duplicate of the first user is rejected on its own without failing its batch.
+    outcomes = await asyncio.gather(
+        *(submit(user.id) for user in users), submit(users[0].id), return_exceptions=True
+    )
+
+    assert [r.status for r in outcomes[:3]] == [RegistrationStatus.registered] * 3
+    assert [r.status for r in outcomes[3:10]] == [RegistrationStatus.waitlist] * 7
+    assert isinstance(outcomes[10], ValidationError)
+    assert batch_sizes == [4, 4, 3]
+
+    async with session_factory() as session:
+        result = await session.execute(select(Registration).order_by(Registration.id.asc()))
+        stored = result.scalars().all()
+    assert [r.user_id for r in stored] == [user.id for user in users]
+    assert sum(r.status == RegistrationStatus.registered for r in stored) == 3
+
+    await engine.dispose()
@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+from datetime import UTC, datetime, timedelta
+
+import pytest
+
+from app.models.enums import BroadcastJobStatus, DeliveryKind, EventStatus
+from app.repositories.broadcast_jobs import BroadcastJobRepository
+from app.services.broadcast_service import BroadcastService
+from app.services.exceptions import ValidationError
+from app.services.notification_service import NotificationService
+from app.services.publication_service import PublicationService
+from tests.conftest import FakeBot, create_event, create_user, unlimited
+
+
+@pytest.mark.asyncio
+async def test_broadcast_job_completes_with_counters(session):
+    event = await create_event(session)
+    users = [await create_user(session, tg_id=4000 + idx) for idx in range(5)]
+    bot = FakeBot(forbidden={users[0].tg_id})
+
+    service = NotificationService(session, bot, rate_limiter=unlimited())
+    sent = await service.notify_registration_started(event)
+
+    job = await BroadcastJobRepository(session).get_for(event.id, DeliveryKind.registration_started)
+    assert sent == 4
+    assert job.status == BroadcastJobStatus.completed
+    assert job.total_count == 5
+    assert (job.sent_count, job.unreachable_count, job.failed_count) == (4, 1, 0)
+    assert job.cursor_user_id == users[-1].id
+
+
+@pytest.mark.asyncio
+async def test_stale_running_job_resumes_from_cursor(session):
+    now = datetime.now(tz=UTC)
+    event = await create_event(session, now=now)
+    users = [await create_user(session, tg_id=5000 + idx) for idx in range(6)]
+    job = await BroadcastJobRepository(session).add(event.id, DeliveryKind.new_event, text="hello")
+    job.status = BroadcastJobStatus.running
+    job.cursor_user_id = users[2].id
+    job.heartbeat_at = now - timedelta(hours=1)
+    await session.commit()
+
+    assert await BroadcastService(session).resumable_job_ids(now) == [job.id]
+
+    bot = FakeBot()
+    service = NotificationService(session, bot, rate_limiter=unlimited())
+    sent = await service.run_broadcast_job(job.id)
+
+    assert sent == 3
+    assert sorted(bot.sent) == [user.tg_id for user in users[3:]]
+    assert job.status == BroadcastJobStatus.completed
+    assert await BroadcastService(session).resumable_job_ids(now) == []
+
+
+@pytest.mark.asyncio
+async def test_pause_resume_and_cancel_transitions(session, dispatched):
+    event = await create_event(session)
+    await create_user(session, tg_id=6001)
+    job = await BroadcastJobRepository(session).add(event.id, DeliveryKind.new_event, text="hello")
+    service = BroadcastService(session)
+
+    await service.pause(job.id)
+    assert job.status == BroadcastJobStatus.paused
+    await session.commit()
+
+    bot = FakeBot()
+    notifier = NotificationService(session, bot, rate_limiter=unlimited())
+    assert await notifier.run_broadcast_job(job.id) == 0
+    assert bot.sent == []
+
+    with pytest.raises(ValidationError):
+        await service.pause(job.id)
+
+    await service.resume(job.id)
+    assert job.status == BroadcastJobStatus.pending
+    await session.commit()
+    assert dispatched["broadcasts"] == [job.id]
+
+    await service.cancel(job.id)
+    assert job.status == BroadcastJobStatus.cancelled
+    assert job.finished_at is not None
+    with pytest.raises(ValidationError):
+        await service.resume(job.id)
+
+
+@pytest.mark.asyncio
+async def test_publish_queues_broadcast_without_sending(session):
+    event = await create_event(session)
+    event.status = EventStatus.draft
+    await create_user(session, tg_id=7001)
+    bot = FakeBot()
+
+    outcome = await PublicationService(session, bot).publish_event(event.id, admin_chat_id=42)
+
+    job = await BroadcastService(session).get(outcome.broadcast_job_id)
+    assert outcome.published_now is True
+    assert bot.sent == []
+    assert job.status == BroadcastJobStatus.pending
+    assert job.admin_chat_id == 42
+
+
+@pytest.mark.asyncio
+async def test_running_job_with_fresh_heartbeat_is_not_claimed_twice(session):
+    event = await create_event(session)
+    await create_user(session, tg_id=8001)
+    job = await BroadcastJobRepository(session).add(event.id, DeliveryKind.new_event, text="hello")
+    job.status = BroadcastJobStatus.running
+    job.heartbeat_at = datetime.now(tz=UTC)
+    await session.commit()
+
+    bot = FakeBot()
+    notifier = NotificationService(session, bot, rate_limiter=unlimited())
+    assert await notifier.run_broadcast_job(job.id) == 0
+    assert bot.sent == []
+
+
+@pytest.mark.asyncio
+async def test_sharded_broadcast_aggregates_shard_counters(session, dispatched):
+    event = await create_event(session)
+    users = [await create_user(session, tg_id=9000 + idx) for idx in range(10)]
+    job = await BroadcastJobRepository(session).add(event.id, DeliveryKind.new_event, text="hello")
+    await session.commit()
+
+    bot = FakeBot(forbidden={users[4].tg_id})
+    service = NotificationService(session, bot, rate_limiter=unlimited())
+    service.settings = service.settings.model_copy(
+        update={"broadcast_shards": 3, "broadcast_shard_min_users": 3}
+    )
+
+    assert await service.run_broadcast_job(job.id) == 0
+    shard_ids = dispatched["broadcasts"]
+    assert len(shard_ids) == 3
+    assert bot.sent == []
+
+    sent = 0
+    for shard_id in shard_ids:
+        sent += await service.run_broadcast_job(shard_id)
+
+    assert sent == 9
+    assert sorted(bot.sent) == sorted(user.tg_id for user in users if user is not users[4])
+    assert job.status == BroadcastJobStatus.completed
+    counters = (job.total_count, job.sent_count, job.unreachable_count, job.failed_count)
+    assert counters == (10, 9, 1, 0)
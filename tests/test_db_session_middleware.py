@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import pytest
+from aiogram.types import Update
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.middlewares import DbSessionMiddleware
+from app.models import Base, User
+from app.repositories.users import UserRepository
+
+
+@pytest.fixture
+async def session_factory(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'middleware.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield async_sessionmaker(engine, expire_on_commit=False)
+    await engine.dispose()
+
+
+async def _users(session_factory) -> int:
+    async with session_factory() as session:
+        return await session.scalar(select(func.count(User.id)))
+
+
+async def test_handler_session_is_shared_counted_and_committed(session_factory):
+    middleware = DbSessionMiddleware(session_factory)
+    seen = {}
+
+    async def handler(event, data):
+        session = data["session"]
+        await UserRepository(session).ensure_user(tg_id=1, username="first")
+        # A helper called from the handler gets the very same session.
+        seen["found"] = await UserRepository(data["session"]).get_by_tg_id(1)
+        return "ok"
+
+    data: dict = {}
+    assert await middleware(handler, Update(update_id=1), data) == "ok"
+    assert seen["found"] is not None
+    assert data["query_counter"].queries >= 2
+    assert await _users(session_factory) == 1
+
+
+async def test_handler_error_rolls_back(session_factory):
+    middleware = DbSessionMiddleware(session_factory)
+
+    async def handler(event, data):
+        await UserRepository(data["session"]).ensure_user(tg_id=2, username="second")
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        await middleware(handler, Update(update_id=2), {})
+    assert await _users(session_factory) == 0
+
+
+async def test_update_without_queries_does_not_check_out_a_connection(session_factory):
+    middleware = DbSessionMiddleware(session_factory)
+    pool = session_factory.kw["bind"].sync_engine.pool
+    checked_out = []
+
+    async def handler(event, data):
+        checked_out.append(pool.checkedout())
+
+    data: dict = {}
+    await middleware(handler, Update(update_id=3), data)
+    assert checked_out == [0]
+    assert data["query_counter"].queries == 0
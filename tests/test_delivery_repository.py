@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import pytest
+from sqlalchemy import select
+
+from app.models import NotificationDelivery, User
+from app.models.enums import DeliveryKind
+from app.repositories import deliveries
+from app.repositories.deliveries import DeliveryRepository
+from tests.conftest import create_event, create_user
+
+
+@pytest.mark.asyncio
+async def test_not_delivered_filter(session):
+    event = await create_event(session)
+    other_event = await create_event(session)
+    user1 = await create_user(session, tg_id=1)
+    user2 = await create_user(session, tg_id=2)
+    user3 = await create_user(session, tg_id=3)
+
+    repo = DeliveryRepository(session)
+    await repo.add(user_id=user1.id, event_id=event.id, kind=DeliveryKind.new_event)
+    await repo.add(user_id=user2.id, event_id=event.id, kind=DeliveryKind.ping_2h)
+    await repo.add(user_id=user3.id, event_id=other_event.id, kind=DeliveryKind.new_event)
+
+    result = await session.execute(
+        select(User.id)
+        .where(repo.not_delivered(User.id, event.id, DeliveryKind.new_event))
+        .order_by(User.id)
+    )
+    assert list(result.scalars().all()) == [user2.id, user3.id]
+
+
+@pytest.mark.asyncio
+async def test_add_many_skips_already_logged_deliveries(session):
+    event = await create_event(session)
+    user1 = await create_user(session, tg_id=11)
+    user2 = await create_user(session, tg_id=12)
+
+    repo = DeliveryRepository(session)
+    await repo.add(user_id=user1.id, event_id=event.id, kind=DeliveryKind.ping_4d)
+    await repo.add_many(
+        [
+            (user1.id, event.id, DeliveryKind.ping_4d),
+            (user2.id, event.id, DeliveryKind.ping_4d),
+            (user2.id, event.id, DeliveryKind.ping_4d),
+        ]
+    )
+
+    result = await session.execute(
+        select(NotificationDelivery.user_id)
+        .where(
+            NotificationDelivery.event_id == event.id,
+            NotificationDelivery.kind == DeliveryKind.ping_4d,
+        )
+        .order_by(NotificationDelivery.user_id)
+    )
+    assert list(result.scalars().all()) == [user1.id, user2.id]
+
+
+@pytest.mark.asyncio
+async def test_add_many_falls_back_to_savepoints_without_upsert(session, monkeypatch):
+    monkeypatch.setattr(deliveries, "_UPSERT_INSERTS", {})
+    event = await create_event(session)
+    user1 = await create_user(session, tg_id=21)
+    user2 = await create_user(session, tg_id=22)
+
+    repo = DeliveryRepository(session)
+    await repo.add(user_id=user1.id, event_id=event.id, kind=DeliveryKind.ping_2h)
+    await repo.add_many(
+        [
+            (user1.id, event.id, DeliveryKind.ping_2h),
+            (user2.id, event.id, DeliveryKind.ping_2h),
+            (user2.id, event.id, DeliveryKind.ping_2h),
+        ]
+    )
+    await session.commit()
+
+    result = await session.execute(
+        select(NotificationDelivery.user_id)
+        .where(
+            NotificationDelivery.event_id == event.id,
+            NotificationDelivery.kind == DeliveryKind.ping_2h,
+        )
+        .order_by(NotificationDelivery.user_id)
+    )
+    assert list(result.scalars().all()) == [user1.id, user2.id]
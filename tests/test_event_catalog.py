@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+from datetime import UTC, datetime, timedelta
+
+import pytest
+
+from app.services.event_catalog import CATALOG_VERSION_KEY, EventCatalog, event_catalog
+from app.services.event_service import EventService
+from tests.conftest import create_event
+
+
+class FakeRedis:
+    # Async reads for the bot, sync INCR for after-commit callbacks, over one keyspace.
+    def __init__(self):
+        self.values: dict[str, int] = {}
+
+    async def get(self, key):
+        return self.values.get(key)
+
+    def incr(self, key):
+        self.values[key] = self.values.get(key, 0) + 1
+        return self.values[key]
+
+
+@pytest.fixture
+def redis():
+    redis = FakeRedis()
+    event_catalog.attach(redis=redis, sync_redis=redis)
+    event_catalog.invalidate()
+    yield redis
+    event_catalog.attach()
+    event_catalog.invalidate()
+
+
+def _count_queries(session) -> list[str]:
+    statements: list[str] = []
+    original = session.execute
+
+    async def execute(statement, *args, **kwargs):
+        statements.append(str(statement))
+        return await original(statement, *args, **kwargs)
+
+    session.execute = execute
+    return statements
+
+
+@pytest.mark.asyncio
+async def test_catalog_is_read_once_until_an_event_changes(session, redis, utc_datetimes):
+    event_id = (await create_event(session)).id
+    await session.commit()
+    statements = _count_queries(session)
+
+    first = await event_catalog.get(session)
+    second = await event_catalog.get(session)
+    assert second is first
+    assert len(statements) == 1
+    assert first.get(event_id).card_text.startswith("🎯 Test Event")
+    assert first.list_markup(datetime.now(tz=UTC)) is first.list_markup(datetime.now(tz=UTC))
+
+    await EventService(session).update_fields(event_id, {"title": "Другое название"})
+    await session.rollback()
+    assert await event_catalog.get(session) is first
+
+    await EventService(session).update_fields(event_id, {"title": "Другое название"})
+    await session.commit()
+    assert redis.values[CATALOG_VERSION_KEY] == 2
+    reloaded = await event_catalog.get(session)
+    assert reloaded.get(event_id).title == "Другое название"
+
+
+@pytest.mark.asyncio
+async def test_other_replicas_reload_after_archive(session, redis, utc_datetimes):
+    event = await create_event(session)
+    await session.commit()
+    replica = EventCatalog()
+    replica.attach(redis=redis)
+    assert (await replica.get(session)).get(event.id) is not None
+
+    await EventService(session).archive(event.id)
+    await session.commit()
+
+    assert (await replica.get(session)).get(event.id) is None
+
+
+@pytest.mark.asyncio
+async def test_started_events_leave_the_list_without_reload(session, redis, utc_datetimes):
+    now = datetime.now(tz=UTC)
+    soon = await create_event(session, now=now - timedelta(days=2) + timedelta(hours=1))
+    await create_event(session, now=now)
+    await session.commit()
+
+    catalog = await event_catalog.get(session)
+    assert catalog.events[0].id == soon.id
+    later = catalog.list_markup(now + timedelta(hours=2))
+    assert [row[0].callback_data for row in later.inline_keyboard] == [
+        f"event_open:{catalog.events[1].id}"
+    ]
+    assert catalog.list_markup(now + timedelta(days=3)) is None
@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+from aiogram.fsm.storage.base import StorageKey
+
+from app.config import Settings
+from app.utils import fsm_storage
+from app.utils.fsm_storage import COMPRESSED_MARKER, create_fsm_storage, dumps_fsm_data
+
+
+class FakeRedis:
+    def __init__(self):
+        self.values: dict[str, str] = {}
+        self.ttls: dict[str, int | None] = {}
+
+    async def get(self, key):
+        return self.values.get(key)
+
+    async def set(self, key, value, ex=None):
+        self.values[key] = value
+        self.ttls[key] = ex
+
+    async def delete(self, key):
+        self.values.pop(key, None)
+
+
+def _team_data(members: int) -> dict:
+    return {
+        "event_id": 7,
+        "captain": {"last_name": "Иванов", "first_name": "Иван", "is_not_mipt": False},
+        "not_mipt_members": [
+            {
+                "last_name": "Петров",
+                "first_name": f"Пётр {idx}",
+                "passport": {"series": "4510", "number": f"{idx:06d}", "issue_date": "2015-05-01"},
+            }
+            for idx in range(members)
+        ],
+    }
+
+
+async def test_redis_fsm_storage_round_trips_compact_data(monkeypatch):
+    redis = FakeRedis()
+    monkeypatch.setattr(fsm_storage, "create_redis", lambda: redis)
+    storage = create_fsm_storage(Settings(FSM_TTL_SECONDS=3600, FSM_COMPRESS_MIN_BYTES=512))
+    key = StorageKey(bot_id=1, chat_id=10, user_id=10)
+
+    small = {"event_id": 7, "captain": {"last_name": "Иванов"}}
+    await storage.set_state(key, "RegistrationStates:captain")
+    await storage.set_data(key, small)
+    stored = next(value for name, value in redis.values.items() if name.endswith(":data"))
+    assert stored == '{"event_id":7,"captain":{"last_name":"Иванов"}}'
+    assert set(redis.ttls.values()) == {3600}
+    assert await storage.get_data(key) == small
+
+    large = _team_data(members=10)
+    await storage.set_data(key, large)
+    stored = next(value for name, value in redis.values.items() if name.endswith(":data"))
+    assert stored.startswith(COMPRESSED_MARKER)
+    assert len(stored) < len(dumps_fsm_data(large, compress_min_bytes=0).encode())
+    assert await storage.get_data(key) == large
+    assert await storage.get_state(key) == "RegistrationStates:captain"
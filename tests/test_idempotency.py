@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import pytest
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+from app.utils.idempotency import IdempotencyStore
+
+
+class FakeRedis:
+    # Keys expire against `now`, which the tests move forward by hand.
+    def __init__(self):
+        self.now = 0.0
+        self.values: dict[str, tuple[str, float]] = {}
+
+    async def get(self, key):
+        value = self.values.get(key)
+        if value is None or value[1] <= self.now:
+            return None
+        return value[0].encode()
+
+    async def set(self, key, value, nx=False, px=None):
+        if nx and await self.get(key) is not None:
+            return None
+        self.values[key] = (value, self.now + px / 1000)
+        return True
+
+    async def delete(self, key):
+        self.values.pop(key, None)
+
+
+class DownRedis:
+    async def set(self, *args, **kwargs):
+        raise RedisConnectionError("down")
+
+
+@pytest.fixture
+def redis():
+    return FakeRedis()
+
+
+@pytest.mark.asyncio
+async def test_repeated_submission_is_rejected_and_gets_the_first_outcome(redis):
+    store = IdempotencyStore(redis, "hb_bot:submit", ttl=600)
+    key = store.key(1001, 7, "nonce-a")
+
+    assert await store.claim(key)
+    assert not await store.claim(store.key(1001, 7, "nonce-a"))
+    assert await store.outcome(key, timeout=0) is None
+
+    await store.complete(key, {"text": "ok", "done": True})
+    assert not await store.claim(key)
+    assert await store.outcome(key, timeout=0) == {"text": "ok", "done": True}
+
+
+@pytest.mark.asyncio
+async def test_new_nonce_or_released_key_is_accepted(redis):
+    store = IdempotencyStore(redis, "hb_bot:submit", ttl=600)
+    first = store.key(1001, 7, "nonce-a")
+    assert await store.claim(first)
+
+    assert await store.claim(store.key(1001, 7, "nonce-b"))
+    assert await store.claim(store.key(1002, 7, "nonce-a"))
+
+    await store.release(first)
+    assert await store.claim(first)
+
+
+@pytest.mark.asyncio
+async def test_key_expires_after_ttl(redis):
+    store = IdempotencyStore(redis, "hb_bot:submit", ttl=600)
+    key = store.key(1001, 7, "nonce-a")
+    assert await store.claim(key)
+    await store.complete(key, {"text": "ok"})
+
+    redis.now += 599
+    assert not await store.claim(key)
+    redis.now += 2
+    assert await store.outcome(key, timeout=0) is None
+    assert await store.claim(key)
+
+
+@pytest.mark.asyncio
+async def test_claim_succeeds_without_redis():
+    store = IdempotencyStore(DownRedis(), "hb_bot:submit")
+    assert await store.claim(store.key(1001, 7, "nonce-a"))
@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from app.jobs.locks import METRICS_KEY, LeaseLock, lease, record_skip
+
+
+class FakeRedis:
+    # Just enough of redis.asyncio for LeaseLock; scripts are matched by what they do.
+    def __init__(self):
+        self.values: dict[str, str] = {}
+        self.hashes: dict[str, dict[str, int]] = {}
+        self.renewals = 0
+
+    async def set(self, key, value, nx=False, px=None):
+        if nx and key in self.values:
+            return None
+        self.values[key] = value
+        return True
+
+    async def hincrby(self, key, field, amount):
+        fields = self.hashes.setdefault(key, {})
+        fields[field] = fields.get(field, 0) + amount
+        return fields[field]
+
+    def register_script(self, script):
+        async def call(keys, args):
+            if self.values.get(keys[0]) != args[0]:
+                return 0
+            if "PEXPIRE" in script:
+                self.renewals += 1
+            else:
+                del self.values[keys[0]]
+            return 1
+
+        return call
+
+
+@pytest.mark.asyncio
+async def test_overlapping_run_is_skipped_and_counted():
+    redis = FakeRedis()
+    async with lease(redis, "sweep") as lock:
+        assert isinstance(lock, LeaseLock)
+        async with lease(redis, "sweep") as overlapping:
+            assert overlapping is None
+            assert await record_skip(redis, "sweep") == 1
+    assert redis.hashes[METRICS_KEY] == {"sweep_skipped": 1}
+
+    async with lease(redis, "sweep") as lock:
+        assert lock is not None
+
+
+@pytest.mark.asyncio
+async def test_lease_is_renewed_until_another_holder_takes_it():
+    redis = FakeRedis()
+    lock = LeaseLock(redis, "sweep", ttl=0.03)
+    assert await lock.acquire()
+
+    await asyncio.sleep(0.05)
+    assert redis.renewals >= 2
+    assert not lock.lost
+
+    redis.values[lock.key] = "other-worker"
+    await asyncio.sleep(0.03)
+    assert lock.lost
+
+    await lock.release()
+    assert redis.values[lock.key] == "other-worker"
@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+from datetime import UTC, datetime
+
+import pytest
+from sqlalchemy import event as sa_event
+from sqlalchemy import func, select
+
+from app.models import NotificationDelivery, Registration
+from app.models.enums import DeliveryKind, RegistrationStatus
+from app.repositories.deliveries import DeliveryRepository
+from app.services.notification_service import NotificationService
+from tests.conftest import FakeBot, create_event, create_user, unlimited
+
+
+async def count_deliveries(session, kind: DeliveryKind) -> int:
+    result = await session.execute(
+        select(func.count(NotificationDelivery.id)).where(NotificationDelivery.kind == kind)
+    )
+    return int(result.scalar_one())
+
+
+@pytest.mark.asyncio
+async def test_broadcast_sends_to_every_reachable_user_once(session):
+    event = await create_event(session, now=datetime.now(tz=UTC))
+    users = [await create_user(session, tg_id=1000 + idx) for idx in range(7)]
+    bot = FakeBot()
+
+    service = NotificationService(session, bot, rate_limiter=unlimited())
+    sent = await service.notify_new_event(event)
+
+    assert sent == len(users)
+    assert sorted(bot.sent) == sorted(user.tg_id for user in users)
+    assert await count_deliveries(session, DeliveryKind.new_event) == len(users)
+
+    sent_again = await service.notify_new_event(event)
+    assert sent_again == 0
+    assert len(bot.sent) == len(users)
+
+
+@pytest.mark.asyncio
+async def test_broadcast_marks_blocked_users_and_retries_flood_control(session):
+    event = await create_event(session, now=datetime.now(tz=UTC))
+    blocked = await create_user(session, tg_id=2001)
+    flooded = await create_user(session, tg_id=2002)
+    regular = await create_user(session, tg_id=2003)
+    bot = FakeBot(forbidden={blocked.tg_id}, flood_once={flooded.tg_id})
+
+    service = NotificationService(session, bot, rate_limiter=unlimited())
+    sent = await service.notify_registration_started(event)
+
+    assert sent == 2
+    assert sorted(bot.sent) == [flooded.tg_id, regular.tg_id]
+    assert blocked.is_reachable is False
+    assert flooded.is_reachable is True
+
+
+@pytest.mark.asyncio
+async def test_ping_2h_uses_constant_number_of_queries(session):
+    event = await create_event(session, capacity=50, now=datetime.now(tz=UTC))
+    users = [await create_user(session, tg_id=3000 + idx) for idx in range(12)]
+    users[0].is_reachable = False
+    for user in users:
+        session.add(
+            Registration(event_id=event.id, user_id=user.id, status=RegistrationStatus.confirmed)
+        )
+    await session.flush()
+    await DeliveryRepository(session).add(
+        user_id=users[1].id, event_id=event.id, kind=DeliveryKind.ping_2h
+    )
+    await session.commit()
+    session.expunge_all()
+
+    statements: list[str] = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    sync_engine = session.bind.sync_engine
+    sa_event.listen(sync_engine, "before_cursor_execute", record)
+    try:
+        bot = FakeBot()
+        notifier = NotificationService(session, bot, rate_limiter=unlimited())
+        sent = await notifier.notify_ping_2h(event.id)
+    finally:
+        sa_event.remove(sync_engine, "before_cursor_execute", record)
+
+    assert sent == len(users) - 2
+    assert sorted(bot.sent) == sorted(user.tg_id for user in users[2:])
+    assert len(statements) == 2
@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import asyncio
+from datetime import UTC, datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.jobs import tasks
+from app.jobs.runtime import WorkerRuntime
+from app.models import Base, NotificationDelivery, Registration
+from app.models.enums import DeliveryKind, RegistrationStatus
+from app.services.notification_service import NotificationService
+from tests.conftest import FakeBot, create_event, create_user
+
+
+@pytest.mark.asyncio
+async def test_failing_event_does_not_roll_back_other_events(tmp_path, monkeypatch, utc_datetimes):
+    # Units use separate sessions, so the database must be shared between connections.
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'workflow.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+
+    now = datetime.now(tz=UTC)
+    async with session_factory() as session:
+        broken = await create_event(session, now=now - timedelta(days=1))
+        healthy = await create_event(session, now=now - timedelta(days=1))
+        for idx, event in enumerate((broken, healthy)):
+            user = await create_user(session, tg_id=9500 + idx)
+            session.add(
+                Registration(
+                    event_id=event.id,
+                    user_id=user.id,
+                    status=RegistrationStatus.confirmed,
+                    has_not_mipt_members=True,
+                )
+            )
+        await session.commit()
+
+    original_ping_4d = NotificationService.notify_ping_4d
+
+    async def notify_ping_4d(self, event_id: int) -> int:
+        if event_id == broken.id:
+            raise RuntimeError("boom")
+        return await original_ping_4d(self, event_id)
+
+    monkeypatch.setattr(NotificationService, "notify_ping_4d", notify_ping_4d)
+    monkeypatch.setattr(tasks, "dispatch_broadcast", lambda job_id: None)
+
+    runtime = WorkerRuntime(
+        loop=asyncio.get_running_loop(),
+        engine=engine,
+        session_factory=session_factory,
+        bot=FakeBot(),
+        redis=None,
+    )
+    await tasks._process_periodic_workflow(runtime)
+
+    async with session_factory() as session:
+        result = await session.execute(
+            select(NotificationDelivery.event_id).where(
+                NotificationDelivery.kind == DeliveryKind.ping_4d
+            )
+        )
+        assert list(result.scalars().all()) == [healthy.id]
+
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_sweep_stops_once_its_lease_is_lost(tmp_path, monkeypatch, utc_datetimes):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'workflow.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+
+    async with session_factory() as session:
+        event = await create_event(session, now=datetime.now(tz=UTC) - timedelta(days=1))
+        user = await create_user(session, tg_id=9600)
+        session.add(
+            Registration(
+                event_id=event.id,
+                user_id=user.id,
+                status=RegistrationStatus.confirmed,
+                has_not_mipt_members=True,
+            )
+        )
+        await session.commit()
+
+    dispatched: list[int] = []
+    monkeypatch.setattr(tasks, "dispatch_broadcast", dispatched.append)
+    runtime = WorkerRuntime(
+        loop=asyncio.get_running_loop(),
+        engine=engine,
+        session_factory=session_factory,
+        bot=FakeBot(),
+        redis=None,
+    )
+    await tasks._process_periodic_workflow(runtime, SimpleNamespace(lost=True))
+
+    assert runtime.bot.sent == []
+    async with session_factory() as session:
+        result = await session.execute(select(NotificationDelivery.id))
+        assert result.scalars().all() == []
+
+    await engine.dispose()
@@ -3,7 +3,9 @@ from __future__ import annotations
 from datetime import UTC, datetime, timedelta
 
 import pytest
+from sqlalchemy import event as sa_event
 
+from app.models import Registration
 from app.models.enums import EventType, RegistrationStatus
 from app.services.exceptions import ValidationError
 from app.services.registration_service import RegistrationService
@@ -294,3 +296,211 @@ async def test_profile_not_mipt_blocked_if_less_than_3_days_left(session):
             RegistrationInput(captain_or_solo=mipt_person("@u902")),
             now=now,
         )
+
+
+@pytest.mark.asyncio
+async def test_batch_expiry_promotes_each_event_once(session):
+    now = datetime.now(tz=UTC)
+    event = await create_event(session, event_type=EventType.solo, capacity=3, now=now)
+    other_event = await create_event(session, event_type=EventType.solo, capacity=1, now=now)
+    service = RegistrationService(session)
+
+    registrations = []
+    for idx in range(6):
+        user = await create_user(session, tg_id=700 + idx)
+        registrations.append(
+            await service.create_registration(
+                user.id,
+                event.id,
+                RegistrationInput(captain_or_solo=mipt_person(f"@u{700 + idx}")),
+                now=now,
+            )
+        )
+    outsider = await create_user(session, tg_id=799)
+    other_reg = await service.create_registration(
+        outsider.id,
+        other_event.id,
+        RegistrationInput(captain_or_solo=mipt_person("@u799")),
+        now=now,
+    )
+    for registration in registrations[:3]:
+        registration.status = RegistrationStatus.invited_from_waitlist
+        registration.waitlist_expires_at = now + timedelta(hours=12)
+    other_reg.status = RegistrationStatus.invited_from_waitlist
+    other_reg.waitlist_expires_at = now + timedelta(hours=12)
+    await session.flush()
+
+    expired = await service.expire_waitlist_invites(now + timedelta(hours=13), event_id=event.id)
+
+    assert sorted(expired) == sorted(r.id for r in registrations[:3])
+    assert [r.status for r in registrations[:3]] == [RegistrationStatus.auto_declined] * 3
+    assert [r.status for r in registrations[3:]] == [RegistrationStatus.invited_from_waitlist] * 3
+    assert other_reg.status == RegistrationStatus.invited_from_waitlist
+
+
+@pytest.mark.asyncio
+async def test_promote_waitlist_fills_block_with_few_queries(session):
+    now = datetime.now(tz=UTC)
+    event = await create_event(session, event_type=EventType.solo, capacity=1, now=now)
+    service = RegistrationService(session)
+    registrations = []
+    for idx in range(60):
+        user = await create_user(session, tg_id=900 + idx)
+        registrations.append(
+            await service.create_registration(
+                user.id,
+                event.id,
+                RegistrationInput(captain_or_solo=mipt_person(f"@u{900 + idx}")),
+                now=now + timedelta(seconds=idx),
+            )
+        )
+    event.capacity = 51
+    await session.flush()
+
+    statements: list[str] = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    sync_engine = session.bind.sync_engine
+    sa_event.listen(sync_engine, "before_cursor_execute", record)
+    try:
+        invited = await service.promote_waitlist(event.id, now=now)
+    finally:
+        sa_event.remove(sync_engine, "before_cursor_execute", record)
+
+    assert [r.id for r in invited] == [r.id for r in registrations[1:51]]
+    assert all(r.status == RegistrationStatus.invited_from_waitlist for r in registrations[1:51])
+    assert all(r.status == RegistrationStatus.waitlist for r in registrations[51:])
+    assert len(statements) <= 4
+
+
+@pytest.mark.asyncio
+async def test_promote_waitlist_skips_team_too_large_for_remaining_slots(session):
+    now = datetime.now(tz=UTC)
+    event = await create_event(session, event_type=EventType.team, capacity=5, now=now)
+    service = RegistrationService(session)
+
+    sizes = [3, 4, 2, 1]
+    registrations = []
+    for idx, size in enumerate(sizes):
+        user = await create_user(session, tg_id=1200 + idx)
+        registration = Registration(
+            event_id=event.id,
+            user_id=user.id,
+            status=RegistrationStatus.waitlist,
+            team_name=f"team{idx}",
+            team_size=size,
+            created_at=now + timedelta(seconds=idx),
+        )
+        session.add(registration)
+        registrations.append(registration)
+    await session.flush()
+
+    invited = await service.promote_waitlist(event.id, now=now, preferred_category="team")
+
+    # 3 fits, 4 no longer fits into the remaining 2, then 2 fills the block.
+    assert [r.team_size for r in invited] == [3, 2]
+    assert registrations[1].status == RegistrationStatus.waitlist
+    assert registrations[3].status == RegistrationStatus.waitlist
+
+
+@pytest.mark.asyncio
+async def test_event_counters_follow_status_transitions(session):
+    now = datetime.now(tz=UTC)
+    event = await create_event(
+        session, event_type=EventType.team, capacity=6, team_max_size=3, now=now
+    )
+    service = RegistrationService(session)
+
+    registrations = []
+    for idx, size in enumerate([3, 3, 2]):
+        user = await create_user(session, tg_id=1300 + idx)
+        registrations.append(
+            await service.create_registration(
+                user.id,
+                event.id,
+                RegistrationInput(
+                    captain_or_solo=mipt_person(f"@u{1300 + idx}"),
+                    has_team=True,
+                    team_name=f"team{idx}",
+                    team_size=size,
+                ),
+                now=now,
+            )
+        )
+    assert (event.occupied_units, event.registered_count, event.waitlist_count) == (6, 2, 1)
+
+    await service.cancel_registration(registrations[0].user_id, registrations[0].id, now=now)
+    assert registrations[2].status == RegistrationStatus.invited_from_waitlist
+    assert (event.occupied_units, event.registered_count, event.invited_count) == (5, 1, 1)
+    assert event.waitlist_count == 0
+
+    await service.respond_waitlist_invite(registrations[2].id, accepted=True, now=now)
+    await service.request_confirmation_for_event(event.id, now=now)
+    await service.respond_confirmation(registrations[1].id, going=True, now=now)
+    assert (event.registered_count, event.invited_count, event.confirmed_count) == (1, 0, 1)
+
+    await service.expire_confirmations(now + timedelta(hours=13), event_id=event.id)
+    assert registrations[2].status == RegistrationStatus.auto_declined
+    assert (event.occupied_units, event.registered_count, event.confirmed_count) == (3, 0, 1)
+
+
+@pytest.mark.asyncio
+async def test_reconcile_counters_fixes_drift(session):
+    now = datetime.now(tz=UTC)
+    event = await create_event(session, event_type=EventType.solo, capacity=5, now=now)
+    service = RegistrationService(session)
+    for idx in range(2):
+        user = await create_user(session, tg_id=1400 + idx)
+        await service.create_registration(
+            user.id,
+            event.id,
+            RegistrationInput(captain_or_solo=mipt_person(f"@u{1400 + idx}")),
+            now=now,
+        )
+    assert await service.reconcile_counters([event.id]) == []
+
+    # A row written behind the service's back, e.g. by a manual fix in the database.
+    user = await create_user(session, tg_id=1499)
+    session.add(
+        Registration(event_id=event.id, user_id=user.id, status=RegistrationStatus.waitlist)
+    )
+    await session.flush()
+
+    assert await service.reconcile_counters([event.id]) == [event.id]
+    assert (event.occupied_units, event.registered_count, event.waitlist_count) == (2, 2, 1)
+
+
+@pytest.mark.asyncio
+async def test_create_registration_reads_once_and_writes_in_one_flush(session):
+    now = datetime.now(tz=UTC)
+    event = await create_event(session, event_type=EventType.solo, capacity=5, now=now)
+    user = await create_user(session, tg_id=1700)
+    service = RegistrationService(session)
+
+    statements: list[str] = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    sync_engine = session.bind.sync_engine
+    sa_event.listen(sync_engine, "before_cursor_execute", record)
+    try:
+        registration = await service.create_registration(
+            user.id, event.id, RegistrationInput(captain_or_solo=mipt_person("@u1700")), now=now
+        )
+    finally:
+        sa_event.remove(sync_engine, "before_cursor_execute", record)
+
+    assert registration.status == RegistrationStatus.registered
+    assert user.contact == "@u1700"
+    # One read for the event, the profile and the uniqueness check, then one flush writing the
+    # registration, its person, the event counters and the profile.
+    verbs = sorted(statement.split()[0] for statement in statements)
+    assert verbs == ["INSERT", "INSERT", "SELECT", "UPDATE", "UPDATE"]
+
+    with pytest.raises(ValidationError):
+        await service.create_registration(
+            user.id, event.id, RegistrationInput(captain_or_solo=mipt_person("@u1700")), now=now
+        )
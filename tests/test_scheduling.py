@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+from datetime import UTC, datetime, timedelta
+
+import pytest
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+from app.jobs import scheduling
+from app.jobs.scheduling import DEADLINE_GRACE, dispatch_event_deadlines, event_deadlines
+from app.models import Registration
+from app.models.enums import EventStatus, RegistrationStatus
+from app.repositories.registrations import RegistrationRepository
+from app.services.event_service import EventService
+from tests.conftest import create_event, create_user
+
+# The autouse `dispatched` fixture makes dispatch inline; keep the real one for its own test.
+off_loop = scheduling._off_loop
+
+
+class FakeRedis:
+    def __init__(self):
+        self.keys: set[str] = set()
+
+    def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.keys:
+            return None
+        self.keys.add(key)
+        return True
+
+
+@pytest.mark.asyncio
+async def test_deadlines_are_dispatched_only_after_commit(session, dispatched):
+    event = await create_event(session)
+    event.status = EventStatus.draft
+    await session.commit()
+
+    await EventService(session).publish(event.id)
+    assert dispatched["deadlines"] == []
+    await session.commit()
+    assert dispatched["deadlines"] == [(event.id, sorted(event_deadlines(event)))]
+
+    await EventService(session).update_fields(event.id, {"title": "Renamed"})
+    await session.rollback()
+    assert len(dispatched["deadlines"]) == 1
+
+
+def test_dispatch_collapses_past_deadlines_and_skips_duplicates(monkeypatch):
+    now = datetime(2026, 10, 16, 12, 0, tzinfo=UTC)
+    sent: list[tuple[list, datetime | None]] = []
+    redis = FakeRedis()
+    monkeypatch.setattr(scheduling, "_redis", lambda: redis)
+    monkeypatch.setattr(
+        scheduling.celery_app,
+        "send_task",
+        lambda name, args, eta=None: sent.append((args, eta)),
+    )
+
+    soon = now + timedelta(minutes=3)
+    far = now + timedelta(days=3)
+    etas = [now - timedelta(hours=5), now - timedelta(minutes=1), soon, far]
+
+    assert dispatch_event_deadlines(7, etas, now) == 2
+    assert sent == [([7], soon + DEADLINE_GRACE), ([7], None)]
+
+    # A later sweep re-announcing the same future deadline does not enqueue it twice.
+    assert dispatch_event_deadlines(7, [soon], now) == 0
+
+
+def test_dispatch_without_redis_skips_dedupe(monkeypatch):
+    now = datetime(2026, 10, 16, 12, 0, tzinfo=UTC)
+    sent: list[list] = []
+
+    class DownRedis:
+        def set(self, *args, **kwargs):
+            raise RedisConnectionError("down")
+
+    monkeypatch.setattr(scheduling, "_redis", lambda: DownRedis())
+    monkeypatch.setattr(
+        scheduling.celery_app, "send_task", lambda name, args, eta=None: sent.append(args)
+    )
+
+    assert dispatch_event_deadlines(7, [now + timedelta(minutes=3)], now) == 1
+    assert sent == [[7]]
+
+
+@pytest.mark.asyncio
+async def test_after_commit_dispatch_runs_off_the_event_loop():
+    loop_thread = threading.get_ident()
+    done = asyncio.Event()
+    threads: list[int] = []
+    loop = asyncio.get_running_loop()
+
+    def dispatch(job_id: int) -> None:
+        threads.append(threading.get_ident())
+        loop.call_soon_threadsafe(done.set)
+
+    def failing(job_id: int) -> None:
+        raise RuntimeError("broker down")
+
+    off_loop(failing, 1)
+    off_loop(dispatch, 2)
+    await asyncio.wait_for(done.wait(), timeout=1)
+    assert threads and threads[0] != loop_thread
+
+
+@pytest.mark.asyncio
+async def test_upcoming_expiries_lists_invites_and_confirmations_in_window(session):
+    now = datetime.now(tz=UTC)
+    event = await create_event(session, now=now)
+    users = [await create_user(session, tg_id=9100 + idx) for idx in range(3)]
+    session.add_all(
+        [
+            Registration(
+                event_id=event.id,
+                user_id=users[0].id,
+                status=RegistrationStatus.invited_from_waitlist,
+                waitlist_expires_at=now + timedelta(minutes=5),
+            ),
+            Registration(
+                event_id=event.id,
+                user_id=users[1].id,
+                status=RegistrationStatus.registered,
+                confirmation_requested_at=now,
+                confirmation_expires_at=now + timedelta(minutes=7),
+            ),
+            Registration(
+                event_id=event.id,
+                user_id=users[2].id,
+                status=RegistrationStatus.invited_from_waitlist,
+                waitlist_expires_at=now + timedelta(hours=5),
+            ),
+        ]
+    )
+    await session.flush()
+
+    repo = RegistrationRepository(session)
+    expiries = await repo.upcoming_expiries(now, now + timedelta(minutes=10))
+
+    assert len(expiries) == 2
+    assert {event_id for event_id, _ in expiries} == {event.id}
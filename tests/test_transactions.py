@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+import pytest
+
+from app.utils.transactions import on_commit
+from tests.conftest import create_user
+
+
+@pytest.mark.asyncio
+async def test_released_savepoint_waits_for_the_outer_commit(session):
+    ran: list[str] = []
+    async with session.begin_nested():
+        await create_user(session, tg_id=1)
+        on_commit(session, lambda: ran.append("savepoint"))
+    assert ran == []
+
+    await session.rollback()
+    await session.commit()
+    assert ran == []
+
+
+@pytest.mark.asyncio
+async def test_rolled_back_savepoint_drops_only_its_callbacks(session):
+    ran: list[str] = []
+    on_commit(session, lambda: ran.append("outer"))
+    async with session.begin_nested():
+        on_commit(session, lambda: ran.append("released"))
+    with pytest.raises(RuntimeError):
+        async with session.begin_nested():
+            on_commit(session, lambda: ran.append("rolled back"))
+            raise RuntimeError
+
+    await session.commit()
+    assert ran == ["outer", "released"]
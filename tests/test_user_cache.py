@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import asyncio
+import json
+from datetime import date
+
+import pytest
+
+from app.repositories.user_cache import UserCache, UserSnapshot, user_cache
+from app.repositories.users import UserRepository
+from app.services.profile_service import ProfileService
+from app.services.schemas import PassportInput, PersonInput
+
+
+class FakeRedis:
+    def __init__(self):
+        self.values: dict[str, str] = {}
+
+    async def get(self, key):
+        return self.values.get(key)
+
+    async def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.values:
+            return None
+        self.values[key] = value
+        return True
+
+    async def delete(self, key):
+        self.values.pop(key, None)
+
+
+@pytest.fixture
+def redis():
+    redis = FakeRedis()
+    user_cache.clear()
+    user_cache.attach(redis)
+    yield redis
+    user_cache.attach(None)
+    user_cache.clear()
+
+
+def _count_queries(session) -> list[str]:
+    statements: list[str] = []
+    original = session.execute
+
+    async def execute(statement, *args, **kwargs):
+        statements.append(str(statement))
+        return await original(statement, *args, **kwargs)
+
+    session.execute = execute
+    return statements
+
+
+async def test_snapshot_is_served_from_cache_and_written_through(session, redis):
+    repo = UserRepository(session)
+    await repo.ensure_user(tg_id=700, username="hot")
+    await session.commit()
+    await asyncio.sleep(0)
+    assert json.loads(redis.values["hb_bot:user:700"])["username"] == "hot"
+
+    statements = _count_queries(session)
+    snapshot = await repo.get_snapshot(700)
+    assert snapshot.tg_id == 700 and snapshot.contact == "@hot"
+    assert statements == []
+
+    await ProfileService(session).update(
+        snapshot.id,
+        PersonInput(
+            last_name="Иванов",
+            first_name="Иван",
+            middle_name=None,
+            contact="@hot",
+            group_name=None,
+            is_not_mipt=True,
+            passport=PassportInput(series="4510", number="123456", issue_date=date(2015, 5, 1)),
+        ),
+    )
+    await session.commit()
+    await asyncio.sleep(0)
+
+    # Another process with an empty local cache reads the shared copy.
+    other = UserCache()
+    other.attach(redis)
+    shared = await other.get(700)
+    assert shared.last_name == "Иванов" and shared.is_not_mipt is True
+    assert "4510" not in redis.values["hb_bot:user:700"]
+    assert (await repo.get_snapshot(700)).last_name == "Иванов"
+
+
+async def test_rolled_back_profile_change_is_not_cached(session, redis):
+    repo = UserRepository(session)
+    user = await repo.ensure_user(tg_id=701, username="cold")
+    await session.commit()
+    await asyncio.sleep(0)
+
+    await ProfileService(session).clear(user.id)
+    await session.rollback()
+    await asyncio.sleep(0)
+    assert (await repo.get_snapshot(701)).contact == "@cold"
+
+
+async def test_database_read_does_not_overwrite_newer_shared_copy(session, redis):
+    repo = UserRepository(session)
+    user = await repo.ensure_user(tg_id=702, username="stale")
+    await session.commit()
+    await asyncio.sleep(0)
+    stale = UserSnapshot.from_user(user)
+
+    # A profile update elsewhere wrote through after this process read the row.
+    redis.values["hb_bot:user:702"] = redis.values["hb_bot:user:702"].replace("stale", "fresh")
+    await user_cache.populate(stale)
+    assert "fresh" in redis.values["hb_bot:user:702"]
+
+    user_cache.clear()
+    statements = _count_queries(session)
+    assert (await repo.get_snapshot(702)).username == "fresh"
+    assert statements == []
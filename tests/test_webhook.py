@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+import asyncio
+
+from aiogram import Bot, Dispatcher, Router
+from aiogram.types import Message
+from aiohttp.test_utils import TestClient, TestServer
+
+from app.main import create_webhook_app
+
+SECRET = "s3cret"
+
+
+def _update(update_id: int) -> dict:
+    return {
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "date": 0,
+            "chat": {"id": 42, "type": "private"},
+            "from": {"id": 42, "is_bot": False, "first_name": "Test"},
+            "text": "hello",
+        },
+    }
+
+
+async def test_webhook_requires_secret_and_dispatches_updates():
+    handled = asyncio.Queue()
+    router = Router()
+
+    @router.message()
+    async def handle(message: Message) -> None:
+        await handled.put(message.message_id)
+
+    dp = Dispatcher()
+    dp.include_router(router)
+    bot = Bot(token="123456:TEST")
+    app = create_webhook_app(dp, bot, "/telegram/webhook", SECRET)
+
+    async with TestClient(TestServer(app)) as client:
+        response = await client.post("/telegram/webhook", json=_update(1))
+        assert response.status == 401
+
+        response = await client.post(
+            "/telegram/webhook",
+            json=_update(2),
+            headers={"X-Telegram-Bot-Api-Secret-Token": SECRET},
+        )
+        assert response.status == 200
+        assert await asyncio.wait_for(handled.get(), timeout=5) == 2
+    assert handled.empty()
+    await bot.session.close()
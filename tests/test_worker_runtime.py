@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+from aiogram.client.session.aiohttp import AiohttpSession
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.config import get_settings
+from app.jobs import runtime as worker_runtime
+
+
+class FakeRedis:
+    def __init__(self):
+        self.closed = False
+
+    async def aclose(self):
+        self.closed = True
+
+
+@pytest.fixture
+def closed(monkeypatch) -> list[str]:
+    # The real engine and Bot session, with their shutdown calls recorded.
+    calls: list[str] = []
+    settings = get_settings().model_copy(
+        update={"database_url": "sqlite+aiosqlite:///:memory:", "bot_token": "123456:TEST"}
+    )
+    monkeypatch.setattr(worker_runtime, "get_settings", lambda: settings)
+    monkeypatch.setattr(worker_runtime, "create_redis", FakeRedis)
+    monkeypatch.setattr(worker_runtime, "create_sync_redis", lambda: None)
+
+    dispose = AsyncEngine.dispose
+    close = AiohttpSession.close
+
+    async def record_dispose(self, *args, **kwargs):
+        calls.append("engine")
+        await dispose(self, *args, **kwargs)
+
+    async def record_close(self):
+        calls.append("bot")
+        await close(self)
+
+    monkeypatch.setattr(AsyncEngine, "dispose", record_dispose)
+    monkeypatch.setattr(AiohttpSession, "close", record_close)
+    yield calls
+    asyncio.set_event_loop(None)
+
+
+def test_worker_runtime_runs_tasks_on_one_loop_and_closes_everything(closed):
+    worker_runtime.init_worker_runtime()
+    runtime = worker_runtime.get_runtime()
+
+    async def touch() -> asyncio.AbstractEventLoop:
+        async with runtime.session_factory() as session:
+            await session.execute(text("SELECT 1"))
+        return asyncio.get_running_loop()
+
+    first = worker_runtime.run(touch())
+    second = worker_runtime.run(touch())
+    assert first is second is runtime.loop
+    assert worker_runtime.get_runtime() is runtime
+
+    worker_runtime.shutdown_worker_runtime()
+
+    assert sorted(closed) == ["bot", "engine"]
+    assert runtime.redis.closed
+    assert runtime.loop.is_closed()
+    assert worker_runtime._runtime is None